@@ -0,0 +1,63 @@
+import functools
+import hmac
+import os
+from flask import jsonify, request
+
+# Get the token that protects the stats and metrics endpoints
+def stats_token():
+    """
+    Get the shared token of the stats endpoints from STATS_TOKEN.
+
+    Returns:
+        str: The token, or None when the stats endpoints are disabled.
+    """
+    return (os.environ.get('STATS_TOKEN') or '').strip() or None
+
+# Check the token sent with the current request
+def has_stats_token():
+    """
+    Check whether the current request carries the stats token, as 'Authorization: Bearer <token>'
+    (what Prometheus sends with bearer_token) or as an X-Stats-Token header.
+
+    Returns:
+        bool: True if STATS_TOKEN is set and the request's token matches it.
+    """
+    token = stats_token()
+    if token is None:
+        return False
+    authorization = request.headers.get('Authorization', '')
+    scheme, _, credentials = authorization.partition(' ')
+    received = credentials.strip() if scheme.lower() == 'bearer' else request.headers.get('X-Stats-Token', '')
+    # Compared as bytes, so a non-ASCII header is a mismatch rather than a TypeError
+    return hmac.compare_digest(token.encode('utf-8'), received.encode('utf-8', 'replace'))
+
+# Define the decorator of routes that expose internal stats
+def stats_token_required(view):
+    """
+    Serve a route only to requests carrying STATS_TOKEN (see has_stats_token).
+
+    The route answers 404 when STATS_TOKEN is not set, so the stats of a deployment are never
+    public by default, and 401 when the token is missing or wrong.
+
+    Args:
+        view (function): The Flask view.
+
+    Returns:
+        function: The wrapped view.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if stats_token() is None:
+            return jsonify({'error': 'Stats endpoints are disabled; set STATS_TOKEN'}), 404
+        if not has_stats_token():
+            return jsonify({'error': 'Invalid or missing stats token'}), 401, {'WWW-Authenticate': 'Bearer'}
+        return view(*args, **kwargs)
+    return wrapper
+
+# Example usage of stats_token_required:
+# @api.route('/queue', methods=['GET'])
+# @stats_token_required
+# def api_queue():
+#     return jsonify(queue.stats())
+#
+# curl -H "Authorization: Bearer $STATS_TOKEN" http://localhost:5000/api/v1/queue
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+from config.bot import command_sync_mode
+from app.Actions.command_sync import CommandRegistrar, command_hash, command_key, local_commands
+
+# Folders the cogs are loaded from, relative to the project root
+COG_DIRECTORIES = ('app/Commands/Context', 'app/Commands/Slash')
+
+# Root of the project, which the cog folders are relative to
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Get the signatures of the bot's application commands, by module
+def command_signatures(bot):
+    """
+    Hash every application command of the bot, grouped by the module that defines it.
+
+    Args:
+        bot (commands.Bot): The bot.
+
+    Returns:
+        dict: module -> {command key -> payload hash}.
+    """
+    signatures = {}
+    for command in bot.application_commands:
+        module = command.cog.__module__ if command.cog else command.callback.__module__
+        signatures.setdefault(module, {})[command_key(command.body)] = command_hash(command.body)
+    return signatures
+
+# Define the cog loader
+class CogLoader:
+    """
+    Loads the cogs, syncs only the application commands whose signature changed, and
+    hot-reloads edited cogs.
+
+    The loader tracks each cog module's mtime and the signature (hash of the API payload) of
+    every command it defines. On startup and after each reload, the registrar (see
+    app/Actions/command_sync.py) compares the commands with the remote state it cached in
+    COMMAND_STATE and only creates, edits or deletes the commands that changed.
+
+    Reloading uses bot.reload_extension(), which swaps the cog in place (and keeps the old
+    version if the new one fails to load), so the gateway connection stays up. Only the cog
+    modules themselves are reloaded, not the helpers they import.
+
+    Attributes:
+        bot (commands.Bot): The bot.
+        directories (tuple): The folders the cogs are loaded from.
+        sync (bool): Whether command changes are pushed to Discord.
+        registrar (CommandRegistrar): Registers the changed commands.
+        mtimes (dict): module -> mtime of the loaded file.
+        errors (dict): module -> error of the last failed load.
+        signatures (dict): module -> {command key -> signature} of the loaded commands.
+    """
+
+    def __init__(self, bot, directories=COG_DIRECTORIES, sync=None, registrar=None):
+        """
+        Initializes the CogLoader class.
+
+        Args:
+            bot (commands.Bot): The bot.
+            directories (tuple): The folders the cogs are loaded from. Defaults to COG_DIRECTORIES.
+            sync (bool, optional): Whether to push changed commands. Defaults to COMMAND_SYNC == 'changed'.
+            registrar (CommandRegistrar, optional): The registrar. Defaults to one using bot.http.
+        """
+        self.bot = bot
+        self.directories = directories
+        self.sync = command_sync_mode() == 'changed' if sync is None else sync
+        self.mtimes = {}
+        self.errors = {}
+        self.signatures = {}
+        self.registrar = registrar or CommandRegistrar(bot.http)
+        self._watcher = None
+
+    def discover(self):
+        """
+        Find the cog modules and the mtimes of their files.
+
+        Returns:
+            dict: module -> mtime.
+        """
+        found = {}
+        for directory in self.directories:
+            try:
+                entries = sorted(os.scandir(os.path.join(PROJECT_ROOT, directory)), key=lambda entry: entry.name)
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.endswith('.py') and not entry.name.startswith('_'):
+                    found[f"{directory.replace('/', '.')}.{entry.name[:-3]}"] = entry.stat().st_mtime
+        return found
+
+    def _load(self, module, mtime, action):
+        """
+        Load, reload or unload one cog module, recording the outcome.
+
+        Args:
+            module (str): The module.
+            mtime (float): The mtime of its file (ignored when unloading).
+            action (str): 'load', 'reload' or 'unload'.
+
+        Returns:
+            bool: True if it succeeded.
+        """
+        if action != 'unload':
+            self.mtimes[module] = mtime  # A failed file is retried once it changes again
+        try:
+            getattr(self.bot, f'{action}_extension')(module)
+        except Exception as e:
+            self.errors[module] = str(e)
+            print(f'Failed to {action} cog {module}: {e}') # Print the name of the cog that failed
+            return False
+        self.errors.pop(module, None)
+        print(f'{action.capitalize()}ed cog: {module}') # Print the name of the cog
+        return True
+
+    def load_all(self):
+        """
+        Load every cog and record the signatures of their commands.
+
+        Returns:
+            dict: 'loaded' and 'failed' module counts, and 'changed', the registration calls needed.
+        """
+        for module, mtime in self.discover().items():
+            self._load(module, mtime, 'load')
+        self.signatures = command_signatures(self.bot)
+        return {'loaded': len(self.mtimes) - len(self.errors), 'failed': len(self.errors), 'changed': self.changed()}
+
+    def scan(self):
+        """
+        Reload the cogs whose file changed, load new cogs and unload deleted ones.
+
+        Returns:
+            list: The modules that were (re)loaded or unloaded.
+        """
+        found = self.discover()
+        touched = []
+        for module, mtime in found.items():
+            if self.mtimes.get(module) != mtime:
+                self._load(module, mtime, 'reload' if module in self.bot.extensions else 'load')
+                touched.append(module)
+        for module in [module for module in self.mtimes if module not in found]:
+            if module in self.bot.extensions:
+                self._load(module, None, 'unload')
+            self.mtimes.pop(module, None)
+            self.errors.pop(module, None)
+            touched.append(module)
+        if touched:
+            self.signatures = command_signatures(self.bot)
+        return touched
+
+    def changed(self):
+        """
+        Get the registration calls the loaded commands need, according to the cached remote state.
+
+        Returns:
+            list: The CommandChange calls (see app/Actions/command_sync.py).
+        """
+        return self.registrar.plan(local_commands(self.bot, self.registrar.guild_ids))
+
+    async def push(self):
+        """
+        Register the commands that changed since the last push.
+
+        Returns:
+            list: The CommandChange calls made.
+        """
+        if not self.sync:
+            return []
+        return await self.registrar.sync(self.bot)
+
+    async def watch(self, interval=None):
+        """
+        Poll the cog folders and hot-reload changed cogs until cancelled.
+
+        Args:
+            interval (float, optional): Seconds between scans. Defaults to COG_WATCH_INTERVAL, or 1.
+        """
+        interval = interval or float(os.environ.get('COG_WATCH_INTERVAL') or 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.scan():
+                    await self.push()
+            except Exception as e:
+                print(f"Cog hot reload failed: {e}")
+
+    def start_watching(self, interval=None):
+        """
+        Start the hot reload task on the bot's event loop, if it isn't running.
+
+        Args:
+            interval (float, optional): Seconds between scans. Defaults to COG_WATCH_INTERVAL, or 1.
+        """
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.get_running_loop().create_task(self.watch(interval), name='cog_hot_reload')
+
+# Attach a cog loader to the bot
+def install(bot, loader):
+    """
+    Push the changed commands once the bot is connected and, when COG_HOT_RELOAD is enabled,
+    start watching the cog folders.
+
+    Args:
+        bot (commands.Bot): The bot.
+        loader (CogLoader): The loader the cogs were loaded with.
+    """
+    bot.cog_loader = loader
+    hot_reload = (os.environ.get('COG_HOT_RELOAD') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+    async def on_ready():
+        started_at = time.perf_counter()
+        try:
+            changes = await loader.push()
+        except Exception as e:
+            print(f"Failed to sync application commands: {e}")
+        else:
+            if changes:
+                print(f"Application commands synced in {time.perf_counter() - started_at:.2f}s")
+        if hot_reload:
+            loader.start_watching()
+
+    bot.add_listener(on_ready, 'on_ready')
+
+# Example usage of the CogLoader class (done in config/boot.py):
+# loader = CogLoader(bot)
+# loader.load_all()        # {'loaded': 4, 'failed': 0, 'changed': [CommandChange('edit', 'global', 'chat_input:ping', '123')]}
+# install(bot, loader)     # Syncs only 'ping' on ready, then hot-reloads edited cogs if COG_HOT_RELOAD=true
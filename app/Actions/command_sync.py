@@ -0,0 +1,386 @@
+"""
+command_sync.py
+This file registers the bot's application commands with Discord by diffing them against the
+last known remote state, so a restart or a hot reload only sends the calls that are needed.
+
+The remote state (the ID and payload hash of every registered command, per scope) is cached in
+COMMAND_STATE (default 'storage/cache/commands.json'). A scope that isn't cached yet is fetched
+once. Each sync then compares the local commands with the cache and issues:
+- create (POST) for new commands,
+- edit (PATCH) for commands whose payload changed,
+- delete (DELETE) for commands that no longer exist,
+or one bulk overwrite (PUT) when a scope has more than COMMAND_SYNC_BULK_THRESHOLD changes.
+
+Set COMMAND_SYNC_GUILDS to a list of guild IDs to register the global commands in those guilds
+instead (they update instantly there, while global changes take a while to propagate); the
+commands registered globally are left alone.
+
+Preview or apply the changes with:
+
+    python app/Actions/command_sync.py diff [--refresh] [--guild ID ...]
+    python app/Actions/command_sync.py sync [--refresh] [--guild ID ...]
+
+'diff' without --refresh works offline against the cache; --refresh and 'sync' need DISCORD_TOKEN.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+# Add the project root to the Python path when run as a script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from disnake import NotFound
+from disnake.app_commands import application_command_factory
+
+# Where the remote command state is cached
+COMMAND_STATE_PATH = os.environ.get('COMMAND_STATE') or os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'storage', 'cache', 'commands.json')
+)
+
+# Scope name of the global commands; guild scopes are the guild IDs as strings
+GLOBAL_SCOPE = 'global'
+
+# One call needed to bring a scope up to date
+CommandChange = namedtuple('CommandChange', 'action scope key command_id')
+
+# Get the guilds the global commands are test-synced to
+def sync_guild_ids(value=None):
+    """
+    Parse COMMAND_SYNC_GUILDS (or `value`), the guilds global commands are registered in instead.
+
+    Args:
+        value (str, optional): Comma-separated guild IDs, overriding COMMAND_SYNC_GUILDS.
+
+    Returns:
+        list: The guild IDs, or None to register global commands globally.
+    """
+    value = value if value is not None else os.environ.get('COMMAND_SYNC_GUILDS') or ''
+    guild_ids = [int(part) for part in value.split(',') if part.strip()]
+    return guild_ids or None
+
+# Build the key of a command within its scope
+def command_key(body):
+    """
+    Build the key of a command within a scope; a name is unique per command type.
+
+    Args:
+        body (ApplicationCommand): The command payload object.
+
+    Returns:
+        str: The key, e.g. 'chat_input:ping'.
+    """
+    return f"{body.type.name}:{body.name}"
+
+# Hash the payload of a command
+def command_hash(body):
+    """
+    Hash the API payload of a command.
+
+    Args:
+        body (ApplicationCommand): The command payload object.
+
+    Returns:
+        str: The SHA-1 hex digest.
+    """
+    return hashlib.sha1(json.dumps(body.to_dict(), sort_keys=True).encode()).hexdigest()
+
+# Collect the bot's application commands by scope
+def local_commands(bot, guild_ids=None):
+    """
+    Collect the payloads of the bot's application commands, localized, by scope.
+
+    Args:
+        bot (commands.Bot): The bot with its cogs loaded.
+        guild_ids (list, optional): Guilds to register the global commands in instead.
+
+    Returns:
+        dict: scope -> {key -> ApplicationCommand}.
+    """
+    scopes = {}
+    for command in bot.application_commands:
+        body = command.body
+        body.localize(bot.i18n)
+        targets = command.guild_ids or guild_ids or (GLOBAL_SCOPE,)
+        for scope in targets:
+            scopes.setdefault(str(scope), {})[command_key(body)] = body
+    return scopes
+
+# Define the command registrar
+class CommandRegistrar:
+    """
+    Registers application commands with the minimum of API calls, using a cached remote state.
+
+    The HTTP client is disnake's HTTPClient (bot.http) or any object with the same coroutine
+    methods (get_*_commands, upsert_*_command, edit_*_command, delete_*_command and
+    bulk_upsert_*_commands), so tests can pass a mock.
+
+    Attributes:
+        http (HTTPClient): The HTTP client.
+        application_id (int): The application the commands belong to.
+        state_path (str): The cache file of the remote state.
+        guild_ids (list): Guilds the global commands are registered in instead, or None.
+        bulk_threshold (int): Changes in one scope above which a bulk overwrite is used.
+        state (dict): scope -> {key -> {'id': command ID, 'hash': payload hash or None}}.
+    """
+
+    def __init__(self, http, application_id=None, state_path=COMMAND_STATE_PATH, guild_ids=None, bulk_threshold=None):
+        """
+        Initializes the CommandRegistrar class.
+
+        Args:
+            http (HTTPClient): The HTTP client.
+            application_id (int, optional): The application ID. Defaults to the bot's, passed to sync().
+            state_path (str): The cache file. Defaults to COMMAND_STATE or 'storage/cache/commands.json'.
+            guild_ids (list, optional): Guilds to register the global commands in. Defaults to COMMAND_SYNC_GUILDS.
+            bulk_threshold (int, optional): Defaults to COMMAND_SYNC_BULK_THRESHOLD, or 10.
+        """
+        self.http = http
+        self.application_id = application_id
+        self.state_path = state_path
+        self.guild_ids = guild_ids if guild_ids is not None else sync_guild_ids()
+        self.bulk_threshold = bulk_threshold or int(os.environ.get('COMMAND_SYNC_BULK_THRESHOLD') or 10)
+        self.state = self._read_state()
+
+    def _read_state(self):
+        """
+        Read the cached remote state.
+
+        Returns:
+            dict: The state, empty if it is missing or unreadable.
+        """
+        try:
+            with open(self.state_path) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_state(self):
+        """
+        Write the cached remote state atomically.
+        """
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temporary = self.state_path + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.state, file, indent=2, sort_keys=True)
+        os.replace(temporary, self.state_path)
+
+    def managed_scopes(self, local):
+        """
+        Get the scopes this registrar keeps in sync.
+
+        Args:
+            local (dict): The local commands, by scope.
+
+        Returns:
+            list: The scopes, global first. The global scope is left alone while test-syncing to guilds.
+        """
+        scopes = set(local) | set(self.state)
+        if self.guild_ids:
+            scopes.discard(GLOBAL_SCOPE)
+        return sorted(scopes, key=lambda scope: (scope != GLOBAL_SCOPE, scope))
+
+    def plan(self, local):
+        """
+        Diff the local commands against the cached remote state.
+
+        Args:
+            local (dict): The local commands, by scope (see local_commands()).
+
+        Returns:
+            list: The CommandChange calls needed, per scope: creates, edits, then deletes.
+        """
+        changes = []
+        for scope in self.managed_scopes(local):
+            commands = local.get(scope, {})
+            remote = self.state.get(scope, {})
+            for key in sorted(commands):
+                cached = remote.get(key)
+                if cached is None:
+                    changes.append(CommandChange('create', scope, key, None))
+                elif cached['hash'] != command_hash(commands[key]):
+                    changes.append(CommandChange('edit', scope, key, cached['id']))
+            for key in sorted(set(remote) - set(commands)):
+                changes.append(CommandChange('delete', scope, key, remote[key]['id']))
+        return changes
+
+    async def refresh(self, local, scopes=None):
+        """
+        Fetch the registered commands of some scopes and cache them.
+
+        A fetched command whose payload equals the local one is cached with the local hash, so it
+        isn't edited; others get no hash and are edited on the next sync.
+
+        Args:
+            local (dict): The local commands, by scope.
+            scopes (list, optional): The scopes to fetch. Defaults to every managed scope.
+        """
+        for scope in scopes if scopes is not None else self.managed_scopes(local):
+            if scope == GLOBAL_SCOPE:
+                remote = await self.http.get_global_commands(self.application_id)
+            else:
+                remote = await self.http.get_guild_commands(self.application_id, int(scope))
+            commands = local.get(scope, {})
+            cached = {}
+            for data in remote:
+                registered = application_command_factory(data)
+                key = command_key(registered)
+                body = commands.get(key)
+                cached[key] = {'id': str(data['id']), 'hash': command_hash(body) if body is not None and body == registered else None}
+            self.state[scope] = cached
+        self.save_state()
+
+    async def apply(self, local, changes):
+        """
+        Make the calls of a plan, updating and saving the cached state after each one.
+
+        Args:
+            local (dict): The local commands, by scope.
+            changes (list): The CommandChange calls returned by plan().
+
+        Returns:
+            int: The number of API calls made.
+        """
+        calls = 0
+        by_scope = {}
+        for change in changes:
+            by_scope.setdefault(change.scope, []).append(change)
+
+        for scope, scope_changes in by_scope.items():
+            commands = local.get(scope, {})
+            guild_id = None if scope == GLOBAL_SCOPE else int(scope)
+            remote = self.state.setdefault(scope, {})
+            if len(scope_changes) > self.bulk_threshold:
+                payload = [commands[key].to_dict() for key in sorted(commands)]
+                if guild_id is None:
+                    registered = await self.http.bulk_upsert_global_commands(self.application_id, payload)
+                else:
+                    registered = await self.http.bulk_upsert_guild_commands(self.application_id, guild_id, payload)
+                cached = {}
+                for data in registered:
+                    key = command_key(application_command_factory(data))
+                    if key in commands:
+                        cached[key] = {'id': str(data['id']), 'hash': command_hash(commands[key])}
+                self.state[scope] = cached
+                calls += 1
+                self.save_state()
+                continue
+
+            for change in scope_changes:
+                if change.action == 'delete':
+                    try:
+                        if guild_id is None:
+                            await self.http.delete_global_command(self.application_id, change.command_id)
+                        else:
+                            await self.http.delete_guild_command(self.application_id, guild_id, change.command_id)
+                    except NotFound:
+                        pass  # Already deleted remotely
+                    remote.pop(change.key, None)
+                else:
+                    body = commands[change.key]
+                    data = None
+                    if change.action == 'edit':
+                        try:
+                            if guild_id is None:
+                                data = await self.http.edit_global_command(self.application_id, change.command_id, body.to_dict())
+                            else:
+                                data = await self.http.edit_guild_command(self.application_id, guild_id, change.command_id, body.to_dict())
+                        except NotFound:
+                            data = None  # Deleted remotely, so create it again
+                    if data is None:
+                        if guild_id is None:
+                            data = await self.http.upsert_global_command(self.application_id, body.to_dict())
+                        else:
+                            data = await self.http.upsert_guild_command(self.application_id, guild_id, body.to_dict())
+                    remote[change.key] = {'id': str(data['id']), 'hash': command_hash(body)}
+                calls += 1
+                self.save_state()
+        return calls
+
+    async def sync(self, bot, refresh=False, dry_run=False):
+        """
+        Bring the registered commands in line with the bot's commands.
+
+        Args:
+            bot (commands.Bot): The bot with its cogs loaded.
+            refresh (bool): Whether to re-fetch every managed scope instead of trusting the cache.
+            dry_run (bool): Whether to only compute the changes.
+
+        Returns:
+            list: The CommandChange calls that were (or, on a dry run, would be) made.
+        """
+        self.application_id = self.application_id or bot.application_id
+        local = local_commands(bot, self.guild_ids)
+        stale = self.managed_scopes(local) if refresh else [scope for scope in self.managed_scopes(local) if scope not in self.state]
+        if stale:
+            await self.refresh(local, stale)
+        changes = self.plan(local)
+        if changes and not dry_run:
+            calls = await self.apply(local, changes)
+            print(f"Synced {len(changes)} application command change(s) in {calls} call(s)")
+        return changes
+
+# Format a plan for display
+def format_changes(changes):
+    """
+    Format a plan as one line per call.
+
+    Args:
+        changes (list): The CommandChange calls.
+
+    Returns:
+        str: The formatted plan.
+    """
+    if not changes:
+        return "No changes"
+    symbols = {'create': '+', 'edit': '~', 'delete': '-'}
+    return "\n".join(f"{symbols[change.action]} {change.action:<6} {change.key:<40} {change.scope}" for change in changes)
+
+# Run the dry-run / sync command line
+async def main(argv):
+    """
+    Load the cogs and print (and with 'sync', apply) the registration changes.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    from config.bot import create_bot
+    from app.Actions.cogs import CogLoader
+
+    if not argv or argv[0] not in ('diff', 'sync'):
+        print("Usage: python app/Actions/command_sync.py diff|sync [--refresh] [--guild ID ...]")
+        return 1
+    command, refresh = argv[0], '--refresh' in argv
+    guild_ids = [int(argv[index + 1]) for index, arg in enumerate(argv) if arg == '--guild' and index + 1 < len(argv)]
+
+    bot = create_bot()
+    CogLoader(bot, sync=False).load_all()
+    registrar = CommandRegistrar(bot.http, application_id=os.environ.get('DISCORD_APPLICATION_ID'), guild_ids=guild_ids or None)
+    online = refresh or command == 'sync'
+    if online:
+        await bot.http.static_login(os.environ.get('DISCORD_TOKEN'))
+        registrar.application_id = registrar.application_id or (await bot.http.application_info())['id']
+    try:
+        if online:
+            changes = await registrar.sync(bot, refresh=refresh, dry_run=command == 'diff')
+        else:
+            local = local_commands(bot, registrar.guild_ids)
+            changes = registrar.plan(local)
+            uncached = [scope for scope in registrar.managed_scopes(local) if scope not in registrar.state]
+            if uncached:
+                print(f"Not cached yet, shown as creates: {', '.join(uncached)} (use --refresh to fetch them)")
+    finally:
+        if online:
+            await bot.http.close()
+    print(format_changes(changes))
+    return 0
+
+# Main execution
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
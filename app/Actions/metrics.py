@@ -0,0 +1,684 @@
+import asyncio
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# BaseModel and QuerySet methods whose queries are labelled with the operation
+MODEL_METHODS = (
+    'get', 'all', 'create', 'update', 'delete', 'filter', 'exists', 'paginate', 'iter_all',
+    'bulk_create', 'bulk_update', 'bulk_delete',
+    'aget', 'aall', 'acreate', 'aupdate', 'adelete', 'afilter', 'aexists', 'apaginate', 'aiter_all',
+)
+QUERYSET_METHODS = ('all', 'first', 'count', 'exists', 'aall', 'afirst', 'acount', 'aexists')
+
+# Whether metrics are collected in this process
+def metrics_enabled():
+    """
+    Check whether METRICS_ENABLED is set.
+
+    Returns:
+        bool: True if the instrumentation should be installed.
+    """
+    return (os.environ.get('METRICS_ENABLED') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Define the base metric
+class Metric:
+    """
+    A metric family whose samples are keyed by a tuple of label values.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The description exported with it.
+        labelnames (tuple): The label names, in the order the label values are passed.
+    """
+
+    type = 'untyped'
+
+    def __init__(self, name, help, labelnames=()):
+        """
+        Initializes the Metric class.
+
+        Args:
+            name (str): The metric name.
+            help (str): The description exported with it.
+            labelnames (tuple): The label names. Defaults to none.
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """
+        Get the samples of the family.
+
+        Returns:
+            list: (suffix, labels dict, value) of every sample.
+        """
+        with self._lock:
+            return [('', dict(zip(self.labelnames, labels)), value) for labels, value in self._values.items()]
+
+    def clear(self):
+        """
+        Drop every sample.
+        """
+        with self._lock:
+            self._values.clear()
+
+# Define the counter
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. the number of commands run.
+    """
+
+    type = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        """
+        Increment the counter.
+
+        Args:
+            labels (tuple): The label values. Defaults to none.
+            amount (float): The increment. Defaults to 1.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+# Define the gauge
+class Gauge(Metric):
+    """
+    A value that goes up and down, e.g. the event loop lag.
+    """
+
+    type = 'gauge'
+
+    def set(self, labels=(), value=0):
+        """
+        Set the gauge.
+
+        Args:
+            labels (tuple): The label values. Defaults to none.
+            value (float): The value.
+        """
+        with self._lock:
+            self._values[labels] = value
+
+# Define the histogram
+class Histogram(Metric):
+    """
+    Counts observations, e.g. latencies, in fixed buckets, and tracks their sum and count.
+
+    Attributes:
+        buckets (tuple): The sorted upper bounds of the buckets.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initializes the Histogram class.
+
+        Args:
+            name (str): The metric name.
+            help (str): The description exported with it.
+            labelnames (tuple): The label names. Defaults to none.
+            buckets (tuple): The upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+        """
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels=(), value=0.0):
+        """
+        Record an observation.
+
+        Args:
+            labels (tuple): The label values. Defaults to none.
+            value (float): The observed value, e.g. seconds.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        """
+        Get the cumulative bucket, sum and count samples of the family.
+
+        Returns:
+            list: (suffix, labels dict, value) of every sample.
+        """
+        with self._lock:
+            values = [(labels, list(state[0]), state[1], state[2]) for labels, state in self._values.items()]
+        samples = []
+        for labels, counts, total, count in values:
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket
+                samples.append(('_bucket', dict(labels, le=_format_value(bound)), cumulative))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+# Format a sample value or bucket bound
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(int(value))
+
+# Escape a label value
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+# Define the metrics registry
+class Registry:
+    """
+    Holds the metrics of this process and renders them in the Prometheus text format.
+
+    Collectors are functions called at scrape time that turn existing statistics (pool,
+    rate limiters, ...) into metric families, so nothing is counted twice on the hot path.
+
+    Attributes:
+        labels (dict): Labels added to every sample, e.g. {'role': 'web'}.
+        metrics (dict): name -> Metric.
+        collectors (list): Functions returning lists of (name, type, help, samples) families.
+    """
+
+    def __init__(self, labels=None):
+        """
+        Initializes the Registry class.
+
+        Args:
+            labels (dict, optional): Labels added to every sample. Defaults to none.
+        """
+        self.labels = labels or {}
+        self.metrics = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Add a metric, or get the one already registered under its name.
+
+        Args:
+            metric (Metric): The metric.
+
+        Returns:
+            Metric: The registered metric.
+        """
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        """
+        Register a Counter (see register()).
+        """
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        """
+        Register a Gauge (see register()).
+        """
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Register a Histogram (see register()).
+        """
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def collector(self, function):
+        """
+        Register a collector called at scrape time. Usable as a decorator.
+
+        Args:
+            function (callable): Returns a list of (name, type, help, samples) families.
+
+        Returns:
+            callable: The function.
+        """
+        with self._lock:
+            if function not in self.collectors:
+                self.collectors.append(function)
+        return function
+
+    def families(self):
+        """
+        Get every metric family of this process, with the registry labels applied.
+
+        Returns:
+            list: (name, type, help, samples) of every family that has samples.
+        """
+        with self._lock:
+            metrics = list(self.metrics.values())
+            collectors = list(self.collectors)
+        families = [(metric.name, metric.type, metric.help, metric.samples()) for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return [
+            (name, kind, help, [(suffix, dict(self.labels, **labels), value) for suffix, labels, value in samples])
+            for name, kind, help, samples in families if samples
+        ]
+
+    def render(self, extra=()):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            extra (list): Families of another process (see read_snapshot) merged into the output.
+
+        Returns:
+            str: The exposition.
+        """
+        merged = {}
+        for name, kind, help, samples in list(self.families()) + list(extra):
+            family = merged.setdefault(name, (kind, help, []))
+            family[2].extend(samples)
+        lines = []
+        for name, (kind, help, samples) in merged.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text else f"{name}{suffix} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry({'role': os.environ.get('BOOT_ROLE') or 'all'})
+
+# Hot-path metrics
+command_total = registry.counter('bot_commands_total', 'Commands invoked, by command, type and status.', ('command', 'type', 'status'))
+command_seconds = registry.histogram('bot_command_duration_seconds', 'Command latency from dispatch to completion.', ('command', 'type'))
+loop_lag = registry.gauge('bot_event_loop_lag_last_seconds', 'Last measured delay of the event loop in running a scheduled callback.')
+loop_lag_seconds = registry.histogram('bot_event_loop_lag_seconds', 'Delay of the event loop in running a scheduled callback.', buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+http_total = registry.counter('http_requests_total', 'HTTP requests, by endpoint, method and status.', ('endpoint', 'method', 'status'))
+http_seconds = registry.histogram('http_request_duration_seconds', 'HTTP request latency.', ('endpoint', 'method'))
+db_total = registry.counter('db_queries_total', 'SQL statements executed, by BaseModel operation and status.', ('operation', 'status'))
+db_seconds = registry.histogram('db_query_duration_seconds', 'SQL statement latency, by BaseModel operation.', ('operation',))
+
+# Bot instrumentation
+
+# Command types of application command interactions
+_INTERACTION_TYPES = {'chat_input': 'slash', 'user': 'user', 'message': 'message'}
+
+# Attach command latency and event loop lag metrics to a bot
+def install(bot):
+    """
+    Time every prefix and application command, and measure the event loop lag.
+
+    bot.invoke() and bot.process_application_commands() are wrapped on the instance, so no
+    error listener or invoke hook is registered (those replace the default error output and the
+    database scope hooks). A command counts as 'error' when disnake marks it as failed, and as
+    'rejected' when a global check or an unknown command stopped it before running.
+
+    When METRICS_FILE is set, the metrics are also written to that file every METRICS_INTERVAL
+    seconds so a web process can serve them.
+
+    Args:
+        bot (commands.Bot): The bot.
+    """
+    invoke = bot.invoke
+    process_application_commands = bot.process_application_commands
+
+    async def timed_invoke(ctx):
+        if ctx.command is None:
+            return await invoke(ctx)
+        started_at = time.perf_counter()
+        status = 'error'
+        try:
+            await invoke(ctx)
+            status = 'error' if ctx.command_failed else 'ok'
+        finally:
+            name = ctx.command.qualified_name
+            command_seconds.observe((name, 'prefix'), time.perf_counter() - started_at)
+            command_total.inc((name, 'prefix', status))
+
+    async def timed_process_application_commands(interaction):
+        started_at = time.perf_counter()
+        status = 'error'
+        try:
+            await process_application_commands(interaction)
+            status = 'error' if getattr(interaction, 'command_failed', False) else 'ok'
+        finally:
+            command = getattr(interaction, 'application_command', None)
+            if command:
+                name = command.qualified_name
+            else:
+                name, status = interaction.data.name, 'rejected'
+            kind = _INTERACTION_TYPES.get(interaction.data.type.name, interaction.data.type.name)
+            command_seconds.observe((name, kind), time.perf_counter() - started_at)
+            command_total.inc((name, kind, status))
+
+    bot.invoke = timed_invoke
+    bot.process_application_commands = timed_process_application_commands
+    registry.collector(functools.partial(_bot_families, bot))
+
+    interval = float(os.environ.get('METRICS_LOOP_INTERVAL') or 1)
+    path = os.environ.get('METRICS_FILE')
+
+    async def on_ready():
+        if getattr(bot, '_metrics_tasks', None) is None:
+            bot._metrics_tasks = [bot.loop.create_task(measure_loop_lag(interval), name='metrics_loop_lag')]
+            if path:
+                bot._metrics_tasks.append(bot.loop.create_task(write_snapshots(path), name='metrics_snapshot'))
+
+    bot.add_listener(on_ready, 'on_ready')
+
+# Measure how late the event loop runs a sleeping task
+async def measure_loop_lag(interval=1.0):
+    """
+    Sleep `interval` seconds in a loop and record how much later than scheduled each wakeup is.
+
+    Args:
+        interval (float): Seconds between measurements. Defaults to 1.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        loop_lag.set((), lag)
+        loop_lag_seconds.observe((), lag)
+
+# Write the metrics of this process to a file periodically
+async def write_snapshots(path, interval=None):
+    """
+    Write the metric families of this process to `path` every METRICS_INTERVAL seconds.
+
+    Args:
+        path (str): The snapshot file.
+        interval (float, optional): Seconds between writes. Defaults to METRICS_INTERVAL, or 15.
+    """
+    interval = interval or float(os.environ.get('METRICS_INTERVAL') or 15)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            temporary = f'{path}.tmp'
+            with open(temporary, 'w') as file:
+                json.dump({'updated_at': time.time(), 'families': registry.families()}, file)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Failed to write the metrics snapshot: {e}")
+
+# Read the metrics written by another process
+def read_snapshot(path=None, max_age=None):
+    """
+    Read the metric families written to METRICS_FILE by the bot process.
+
+    Args:
+        path (str, optional): The snapshot file. Defaults to METRICS_FILE.
+        max_age (float, optional): Seconds after which a snapshot is ignored as stale. Defaults to
+            four times METRICS_INTERVAL.
+
+    Returns:
+        list: The families, or an empty list if there is no fresh snapshot.
+    """
+    path = path or os.environ.get('METRICS_FILE')
+    if not path:
+        return []
+    max_age = max_age or float(os.environ.get('METRICS_INTERVAL') or 15) * 4
+    try:
+        with open(path) as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return []
+    if time.time() - snapshot.get('updated_at', 0) > max_age:
+        return []
+    return [tuple(family) for family in snapshot.get('families', [])]
+
+# Turn the bot's existing statistics into metric families
+def _bot_families(bot):
+    families = []
+    latencies = bot.latencies if getattr(bot, 'shards', None) else [(bot.shard_id or 0, bot.latency)]
+    families.append(('bot_gateway_latency_seconds', 'gauge', 'Gateway heartbeat latency, by shard.', [
+        ('', {'shard': str(shard_id)}, latency) for shard_id, latency in latencies if math.isfinite(latency)
+    ]))
+    from app.Actions.shards import shard_stats
+    families.append(('bot_gateway_events_total', 'counter', 'Gateway events received.', [('', {}, shard_stats.events_total)]))
+    offloader = getattr(bot, 'offloader', None)
+    if offloader is not None:
+        stats = offloader.stats()
+        families.append(('bot_offload_queued', 'gauge', 'Blocking calls waiting for an offload thread.', [('', {}, stats['queued'])]))
+        families.append(('bot_offload_running', 'gauge', 'Blocking calls running on offload threads.', [('', {}, stats['running'])]))
+        families.append(('bot_offload_completed_total', 'counter', 'Blocking calls completed, by status.', [
+            ('', {'status': 'ok'}, stats['completed'] - stats['failed']), ('', {'status': 'error'}, stats['failed']),
+        ]))
+    return families
+
+# Web instrumentation
+
+# Attach request latency metrics to a Flask app
+def init_metrics(app):
+    """
+    Time every request of a Flask app by endpoint, method and status.
+
+    Requests that match no route are counted under the endpoint '<unmatched>', so scanners
+    can't create a series per URL.
+
+    Args:
+        app (Flask): The app.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started_at = g.pop('metrics_started_at', None)
+        if started_at is not None:
+            endpoint = request.endpoint or '<unmatched>'
+            http_seconds.observe((endpoint, request.method), time.perf_counter() - started_at)
+            http_total.inc((endpoint, request.method, str(response.status_code)))
+        return response
+
+    registry.collector(_web_families)
+
+# Turn the web app's existing statistics into metric families
+def _web_families():
+    from app.Actions.ratelimit import rate_limit_stats
+    from app.Actions.route_cache import route_cache_stats
+
+    limits = rate_limit_stats()
+    cache = route_cache_stats()
+    return [
+        ('ratelimit_decisions_total', 'counter', 'Rate limit decisions, by limiter and outcome.', [
+            ('', {'limiter': name, 'outcome': outcome}, counters[outcome])
+            for name, counters in limits['limiters'].items() for outcome in ('allowed', 'limited')
+        ]),
+        ('ratelimit_keys', 'gauge', 'Keys held by the shared rate limit backend.', [('', {}, limits['backend']['keys'])]),
+        ('route_cache_lookups_total', 'counter', 'Cached route lookups, by endpoint and outcome.', [
+            ('', {'endpoint': endpoint, 'outcome': outcome}, counters[outcome])
+            for endpoint, counters in cache.items() for outcome in ('hits', 'misses', 'not_modified', 'bypassed')
+        ]),
+    ]
+
+# Database instrumentation
+
+# The BaseModel operation running in this thread or asyncio task, if any
+_operation = ContextVar('metrics_db_operation', default=None)
+
+# Label the queries run by a model or queryset method with an operation name
+def _label_queries(function, name, model_of):
+    """
+    Wrap a BaseModel classmethod function or QuerySet method so its queries are labelled
+    '<Model>.<name>'. Nested calls keep the outermost label.
+
+    Args:
+        function (callable): The function (the first argument is the model class or the queryset).
+        name (str): The operation name, e.g. 'get' or 'query.count'.
+        model_of (callable): Gets the model class from the first argument.
+
+    Returns:
+        callable: The wrapper.
+    """
+    def operation(owner):
+        return f"{model_of(owner).__name__}.{name}"
+
+    if inspect.isasyncgenfunction(function):
+        @functools.wraps(function)
+        async def wrapper(owner, *args, **kwargs):
+            label = operation(owner)
+            iterator = function(owner, *args, **kwargs).__aiter__()
+            try:
+                while True:
+                    token = _operation.set(label) if _operation.get() is None else None
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        if token is not None:
+                            _operation.reset(token)
+                    yield item
+            finally:
+                await iterator.aclose()  # Closed early (break, aclose() or GC): release its session now
+    elif inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def wrapper(owner, *args, **kwargs):
+            label = operation(owner)
+            iterator = function(owner, *args, **kwargs)
+            try:
+                while True:
+                    token = _operation.set(label) if _operation.get() is None else None
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        if token is not None:
+                            _operation.reset(token)
+                    yield item
+            finally:
+                iterator.close()  # Closed early (break, close() or GC): release its session now
+    elif inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def wrapper(owner, *args, **kwargs):
+            if _operation.get() is not None:
+                return await function(owner, *args, **kwargs)
+            token = _operation.set(operation(owner))
+            try:
+                return await function(owner, *args, **kwargs)
+            finally:
+                _operation.reset(token)
+    else:
+        @functools.wraps(function)
+        def wrapper(owner, *args, **kwargs):
+            if _operation.get() is not None:
+                return function(owner, *args, **kwargs)
+            token = _operation.set(operation(owner))
+            try:
+                return function(owner, *args, **kwargs)
+            finally:
+                _operation.reset(token)
+    return wrapper
+
+# Time every SQL statement of the app's engines
+def instrument_database():
+    """
+    Count and time every SQL statement with engine events, labelled with the BaseModel or
+    QuerySet method that ran it ('other' for direct session use), and export the pool and
+    model cache statistics. Safe to call more than once.
+    """
+    from database.db import BaseModel, get_pool_stats, listen_engines
+    from database.query import QuerySet
+
+    if getattr(BaseModel, '__metrics_instrumented__', False):
+        return
+    BaseModel.__metrics_instrumented__ = True
+
+    for name in MODEL_METHODS:
+        method = BaseModel.__dict__.get(name)
+        if isinstance(method, classmethod):
+            setattr(BaseModel, name, classmethod(_label_queries(method.__func__, name, lambda model: model)))
+    for name in QUERYSET_METHODS:
+        method = QuerySet.__dict__.get(name)
+        if method is not None:
+            setattr(QuerySet, name, _label_queries(method, f'query.{name}', lambda queryset: queryset.model))
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        context._metrics_started_at = time.perf_counter()
+
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, '_metrics_started_at', None)
+        if started_at is not None:
+            operation = _operation.get() or 'other'
+            db_seconds.observe((operation,), time.perf_counter() - started_at)
+            db_total.inc((operation, 'ok'))
+
+    def handle_error(exception_context):
+        if exception_context.execution_context is not None:
+            db_total.inc((_operation.get() or 'other', 'error'))
+
+    listen_engines('before_cursor_execute', before_cursor_execute)
+    listen_engines('after_cursor_execute', after_cursor_execute)
+    listen_engines('handle_error', handle_error)
+
+    @registry.collector
+    def database_families():
+        pool = get_pool_stats()
+        families = [
+            ('db_pool_checkouts_total', 'counter', 'Connections checked out of the pool.', [('', {}, pool['checkouts'])]),
+            ('db_pool_timeouts_total', 'counter', 'Pool checkouts that timed out.', [('', {}, pool['timeouts'])]),
+            ('db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a pooled connection.', [('', {}, pool['wait_total'])]),
+        ]
+        if 'checked_out' in pool:
+            families.append(('db_pool_checked_out', 'gauge', 'Connections currently checked out.', [('', {}, pool['checked_out'])]))
+        caches = [(model.__name__, model.cache_stats()) for model in _models(BaseModel)]
+        families.append(('db_model_cache_lookups_total', 'counter', 'Model cache lookups, by model and outcome.', [
+            ('', {'model': model, 'outcome': outcome}, stats[outcome])
+            for model, stats in caches if stats for outcome in ('hits', 'misses')
+        ]))
+        return families
+
+# Get every model class
+def _models(base):
+    for subclass in base.__subclasses__():
+        yield subclass
+        yield from _models(subclass)
+
+# Render the metrics of this process and of the bot process
+def render_metrics():
+    """
+    Render the metrics of this process, merged with the METRICS_FILE snapshot of the bot
+    process in a web process (BOOT_ROLE=web). A single process running both ('all') already
+    has the bot's families, and the file only holds its own, so it isn't read there.
+
+    Returns:
+        str: The Prometheus text exposition.
+    """
+    extra = read_snapshot() if registry.labels.get('role') == 'web' else []
+    return registry.render(extra)
+
+# Example usage of the metrics helpers (done in config/boot.py when METRICS_ENABLED=true):
+# instrument_database()    # db_queries_total{operation="Users.get",status="ok"} ...
+# init_metrics(app)        # http_request_duration_seconds_bucket{endpoint="api.api_hello",method="GET",le="0.005"} ...
+# install(bot)             # bot_command_duration_seconds_bucket{command="ping",type="slash",le="0.1"} ...
+# render_metrics()         # Served at GET /api/v1/metrics (see routes/api.py)
+#
+# outbox_pending = registry.gauge('outbox_pending', 'Webhooks waiting to be delivered.')
+# outbox_pending.set((), 12)
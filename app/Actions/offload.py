@@ -0,0 +1,231 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from database.db import begin_scope, end_scope
+
+# Define a bounded thread pool for blocking work called from cogs
+class Offloader:
+    """
+    A bounded thread pool that runs blocking calls without stalling the event loop.
+
+    The context of the caller is copied into the worker thread, but each call runs in its own
+    database unit of work: a Session isn't thread-safe, so the worker never shares the caller's
+    (nor another worker's, under asyncio.gather). Pass db_session explicitly to use a specific
+    session. Exceptions raised by the call are re-raised to the awaiting coroutine.
+
+    Attributes:
+        max_workers (int): The number of worker threads.
+        max_pending (int): The number of calls allowed to be queued or running at once.
+        executor (ThreadPoolExecutor): The underlying executor.
+    """
+
+    def __init__(self, max_workers=8, max_pending=None, thread_name_prefix="offload"):
+        """
+        Initializes the Offloader class with the given parameters.
+
+        Args:
+            max_workers (int): The number of worker threads. Defaults to 8.
+            max_pending (int, optional): The number of calls allowed to be queued or running;
+                further callers wait on the event loop. Defaults to 4 * max_workers.
+            thread_name_prefix (str): The prefix of the worker thread names. Defaults to "offload".
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 4
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._slots = None  # Created on first use, inside the event loop
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run a blocking callable in the pool and wait for its result.
+
+        Args:
+            fn (callable): The blocking callable.
+            *args: Positional arguments for the callable.
+            **kwargs: Keyword arguments for the callable.
+
+        Returns:
+            Any: The return value of the callable.
+
+        Raises:
+            Exception: Whatever the callable raised.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        # Callers waiting for a slot count as queued, like the ones waiting for a thread
+        with self._lock:
+            self._queued += 1
+        submitted_at = time.perf_counter()
+        try:
+            await self._slots.acquire()  # Wait for a free slot without blocking the event loop
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+        try:
+            context = contextvars.copy_context()
+            future = self.executor.submit(self._call, context, fn, args, kwargs, submitted_at)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if future.cancel():  # Never started, so _call() didn't count it out of the queue
+                    with self._lock:
+                        self._queued -= 1
+                raise
+        finally:
+            self._slots.release()
+
+    def _call(self, context, fn, args, kwargs, submitted_at):
+        """
+        Run the callable in the caller's context, in a unit of work of its own, and record its timings.
+        """
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            wait = started_at - submitted_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        failed = False
+        try:
+            return context.run(self._in_own_scope, fn, args, kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._failed += failed
+                self._run_total += elapsed
+                self._run_max = max(self._run_max, elapsed)
+
+    @staticmethod
+    def _in_own_scope(fn, args, kwargs):
+        """
+        Call fn in a new database unit of work, closed when it returns.
+        """
+        token = begin_scope()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end_scope(token)
+
+    def stats(self):
+        """
+        Get the queue depth and latency statistics of the pool.
+
+        Returns:
+            dict: The number of queued (waiting for a slot or a thread), running, completed and
+                failed calls, and the average and maximum queue wait and run times in seconds.
+        """
+        with self._lock:
+            completed = self._completed
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'queued': self._queued,
+                'running': self._running,
+                'completed': completed,
+                'failed': self._failed,
+                'wait_avg': self._wait_total / completed if completed else 0.0,
+                'wait_max': self._wait_max,
+                'run_avg': self._run_total / completed if completed else 0.0,
+                'run_max': self._run_max,
+            }
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the pool.
+
+        Args:
+            wait (bool): Whether to wait for running calls to finish. Defaults to True.
+        """
+        self.executor.shutdown(wait=wait)
+
+# The offloader used by run_blocking and @offload
+_default_offloader = None
+_default_lock = threading.Lock()
+
+# Define the function to set the default offloader
+def set_offloader(offloader):
+    """
+    Set the offloader used by run_blocking and @offload (the bot sets its own in config/boot.py).
+
+    Args:
+        offloader (Offloader): The offloader to use.
+    """
+    global _default_offloader
+    _default_offloader = offloader
+
+# Define the function to get the default offloader
+def get_offloader():
+    """
+    Get the default offloader, creating one sized by OFFLOAD_WORKERS if none was set.
+
+    Returns:
+        Offloader: The default offloader.
+    """
+    global _default_offloader
+    if _default_offloader is None:
+        with _default_lock:
+            if _default_offloader is None:
+                workers = int(os.environ.get('OFFLOAD_WORKERS', '').strip() or 8)
+                pending = int(os.environ.get('OFFLOAD_MAX_PENDING', '').strip() or 0) or None
+                _default_offloader = Offloader(max_workers=workers, max_pending=pending)
+    return _default_offloader
+
+# Define the function to run a blocking call from a coroutine
+async def run_blocking(fn, *args, **kwargs):
+    """
+    Run a blocking callable on the default offloader and wait for its result.
+
+    Args:
+        fn (callable): The blocking callable.
+        *args: Positional arguments for the callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        Any: The return value of the callable.
+    """
+    return await get_offloader().run(fn, *args, **kwargs)
+
+# Define the decorator to turn a blocking function into an awaitable one
+def offload(fn):
+    """
+    Decorate a blocking function so calling it returns an awaitable run on the default offloader.
+
+    Args:
+        fn (callable): The blocking function.
+
+    Returns:
+        callable: A coroutine function with the same arguments.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(fn, *args, **kwargs)
+    return wrapper
+
+# Example usage of run_blocking and offload:
+# from app.Actions.webhook import send_webhook
+# response = await run_blocking(send_webhook, url, data)
+#
+# @offload
+# def pay(sender_id, recipient_id, amount):
+#     Users.get(sender_id).transfer(Users.get(recipient_id), amount)
+#
+# await pay(sender.id, recipient.id, 25.0)
\ No newline at end of file
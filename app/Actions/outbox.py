@@ -0,0 +1,574 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from sqlalchemy import select, func, bindparam
+from database.db import unit_of_work, async_unit_of_work
+from app.Models.webhook_outbox import WebhookOutbox
+from app.Actions.webhook import WebhookClient, WebhookSettings
+from app.Actions.shards import RateCounter
+
+# Discord accepts at most 10 embeds per webhook message
+MAX_EMBEDS = 10
+
+# Discord accepts at most 6000 characters across every embed of a message
+MAX_EMBED_CHARS = 6000
+
+# Payload keys that can be merged into one Discord webhook message
+COALESCE_KEYS = {'embeds', 'username', 'avatar_url'}
+
+# Read a numeric setting from environment variables
+def _env_number(name, default, cast=int):
+    value = (os.environ.get(name) or '').strip()
+    return cast(value) if value else default
+
+# Define the function to enqueue a webhook
+def enqueue(url, payload, db_session=None, delay=0):
+    """
+    Queue a webhook for delivery by the outbox worker and return immediately.
+
+    The webhook is stored in the database, so it survives a crash or restart.
+
+    Args:
+        url (str): The webhook URL.
+        payload (dict): The JSON payload.
+        db_session (Session, optional): The database session, to enqueue within a wider transaction. Defaults to None.
+        delay (float, optional): Seconds to wait before the first attempt. Defaults to 0.
+
+    Returns:
+        int: The ID of the queued webhook.
+    """
+    now = time.time()
+    webhook = WebhookOutbox.create(
+        db_session=db_session, url=url, payload=json.dumps(payload), status=WebhookOutbox.PENDING,
+        attempts=0, next_attempt_at=now + delay, created_at=now,
+    )
+    outbox_stats.add(enqueued=1)  # Counted once stored, so a failed INSERT isn't counted
+    return webhook.id
+
+# Define the function to enqueue a webhook without blocking the event loop
+async def aenqueue(url, payload, db_session=None, delay=0):
+    """
+    Queue a webhook for delivery from async code. See enqueue().
+
+    Args:
+        url (str): The webhook URL.
+        payload (dict): The JSON payload.
+        db_session (AsyncSession, optional): The async database session. Defaults to None.
+        delay (float, optional): Seconds to wait before the first attempt. Defaults to 0.
+
+    Returns:
+        int: The ID of the queued webhook.
+    """
+    now = time.time()
+    webhook = await WebhookOutbox.acreate(
+        db_session=db_session, url=url, payload=json.dumps(payload), status=WebhookOutbox.PENDING,
+        attempts=0, next_attempt_at=now + delay, created_at=now,
+    )
+    outbox_stats.add(enqueued=1)
+    return webhook.id
+
+# Define the function to enqueue many webhooks at once
+def enqueue_many(webhooks, db_session=None):
+    """
+    Queue many webhooks with batched INSERTs, for fan-outs.
+
+    Args:
+        webhooks (iterable of tuple): The (url, payload) pairs.
+        db_session (Session, optional): The database session. Defaults to None.
+
+    Returns:
+        int: The number of queued webhooks.
+    """
+    now = time.time()
+    rows = [
+        {'url': url, 'payload': json.dumps(payload), 'status': WebhookOutbox.PENDING,
+         'attempts': 0, 'next_attempt_at': now, 'created_at': now}
+        for url, payload in webhooks
+    ]
+    WebhookOutbox.bulk_create(rows, db_session=db_session, refresh=False)
+    outbox_stats.add(enqueued=len(rows))
+    return len(rows)
+
+# Define the function to retry dead-lettered webhooks
+def requeue_dead(ids=None, db_session=None):
+    """
+    Queue dead-lettered webhooks again, with their attempts reset.
+
+    Args:
+        ids (list of int, optional): The webhooks to requeue. Defaults to every dead webhook.
+        db_session (Session, optional): The database session. Defaults to None.
+
+    Returns:
+        int: The number of requeued webhooks.
+    """
+    table = WebhookOutbox.__table__
+    statement = table.update().where(table.c.status == WebhookOutbox.DEAD)
+    if ids is not None:
+        statement = statement.where(table.c.id.in_(ids))
+    with unit_of_work(db_session) as db_session:
+        result = db_session.execute(statement.values(status=WebhookOutbox.PENDING, attempts=0, next_attempt_at=time.time(), claim=None))
+        db_session.commit()
+        return result.rowcount
+
+# Count the characters of embeds the way Discord does for its per-message limit
+def embed_chars(embeds):
+    """
+    Count the characters of embeds that count towards Discord's 6000-character message limit:
+    titles, descriptions, field names and values, footer texts and author names.
+
+    Args:
+        embeds (list): The embed dicts.
+
+    Returns:
+        int: The number of characters.
+    """
+    def text(value):
+        return len(value) if isinstance(value, str) else 0
+
+    total = 0
+    for embed in embeds:
+        if not isinstance(embed, dict):
+            continue
+        total += text(embed.get('title')) + text(embed.get('description'))
+        for field in embed.get('fields') or ():
+            if isinstance(field, dict):
+                total += text(field.get('name')) + text(field.get('value'))
+        for part, key in (('footer', 'text'), ('author', 'name')):
+            if isinstance(embed.get(part), dict):
+                total += text(embed[part].get(key))
+    return total
+
+# Define a function grouping webhooks into as few messages as possible
+def coalesce(webhooks):
+    """
+    Merge webhooks made only of embeds for the same URL (and username/avatar) into messages of
+    up to 10 embeds and 6000 embed characters. Other webhooks are sent as they are. The order of
+    first appearance is kept.
+
+    Args:
+        webhooks (list): The claimed rows, with id, url and payload.
+
+    Returns:
+        list: (url, payload, rows) per message to send.
+    """
+    messages = []
+    open_messages = {}  # coalesce key -> message still accepting embeds
+    for webhook in webhooks:
+        try:
+            payload = json.loads(webhook.payload)
+        except ValueError:
+            payload = None
+        embeds = payload.get('embeds') if isinstance(payload, dict) else None
+        if not embeds or not isinstance(embeds, list) or len(embeds) > MAX_EMBEDS or not set(payload) <= COALESCE_KEYS:
+            messages.append((webhook.url, payload, [webhook]))
+            continue
+        chars = embed_chars(embeds)
+        if chars > MAX_EMBED_CHARS:
+            messages.append((webhook.url, payload, [webhook]))  # Too big to share a message; Discord will say why
+            continue
+        key = (webhook.url, payload.get('username'), payload.get('avatar_url'))
+        message = open_messages.get(key)
+        if message is not None and len(message[1]['embeds']) + len(embeds) <= MAX_EMBEDS and message[3][0] + chars <= MAX_EMBED_CHARS:
+            message[1]['embeds'].extend(embeds)
+            message[2].append(webhook)
+            message[3][0] += chars
+        else:
+            message = (webhook.url, dict(payload, embeds=list(embeds)), [webhook], [chars])
+            messages.append(message)
+            open_messages[key] = message
+    return [message[:3] for message in messages]
+
+# Define the outbox counters
+class OutboxStats:
+    """
+    Counts the webhooks enqueued and delivered by this process.
+    """
+
+    def __init__(self):
+        """
+        Initializes the OutboxStats class.
+        """
+        self._lock = threading.Lock()
+        self.counters = {'enqueued': 0, 'delivered': 0, 'messages': 0, 'split': 0, 'retried': 0, 'dead': 0, 'batches': 0}
+        self.throughput = RateCounter()
+        self.lag_avg = None  # Seconds between enqueue and delivery, exponentially weighted
+        self.lag_max = 0.0
+
+    def add(self, **counts):
+        """
+        Increase counters.
+
+        Args:
+            **counts: The amount to add per counter name.
+        """
+        with self._lock:
+            for name, count in counts.items():
+                self.counters[name] += count
+            if counts.get('delivered'):
+                self.throughput.add(counts['delivered'])
+
+    def record_lag(self, lag):
+        """
+        Record the time a delivered webhook spent in the outbox.
+
+        Args:
+            lag (float): Seconds between enqueue and delivery.
+        """
+        with self._lock:
+            self.lag_avg = lag if self.lag_avg is None else self.lag_avg * 0.9 + lag * 0.1
+            self.lag_max = max(self.lag_max, lag)
+
+    def snapshot(self):
+        """
+        Get the counters of this process.
+
+        Returns:
+            dict: The counters, deliveries per second and delivery lag.
+        """
+        with self._lock:
+            return dict(
+                self.counters,
+                delivered_per_second=round(self.throughput.rate(), 2),
+                lag_seconds_avg=round(self.lag_avg, 3) if self.lag_avg is not None else None,
+                lag_seconds_max=round(self.lag_max, 3),
+            )
+
+outbox_stats = OutboxStats()
+
+# Define the function to get the outbox metrics
+def get_outbox_stats(db_session=None):
+    """
+    Get the queue depth and lag from the database, and the counters of this process.
+
+    Args:
+        db_session (Session, optional): The database session. Defaults to None.
+
+    Returns:
+        dict: 'queue' (webhooks per status), 'oldest_pending_seconds' (queue lag) and 'worker'.
+    """
+    table = WebhookOutbox.__table__
+    with unit_of_work(db_session) as db_session:
+        rows = db_session.execute(
+            select(table.c.status, func.count(), func.min(table.c.created_at)).group_by(table.c.status)
+        ).all()
+    queue = {status: 0 for status in (WebhookOutbox.PENDING, WebhookOutbox.SENDING, WebhookOutbox.SENT, WebhookOutbox.DEAD)}
+    oldest = None
+    for status, count, created_at in rows:
+        queue[status] = count
+        if status in (WebhookOutbox.PENDING, WebhookOutbox.SENDING) and created_at is not None:
+            oldest = created_at if oldest is None else min(oldest, created_at)
+    return {
+        'queue': queue,
+        'oldest_pending_seconds': round(time.time() - oldest, 3) if oldest is not None else 0.0,
+        'worker': outbox_stats.snapshot(),
+    }
+
+# Define the outbox worker
+class OutboxWorker:
+    """
+    Delivers queued webhooks in the background.
+
+    Each round claims a batch of due webhooks (safe with several workers), merges embed-only
+    webhooks per URL into messages of up to 10 embeds and 6000 embed characters, and sends them
+    concurrently through a pooled WebhookClient. Failures (connection errors, 429 and 5xx) are
+    rescheduled with exponential backoff, honouring Retry-After. A merged message rejected with
+    another 4xx is split and its webhooks sent one by one; webhooks rejected on their own and
+    webhooks out of attempts are dead-lettered. Webhooks claimed by a worker that died are released after `lease` seconds.
+
+    Attributes:
+        concurrency (int): Messages sent at once.
+        batch_size (int): Webhooks claimed per round.
+        poll_interval (float): Seconds to wait when the outbox is empty.
+        max_attempts (int): Attempts before a webhook is dead-lettered.
+        lease (float): Seconds after which a claimed, unfinished webhook is released.
+        retention (float): Seconds delivered webhooks are kept before being deleted.
+    """
+
+    def __init__(self, concurrency=None, batch_size=None, poll_interval=None, max_attempts=None, lease=None, retention=None, client=None):
+        """
+        Initializes the OutboxWorker class, reading unset values from environment variables.
+
+        Args:
+            concurrency (int, optional): OUTBOX_CONCURRENCY, defaults to 8.
+            batch_size (int, optional): OUTBOX_BATCH_SIZE, defaults to 100.
+            poll_interval (float, optional): OUTBOX_POLL_INTERVAL, defaults to 1.
+            max_attempts (int, optional): OUTBOX_MAX_ATTEMPTS, defaults to 8.
+            lease (float, optional): OUTBOX_LEASE, defaults to 300.
+            retention (float, optional): OUTBOX_RETENTION, defaults to 86400.
+            client (WebhookClient, optional): The client. Defaults to one without in-call retries,
+                since retries are rescheduled in the outbox instead.
+        """
+        self.concurrency = concurrency or _env_number('OUTBOX_CONCURRENCY', 8)
+        self.batch_size = batch_size or _env_number('OUTBOX_BATCH_SIZE', 100)
+        self.poll_interval = poll_interval or _env_number('OUTBOX_POLL_INTERVAL', 1.0, float)
+        self.max_attempts = max_attempts or _env_number('OUTBOX_MAX_ATTEMPTS', 8)
+        self.lease = lease or _env_number('OUTBOX_LEASE', 300.0, float)
+        self.retention = retention or _env_number('OUTBOX_RETENTION', 86400.0, float)
+        self.client = client or WebhookClient(WebhookSettings(retries=0, max_backoff=_env_number('OUTBOX_MAX_BACKOFF', 3600.0, float)))
+        self._task = None
+        self._stopping = None
+        self._last_housekeeping = 0.0
+
+    async def _claim(self):
+        """
+        Claim a batch of due webhooks.
+
+        Returns:
+            list: The claimed rows (id, url, payload, attempts, created_at).
+        """
+        table = WebhookOutbox.__table__
+        now = time.time()
+        token = uuid.uuid4().hex
+        async with async_unit_of_work() as db_session:
+            ids = (await db_session.execute(
+                select(table.c.id)
+                .where(table.c.status == WebhookOutbox.PENDING, table.c.next_attempt_at <= now)
+                .order_by(table.c.next_attempt_at, table.c.id)
+                .limit(self.batch_size)
+            )).scalars().all()
+            if not ids:
+                return []
+            # Another worker may have claimed some of them meanwhile; the status check skips those
+            await db_session.execute(
+                table.update()
+                .where(table.c.id.in_(ids), table.c.status == WebhookOutbox.PENDING)
+                .values(status=WebhookOutbox.SENDING, claim=token, claimed_at=now)
+            )
+            rows = (await db_session.execute(
+                select(table.c.id, table.c.url, table.c.payload, table.c.attempts, table.c.created_at)
+                .where(table.c.claim == token)
+                .order_by(table.c.next_attempt_at, table.c.id)
+            )).all()
+            await db_session.commit()
+            return rows
+
+    async def _housekeeping(self):
+        """
+        Release webhooks whose claim expired and delete old delivered webhooks.
+        """
+        table = WebhookOutbox.__table__
+        now = time.time()
+        async with async_unit_of_work() as db_session:
+            await db_session.execute(
+                table.update()
+                .where(table.c.status == WebhookOutbox.SENDING, table.c.claimed_at < now - self.lease)
+                .values(status=WebhookOutbox.PENDING, claim=None)
+            )
+            await db_session.execute(
+                table.delete().where(table.c.status == WebhookOutbox.SENT, table.c.sent_at < now - self.retention)
+            )
+            await db_session.commit()
+        self._last_housekeeping = now
+
+    async def _send(self, url, payload, semaphore):
+        """
+        Send one message.
+
+        Returns:
+            tuple: (response, error) where one of them is None.
+        """
+        async with semaphore:
+            try:
+                return await self.client.post(url, payload), None
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}"
+
+    def _outcome(self, rows, response, error, now):
+        """
+        Decide what happens to the webhooks of a message after an attempt.
+
+        Never raises: the message may already have been delivered, so a webhook left in SENDING
+        would be sent again once its lease expires. If the decision fails (e.g. on an unexpected
+        response header), delivered webhooks are marked sent and the others are retried after
+        max_backoff.
+
+        Returns:
+            list: The parameters of the UPDATE of each webhook.
+        """
+        try:
+            return self._decide(rows, response, error, now)
+        except Exception as e:
+            print(f"Outbox failed to settle {len(rows)} webhook(s), using the fallback: {e}")
+            delivered = response is not None and response.ok
+            params = []
+            for row in rows:
+                attempts = row.attempts + 1
+                if delivered:
+                    status, next_attempt_at, sent_at = WebhookOutbox.SENT, now, now
+                elif attempts < self.max_attempts:
+                    status, next_attempt_at, sent_at = WebhookOutbox.PENDING, now + self.client.settings.max_backoff, None
+                else:
+                    status, next_attempt_at, sent_at = WebhookOutbox.DEAD, now, None
+                params.append({'b_id': row.id, 'b_status': status, 'b_attempts': attempts, 'b_next_attempt_at': next_attempt_at,
+                               'b_sent_at': sent_at, 'b_last_error': None if delivered else (error or f"{type(e).__name__}: {e}")})
+            return params
+
+    def _decide(self, rows, response, error, now):
+        """
+        Work out the new status of the webhooks of a message after an attempt (see _outcome()).
+
+        Returns:
+            list: The parameters of the UPDATE of each webhook.
+        """
+        if response is not None and response.ok:
+            for row in rows:
+                outbox_stats.record_lag(now - row.created_at)
+            return [
+                {'b_id': row.id, 'b_status': WebhookOutbox.SENT, 'b_attempts': row.attempts + 1,
+                 'b_next_attempt_at': now, 'b_sent_at': now, 'b_last_error': None}
+                for row in rows
+            ]
+        retry_after = None
+        if response is not None:
+            error = f"HTTP {response.status_code}: {response.text[:500]}"
+            retry_after = response.headers.get('Retry-After') if response.status_code == 429 else None
+        transient = response is None or response.status_code == 429 or response.status_code >= 500
+        params = []
+        for row in rows:
+            attempts = row.attempts + 1
+            if transient and attempts < self.max_attempts:
+                delay = self.client.settings.delay(attempts, retry_after)
+                status, next_attempt_at = WebhookOutbox.PENDING, now + (delay if delay is not None else self.client.settings.max_backoff)
+            else:
+                status, next_attempt_at = WebhookOutbox.DEAD, now
+            params.append({'b_id': row.id, 'b_status': status, 'b_attempts': attempts,
+                           'b_next_attempt_at': next_attempt_at, 'b_sent_at': None, 'b_last_error': error})
+        return params
+
+    async def drain_once(self):
+        """
+        Run one delivery round.
+
+        Returns:
+            int: The number of webhooks handled.
+        """
+        if time.time() - self._last_housekeeping > min(60.0, self.lease):
+            await self._housekeeping()
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        messages = coalesce(rows)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._send(url, payload, semaphore) for url, payload, _ in messages))
+
+        # A merged message rejected with a 4xx may hold a single bad embed, so its webhooks are
+        # sent again one by one and only the ones rejected on their own are dead-lettered
+        outcomes = []
+        split = []
+        for (url, _, message_rows), (response, error) in zip(messages, results):
+            if len(message_rows) > 1 and response is not None and 400 <= response.status_code < 500 and response.status_code != 429:
+                split.extend((url, json.loads(row.payload), [row]) for row in message_rows)
+            else:
+                outcomes.append((message_rows, response, error))
+        if split:
+            split_results = await asyncio.gather(*(self._send(url, payload, semaphore) for url, payload, _ in split))
+            outcomes.extend((message_rows, response, error) for (_, _, message_rows), (response, error) in zip(split, split_results))
+
+        now = time.time()
+        params = []
+        for message_rows, response, error in outcomes:
+            params.extend(self._outcome(message_rows, response, error, now))
+
+        table = WebhookOutbox.__table__
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam('b_id'))
+            .values(status=bindparam('b_status'), attempts=bindparam('b_attempts'), claim=None,
+                    next_attempt_at=bindparam('b_next_attempt_at'), sent_at=bindparam('b_sent_at'),
+                    last_error=bindparam('b_last_error'))
+        )
+        async with async_unit_of_work() as db_session:
+            await db_session.execute(statement, params)
+            await db_session.commit()
+
+        statuses = [param['b_status'] for param in params]
+        outbox_stats.add(
+            batches=1,
+            messages=len(messages) + len(split),
+            split=len(split),
+            delivered=statuses.count(WebhookOutbox.SENT),
+            retried=statuses.count(WebhookOutbox.PENDING),
+            dead=statuses.count(WebhookOutbox.DEAD),
+        )
+        return len(rows)
+
+    async def run(self):
+        """
+        Deliver webhooks until stop() is called, waiting poll_interval whenever the outbox is empty.
+        """
+        self._stopping = asyncio.Event()
+        while not self._stopping.is_set():
+            try:
+                handled = await self.drain_once()
+            except Exception as e:
+                print(f"Outbox worker error: {e}")
+                handled = 0
+            if not handled:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        """
+        Start the worker as a task of the running event loop.
+
+        Returns:
+            asyncio.Task: The worker task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    def start_in_thread(self):
+        """
+        Start the worker in a daemon thread with its own event loop, for processes without one.
+
+        Returns:
+            threading.Thread: The worker thread.
+        """
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), name='outbox', daemon=True)
+        thread.start()
+        return thread
+
+    async def stop(self):
+        """
+        Stop the worker after its current round and close its connections.
+        """
+        if self._stopping is not None:
+            self._stopping.set()
+        if self._task is not None:
+            await self._task
+        await self.client.close()
+
+# Define the function to attach the worker to a bot
+def install(bot, worker=None):
+    """
+    Start an outbox worker on the bot's event loop once it is ready.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        worker (OutboxWorker, optional): The worker. Defaults to one configured from the environment.
+
+    Returns:
+        OutboxWorker: The worker.
+    """
+    worker = worker or OutboxWorker()
+
+    async def on_ready():
+        worker.start()
+
+    bot.add_listener(on_ready)
+    return worker
+
+# Example usage of the outbox:
+# enqueue("https://discord.com/api/webhooks/...", {"embeds": [{"title": "Level up!"}]})
+# await aenqueue(url, {"content": "Hello"})
+# enqueue_many((user.webhook_url, {"embeds": [embed.to_dict()]}) for user in subscribers)
+#
+# get_outbox_stats()   # {'queue': {'pending': 120, 'dead': 2, ...}, 'oldest_pending_seconds': 1.4, 'worker': {...}}
+# requeue_dead()       # Retry every dead-lettered webhook
@@ -1,4 +1,10 @@
+import asyncio
+import inspect
+import math
+import os
+from collections import OrderedDict
 import disnake
+from app.Actions.offload import run_blocking
 
 # Define a dummy response function
 async def invalid_response(interaction):
@@ -10,21 +16,151 @@ async def invalid_response(interaction):
     """
     await interaction.response.send_message("Hmm? Seem like you are not the sender of this command!", ephemeral=True)
 
+# Define a page provider backed by keyset queries on a model
+class KeysetPages:
+    """
+    A page provider reading a model page by page with keyset pagination (BaseModel.apaginate).
+
+    Only the ID where each visited page ends is remembered, so nothing but the visible rows is
+    held in memory. A page costs one indexed query, plus one over IDs only to find where a page
+    that wasn't reached by its neighbour starts.
+
+    Attributes:
+        model (BaseModel): The model to page through, ordered by ID.
+        render (function): Called with (rows, page) and returning the page content (str or Embed).
+        per_page (int): The number of rows per page.
+        columns (list of str): Load only these columns (and 'id'), or None for whole instances.
+        filters (dict): The attributes to filter by.
+    """
+
+    def __init__(self, model, render, per_page=10, columns=None, **filters):
+        """
+        Initializes the KeysetPages class with the given parameters.
+
+        Args:
+            model (BaseModel): The model to page through.
+            render (function): Called with (rows, page) and returning the page content.
+            per_page (int): The number of rows per page. Defaults to 10.
+            columns (list of str, optional): Load only these columns (and 'id'). Defaults to None.
+            **filters: The attributes to filter by.
+        """
+        self.model = model
+        self.render = render
+        self.per_page = per_page
+        self.columns = columns
+        self.filters = filters
+        self._cursors = {1: None}  # page -> ID the page starts after
+        self._rows = None  # The number of rows, once page_count() has counted them
+
+    async def page_count(self):
+        """
+        Count the pages with a single SELECT count(*).
+
+        Returns:
+            int: The number of pages.
+        """
+        self._rows = await self.model.query().filter(**self.filters).acount()
+        return max(1, math.ceil(self._rows / self.per_page))
+
+    def cursor(self, page):
+        """
+        Get the keyset cursor of a page, to resume paging there later with seek().
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            int: The ID the page starts after, or None for page 1 and pages not reached yet.
+        """
+        return self._cursors.get(page)
+
+    def seek(self, page, cursor):
+        """
+        Restore the keyset cursor of a page, e.g. from the custom ID of a persistent paginator.
+
+        Args:
+            page (int): The page number.
+            cursor (int): The ID the page starts after, as returned by cursor().
+        """
+        self._cursors[page] = cursor
+
+    async def _locate(self, page):
+        """
+        Find the ID a page starts after with one query, from the nearest known cursor.
+
+        The ID is read with an OFFSET over IDs only, forward from the closest cursor before the
+        page, or backward from the closest cursor after it or from the end of the rows once
+        page_count() has counted them, whichever skips fewer rows.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            bool: False if the page is past the end.
+        """
+        if page in self._cursors:
+            return True
+        ids = self.model.query().filter(**self.filters).only('id')
+        below = max(known for known in self._cursors if known < page)
+        forward = ids.order_by('id') if self._cursors[below] is None else ids.filter(id__gt=self._cursors[below]).order_by('id')
+        candidates = [(self.per_page * (page - below) - 1, forward)]
+        above = min((known for known in self._cursors if known > page), default=None)
+        if above is not None:
+            candidates.append((self.per_page * (above - page), ids.filter(id__lte=self._cursors[above]).order_by('-id')))
+        if self._rows is not None:
+            remaining = self._rows - (page - 1) * self.per_page
+            if remaining <= 0:
+                return False
+            candidates.append((remaining, ids.order_by('-id')))
+        candidates.sort(key=lambda candidate: candidate[0])
+        for offset, query in candidates:
+            row = await query.offset(offset).afirst()
+            if row is not None:
+                self._cursors[page] = row.id
+                return True
+            if query is forward:
+                return False
+        return False
+
+    async def __call__(self, page):
+        """
+        Get the content of a page.
+
+        Args:
+            page (int): The page number, starting at 1.
+
+        Returns:
+            str or disnake.Embed: The page content, or None past the last page.
+        """
+        if not await self._locate(page):
+            return None
+        rows = await self.model.apaginate(after_id=self._cursors[page], limit=self.per_page, columns=self.columns, **self.filters)
+        if not rows:
+            return None
+        self._cursors[page + 1] = rows[-1].id
+        return self.render(rows, page)
+
 # Define a Paginator class
 class Paginator:
     """
     A class to create a paginated embed view.
 
+    Pages come from a list of segments, a page provider called with a page number (sync or
+    async, e.g. KeysetPages), or an async iterator of segments. Only the visible page is
+    rendered, plus a small LRU of neighbouring pages that are prefetched in the background.
+    Segments pulled from an async iterator are kept, since it can't be rewound.
+
     Attributes:
-        segments (list): The list of segments to be paginated.
         title (str): The default title of the embed.
         color (int): The default color of the embed.
         prefix (str): The default prefix of the embed description.
         suffix (str): The default suffix of the embed description.
-        target_page (int): The default target page.
+        current_page (int): The page currently shown.
         timeout (int): The default timeout for the view.
         button_style (disnake.ButtonStyle): The default button style.
         invalid_user_function (function): The function to call for invalid user interactions.
+        cache_size (int): The number of rendered pages kept.
+        view (PaginatorView): The view of the paginator once started.
     """
 
     def __init__(
@@ -38,12 +174,16 @@ class Paginator:
             timeout=300,  # Define the default timeout
             button_style=disnake.ButtonStyle.gray,  # Define the default button style
             invalid_user_function=invalid_response,  # Define the default invalid user function
+            page_count=None,  # Define the number of pages of a page provider, if known
+            cache_size=5,  # Define the number of rendered pages kept
         ):
         """
-        Initializes the create class with the given parameters.
+        Initializes the Paginator class with the given parameters.
 
         Args:
-            segments (list): The list of segments to be paginated.
+            segments (list, function or async iterator): The pages: a list of segments (str or
+                Embed), a function called with a page number (starting at 1) returning a
+                segment or None past the last page, or an async iterator of segments.
             title (str): The default title of the embed.
             color (int): The default color of the embed.
             prefix (str): The default prefix of the embed description.
@@ -52,170 +192,262 @@ class Paginator:
             timeout (int): The default timeout for the view.
             button_style (disnake.ButtonStyle): The default button style.
             invalid_user_function (function): The function to call for invalid user interactions.
+            page_count (int, optional): The number of pages of a page provider. When omitted it is
+                read from the provider's page_count() if it has one, else discovered while paging.
+            cache_size (int): The number of rendered pages kept. Defaults to 5.
         """
-        self.embeds = []
+        self.title = title
+        self.color = color
+        self.prefix = prefix
+        self.suffix = suffix
         self.current_page = target_page
         self.timeout = timeout
         self.button_style = button_style
         self.invalid_user_function = invalid_user_function
+        self.cache_size = cache_size
+        self.view = None
 
-        # Loop through the segments
-        for segment in segments:
-            if isinstance(segment, disnake.Embed):
-                self.embeds.append(segment)
-            else:
-                self.embeds.append(
-                    disnake.Embed(
-                        title=title,
-                        color=color,
-                        description=prefix + segment + suffix,
-                    ),
-                )
-        # Check if the target page is greater than the length of the segments
-        if self.current_page > len(segments) or self.current_page < 1:
+        self._provider = None
+        self._iterator = None
+        self._pulled = []
+        if hasattr(segments, '__aiter__'):
+            self._iterator = segments.__aiter__()
+        elif callable(segments):
+            self._provider = segments
+        else:
+            self._pulled = list(segments)
+            page_count = len(self._pulled)
+        self.page_count = page_count
+        self._pages = OrderedDict()  # page -> rendered embed, least recently used first
+        self._loading = {}  # page -> task rendering it
+        self._prefetch_task = None
+
+    async def _segment(self, page):
+        """
+        Get the segment of a page from the source.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            str or disnake.Embed: The segment, or None past the last page.
+        """
+        if self._provider is not None:
+            if inspect.iscoroutinefunction(self._provider) or inspect.iscoroutinefunction(getattr(self._provider, '__call__', None)):
+                return await self._provider(page)
+            # A plain function may block (e.g. a database query), so it runs in the offload pool
+            return await run_blocking(self._provider, page)
+        while self._iterator is not None and len(self._pulled) < page:
+            try:
+                self._pulled.append(await self._iterator.__anext__())
+            except StopAsyncIteration:
+                self._iterator = None
+                self.page_count = len(self._pulled)
+        return self._pulled[page - 1] if 1 <= page <= len(self._pulled) else None
+
+    async def _render(self, page):
+        """
+        Build the embed of a page.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            disnake.Embed: The embed, or None past the last page.
+        """
+        segment = await self._segment(page)
+        if segment is None or isinstance(segment, disnake.Embed):
+            return segment
+        return disnake.Embed(title=self.title, color=self.color, description=self.prefix + segment + self.suffix)
+
+    async def page(self, page):
+        """
+        Get the embed of a page, from the LRU of rendered pages when possible.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            disnake.Embed: The embed, or None past the last page.
+        """
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+        task = self._loading.get(page)
+        if task is None:
+            task = self._loading[page] = asyncio.ensure_future(self._render(page))
+            task.add_done_callback(lambda _: self._loading.pop(page, None))
+        embed = await asyncio.shield(task)
+        if embed is not None:
+            self._pages[page] = embed
+            self._pages.move_to_end(page)
+            while len(self._pages) > self.cache_size:
+                self._pages.popitem(last=False)
+        return embed
+
+    async def _prefetch(self, page):
+        """
+        Render the neighbours of a page into the LRU.
+
+        Args:
+            page (int): The page number.
+        """
+        for neighbour in (page + 1, page - 1):
+            if neighbour >= 1 and (self.page_count is None or neighbour <= self.page_count):
+                try:
+                    await self.page(neighbour)
+                except Exception:
+                    return  # Prefetching is best effort; a real failure surfaces on click
+
+    def prefetch(self, page):
+        """
+        Start rendering the neighbours of a page in the background.
+
+        Args:
+            page (int): The page number.
+        """
+        if self.cache_size > 1 and (self._prefetch_task is None or self._prefetch_task.done()):
+            self._prefetch_task = asyncio.ensure_future(self._prefetch(page))
+
+    def label(self):
+        """
+        Get the text of the page button.
+
+        Returns:
+            str: The current page and the page count, '?' while it is unknown.
+        """
+        return f"{self.current_page}/{self.page_count if self.page_count is not None else '?'}"
+
+    def target(self, action):
+        """
+        Get the page a navigation button leads to.
+
+        The first and last buttons jump 10 pages on paginators of 15 pages or more (or of unknown
+        length), and go to the first/last page otherwise.
+
+        Args:
+            action (str): 'first', 'previous', 'next' or 'last'.
+
+        Returns:
+            int: The page number, before wrapping around.
+        """
+        long = self.page_count is None or self.page_count >= 15
+        if action == 'first':
+            page = self.current_page - 10 if long else 1
+        elif action == 'previous':
+            page = self.current_page - 1
+        elif action == 'next':
+            page = self.current_page + 1
+        else:
+            page = self.current_page + 10 if long else self.page_count
+        # Sources of unknown length can't wrap backwards
+        return max(1, page) if self.page_count is None else page
+
+    async def move(self, page):
+        """
+        Show another page, wrapping around at both ends.
+
+        Args:
+            page (int): The page number to show.
+
+        Returns:
+            disnake.Embed: The embed of the page now shown.
+        """
+        if self.page_count is not None:
+            page = (page - 1) % self.page_count + 1
+        page = max(1, page)
+        embed = await self.page(page)
+        if embed is None:
+            # Ran past the end of a source of unknown length: the last page is found on the way
+            last = self.current_page
+            for candidate in range(self.current_page + 1, page):
+                if await self.page(candidate) is None:
+                    break
+                last = candidate
+            self.page_count = last
+            page = 1 if last == self.current_page else last
+            embed = await self.page(page)
+        self.current_page = page
+        self.prefetch(page)
+        return embed
+
+    async def _read_page_count(self):
+        """
+        Read the page count of the provider if it has one and it isn't known yet.
+        """
+        if self.page_count is None and hasattr(self._provider, 'page_count'):
+            self.page_count = await self._provider.page_count()
+
+    async def _first_page(self):
+        """
+        Read the page count of the provider if needed and render the target page.
+
+        Returns:
+            disnake.Embed: The embed of the target page (page 1 if the target doesn't exist).
+
+        Raises:
+            ValueError: If there are no pages.
+        """
+        await self._read_page_count()
+        if self.page_count is not None and not 1 <= self.current_page <= self.page_count:
             self.current_page = 1
+        embed = await self.page(self.current_page)
+        if embed is None and self.current_page != 1:
+            self.current_page = 1
+            embed = await self.page(1)
+        if embed is None:
+            raise ValueError("Paginator has no pages")
+        return embed
 
-        # Define a PaginatorView class
-        class PaginatorView(disnake.ui.View):
-            """
-            A class to create a paginated view with buttons.
-
-            Attributes:
-                interaction (disnake.Interaction): The interaction object.
-            """
-
-            def __init__(this, interaction):
-                """
-                Initializes the PaginatorView class with the given interaction.
-
-                Args:
-                    interaction (disnake.Interaction): The interaction object.
-                """
-                super().__init__()
-                this.timeout = self.timeout
-                this.interaction = interaction
-
-            # Define an on_timeout function
-            async def on_timeout(this):
-                """
-                Disables all buttons when the view times out.
-                """
-                for button in this.children:
-                    button.disabled = True
-                await this.interaction.edit_original_message(view=this)
-                return await super().on_timeout()
-
-            # Define an update_page function
-            def update_page(this):
-                """
-                Updates the page number on the page button.
-                """
-                for button in this.children:
-                    if button.label:
-                        if button.label.strip() != "":
-                            button.label = f"{self.current_page}/{len(self.embeds)}"
-
-            # Define the first button - first button
-            @disnake.ui.button(emoji="⏪", style=self.button_style, disabled=True if len(self.embeds) == 1 else False)
-            async def first_button(this, _, button_interaction):
-                """
-                Handles the first button click event.
-
-                Args:
-                    button_interaction (disnake.Interaction): The interaction object.
-                """
-                if button_interaction.author != this.interaction.author:
-                    await self.invalid_user_function(button_interaction)
-                    return
-
-                # Check if the length of the embeds is greater than or equal to 15
-                if len(self.embeds) >= 15:
-                    self.current_page = (self.current_page - 10) % len(self.embeds)
-                    if self.current_page < 1:
-                        self.current_page = len(self.embeds)
-                    if self.current_page == 0:
-                        self.current_page = 1
-                else:
-                    self.current_page = 1
-                this.update_page()
-                await button_interaction.response.edit_message(embed=self.embeds[self.current_page-1], view=this)
-
-            # Define the second button - previous button
-            @disnake.ui.button(emoji="◀️", style=self.button_style, disabled=True if len(self.embeds) == 1 else False)
-            async def previous_button(this, _, button_interaction):
-                """
-                Handles the previous button click event.
-
-                Args:
-                    button_interaction (disnake.Interaction): The interaction object.
-                """
-                if button_interaction.author != this.interaction.author:
-                    await self.invalid_user_function(button_interaction)
-                    return
-
-                # Check if the current page is less than 1
-                self.current_page -= 1
-                if self.current_page < 1:
-                    self.current_page = len(self.embeds)
-                this.update_page()
-                await button_interaction.response.edit_message(embed=self.embeds[self.current_page-1], view=this)
-
-            # Define the third button - page button
-            @disnake.ui.button(label=f"{self.current_page}/{len(self.embeds)}", style=disnake.ButtonStyle.gray, disabled=True)
-            async def page_button(*_):
-                """
-                Handles the page button click event (does nothing).
-                """
-                pass
-
-            # Define the fourth button - next button
-            @disnake.ui.button(emoji="▶️", style=self.button_style, disabled=True if len(self.embeds) == 1 else False)
-            async def next_button(this, _, button_interaction):
-                """
-                Handles the next button click event.
-
-                Args:
-                    button_interaction (disnake.Interaction): The interaction object.
-                """
-                if button_interaction.author != this.interaction.author:
-                    await self.invalid_user_function(button_interaction)
-                    return
-
-                # Check if the current page is greater than the length of the embeds
-                self.current_page += 1
-                if self.current_page > len(self.embeds):
-                    self.current_page = 1
-                this.update_page()
-                await button_interaction.response.edit_message(embed=self.embeds[self.current_page-1], view=this)
-
-            # Define the fifth button - last button
-            @disnake.ui.button(emoji="⏩", style=self.button_style, disabled=True if len(self.embeds) == 1 else False)
-            async def last_button(this, _, button_interaction):
-                """
-                Handles the last button click event.
-
-                Args:
-                    button_interaction (disnake.Interaction): The interaction object.
-                """
-                if button_interaction.author != this.interaction.author:
-                    await self.invalid_user_function(button_interaction)
-                    return
-                # Check if the length of the embeds is greater than or equal to 15
-                if len(self.embeds) >= 15:
-                    self.current_page = (self.current_page + 10) % len(self.embeds)
-                    if self.current_page > len(self.embeds):
-                        self.current_page = 1
-                    if self.current_page == 0:
-                        self.current_page = len(self.embeds)
-                else:
-                    self.current_page = len(self.embeds)
-                this.update_page()
-                await button_interaction.response.edit_message(embed=self.embeds[self.current_page-1], view=this)
-
-        self.view = PaginatorView
+    def release(self):
+        """
+        Drop the rendered pages and stop prefetching, once the paginator is no longer shown.
+        """
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        self._pages.clear()
+
+    def persistent_components(self, source, argument, author_id, disabled=False):
+        """
+        Build the buttons of a persistent paginator.
+
+        The whole state of the paginator (page source, argument, author and page) is stored in
+        the custom IDs of the buttons, so clicks keep working after a restart and nothing is
+        kept in memory between them. The page is stored as '<page>@<cursor>' when the provider
+        has a keyset cursor for it (see KeysetPages.cursor), so the next click starts from there
+        instead of paging again from the first page.
+
+        Args:
+            source (str): The name of the page source registered with @page_source.
+            argument (str): The argument passed to the page source.
+            author_id (int): The ID of the user allowed to use the buttons.
+            disabled (bool): Whether the navigation buttons are disabled. Defaults to False.
+
+        Returns:
+            list: The buttons.
+
+        Raises:
+            ValueError: If the state doesn't fit in a custom ID (100 characters).
+        """
+        page = str(self.current_page)
+        cursor = self._provider.cursor(self.current_page) if hasattr(self._provider, 'cursor') else None
+        if cursor is not None:
+            page += f"@{cursor}"
+        prefix = f"{PERSISTENT_PREFIX}:{source}:{author_id}:{page}"
+        disabled = disabled or self.page_count == 1
+        buttons = []
+        for action, emoji in (('first', "⏪"), ('previous', "◀️"), ('page', None), ('next', "▶️"), ('last', "⏩")):
+            custom_id = f"{prefix}:{action}:{argument}"
+            if len(custom_id) > 100:
+                raise ValueError(f"Persistent paginator state is too long for a custom ID: {custom_id!r}")
+            if action == 'page':
+                buttons.append(disnake.ui.Button(label=self.label(), style=disnake.ButtonStyle.gray, disabled=True, custom_id=custom_id))
+            else:
+                buttons.append(disnake.ui.Button(emoji=emoji, style=self.button_style, disabled=disabled, custom_id=custom_id))
+        return buttons
 
     # Define a start function
-    async def start(self, interaction, ephemeral=False, deferred=False):
+    async def start(self, interaction, ephemeral=False, deferred=False, persistent=None, argument=''):
         """
         Starts the pagination interaction.
 
@@ -223,14 +455,359 @@ class Paginator:
             interaction (disnake.Interaction): The interaction object.
             ephemeral (bool): Whether the message should be ephemeral.
             deferred (bool): Whether the interaction is deferred.
+            persistent (str, optional): The name of a page source registered with @page_source.
+                The paginator then never times out and survives restarts, and no view is kept
+                in memory. Defaults to None.
+            argument (str): The argument passed to the page source, e.g. a guild ID. Defaults to ''.
+
+        Raises:
+            ValueError: If there are no pages.
         """
+        embed = await self._first_page()
+        if persistent is not None:
+            message = {'embed': embed, 'components': self.persistent_components(persistent, argument, interaction.author.id)}
+            self.release()
+        else:
+            self.view = PaginatorView(self, interaction)
+            message = {'embed': embed, 'view': self.view}
+            evicted = registry.register(self.view)
+
         # Check if the interaction is deferred
         if not deferred:
-            await interaction.response.send_message(embed=self.embeds[self.current_page-1], view=self.view(interaction), ephemeral=ephemeral)
+            await interaction.response.send_message(ephemeral=ephemeral, **message)
         else:
-            await interaction.edit_original_message(embed=self.embeds[self.current_page-1], view=self.view(interaction))
-            
+            await interaction.edit_original_message(**message)
+
+        if persistent is None:
+            self.prefetch(self.current_page)
+            for view in evicted:
+                await view.close()
+
+# Define a PaginatorView class
+class PaginatorView(disnake.ui.View):
+    """
+    A class to create a paginated view with buttons.
+
+    Attributes:
+        paginator (Paginator): The paginator shown by the view.
+        interaction (disnake.Interaction): The interaction object.
+        user_id (int): The ID of the user who opened the paginator.
+        closed (bool): Whether the view was closed (timed out or evicted).
+    """
+
+    def __init__(self, paginator, interaction):
+        """
+        Initializes the PaginatorView class with the given paginator and interaction.
+
+        Args:
+            paginator (Paginator): The paginator shown by the view.
+            interaction (disnake.Interaction): The interaction object.
+        """
+        super().__init__(timeout=paginator.timeout)
+        self.paginator = paginator
+        self.interaction = interaction
+        self.user_id = interaction.author.id
+        self.closed = False
+        single_page = paginator.page_count == 1
+        for button in (self.first_button, self.previous_button, self.next_button, self.last_button):
+            button.style = paginator.button_style
+            button.disabled = single_page
+        self.update_page()
+
+    # Define a function to close the view
+    async def close(self, reason='evicted'):
+        """
+        Disables all buttons, stops listening for clicks and releases the paginator.
+
+        Args:
+            reason (str): 'evicted' or 'timeout', counted in the registry metrics.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        registry.unregister(self, reason)
+        self.stop()
+        self.paginator.release()
+        for button in self.children:
+            button.disabled = True
+        try:
+            await self.interaction.edit_original_message(view=self)
+        except disnake.HTTPException:
+            pass  # The message was deleted or the interaction token expired
+
+    # Define an on_timeout function
+    async def on_timeout(self):
+        """
+        Disables all buttons when the view times out.
+        """
+        await self.close('timeout')
+        return await super().on_timeout()
+
+    # Define an update_page function
+    def update_page(self):
+        """
+        Updates the page number on the page button.
+        """
+        self.page_button.label = self.paginator.label()
+
+    # Define a function to show another page
+    async def show(self, button_interaction, action):
+        """
+        Shows another page in response to a button click.
+
+        Args:
+            button_interaction (disnake.Interaction): The interaction object.
+            action (str): 'first', 'previous', 'next' or 'last'.
+        """
+        if button_interaction.author != self.interaction.author:
+            await self.paginator.invalid_user_function(button_interaction)
+            return
+        embed = await self.paginator.move(self.paginator.target(action))
+        self.update_page()
+        await button_interaction.response.edit_message(embed=embed, view=self)
+
+    # Define the first button - first button
+    @disnake.ui.button(emoji="⏪")
+    async def first_button(self, _, button_interaction):
+        """
+        Handles the first button click event.
+
+        Args:
+            button_interaction (disnake.Interaction): The interaction object.
+        """
+        await self.show(button_interaction, 'first')
+
+    # Define the second button - previous button
+    @disnake.ui.button(emoji="◀️")
+    async def previous_button(self, _, button_interaction):
+        """
+        Handles the previous button click event.
+
+        Args:
+            button_interaction (disnake.Interaction): The interaction object.
+        """
+        await self.show(button_interaction, 'previous')
+
+    # Define the third button - page button
+    @disnake.ui.button(label="1/1", style=disnake.ButtonStyle.gray, disabled=True)
+    async def page_button(self, *_):
+        """
+        Handles the page button click event (does nothing).
+        """
+        pass
+
+    # Define the fourth button - next button
+    @disnake.ui.button(emoji="▶️")
+    async def next_button(self, _, button_interaction):
+        """
+        Handles the next button click event.
+
+        Args:
+            button_interaction (disnake.Interaction): The interaction object.
+        """
+        await self.show(button_interaction, 'next')
+
+    # Define the fifth button - last button
+    @disnake.ui.button(emoji="⏩")
+    async def last_button(self, _, button_interaction):
+        """
+        Handles the last button click event.
+
+        Args:
+            button_interaction (disnake.Interaction): The interaction object.
+        """
+        await self.show(button_interaction, 'last')
+
+# Define the registry of active paginator views
+class PaginatorRegistry:
+    """
+    Tracks the open paginator views and caps how many can be alive.
+
+    When a new view would exceed the per-user or the global cap, the oldest view (of that user,
+    respectively overall) is evicted early: its buttons are disabled and its pages released.
+
+    Attributes:
+        max_active (int): The maximum number of open views.
+        max_per_user (int): The maximum number of open views per user.
+    """
+
+    def __init__(self, max_active=1000, max_per_user=3):
+        """
+        Initializes the PaginatorRegistry class with the given caps.
+
+        Args:
+            max_active (int): The maximum number of open views. Defaults to 1000.
+            max_per_user (int): The maximum number of open views per user. Defaults to 3.
+        """
+        self.max_active = max_active
+        self.max_per_user = max_per_user
+        self._views = OrderedDict()  # view id -> view, oldest first
+        self._by_user = {}  # user id -> list of views, oldest first
+        self.peak = 0
+        self.opened = 0
+        self.evicted = 0
+        self.timed_out = 0
+        self.persistent_clicks = 0
+
+    def register(self, view):
+        """
+        Add a view, evicting the oldest views beyond the caps.
+
+        Args:
+            view (PaginatorView): The new view.
+
+        Returns:
+            list: The evicted views, to close (done by Paginator.start).
+        """
+        evicted = []
+        user_views = self._by_user.setdefault(view.user_id, [])
+        while len(user_views) >= self.max_per_user:
+            evicted.append(self._remove(user_views[0]))
+        while len(self._views) >= self.max_active:
+            evicted.append(self._remove(next(iter(self._views.values()))))
+        self._views[view.id] = view
+        self._by_user.setdefault(view.user_id, []).append(view)
+        self.opened += 1
+        self.evicted += len(evicted)
+        self.peak = max(self.peak, len(self._views))
+        return evicted
+
+    def _remove(self, view):
+        """
+        Forget a view.
+
+        Args:
+            view (PaginatorView): The view.
+
+        Returns:
+            PaginatorView: The view.
+        """
+        self._views.pop(view.id, None)
+        user_views = self._by_user.get(view.user_id)
+        if user_views is not None:
+            if view in user_views:
+                user_views.remove(view)
+            if not user_views:
+                del self._by_user[view.user_id]
+        return view
+
+    def unregister(self, view, reason):
+        """
+        Forget a closed view.
+
+        Args:
+            view (PaginatorView): The view.
+            reason (str): 'evicted' or 'timeout'.
+        """
+        if view.id in self._views:
+            self._remove(view)
+            if reason == 'timeout':
+                self.timed_out += 1
+
+    def stats(self):
+        """
+        Get the registry metrics.
+
+        Returns:
+            dict: The open views, users with open views, caps and lifetime counters.
+        """
+        return {
+            'active': len(self._views),
+            'users': len(self._by_user),
+            'peak': self.peak,
+            'opened': self.opened,
+            'evicted': self.evicted,
+            'timed_out': self.timed_out,
+            'persistent_clicks': self.persistent_clicks,
+            'max_active': self.max_active,
+            'max_per_user': self.max_per_user,
+        }
+
+registry = PaginatorRegistry(
+    max_active=int(os.environ.get('PAGINATOR_MAX_ACTIVE') or 1000),
+    max_per_user=int(os.environ.get('PAGINATOR_MAX_PER_USER') or 3),
+)
+
+# Prefix of the custom IDs of persistent paginator buttons
+PERSISTENT_PREFIX = 'pg'
+
+# Page sources of persistent paginators: name -> function(argument) returning a Paginator
+PAGE_SOURCES = {}
+
+# Define a decorator to register a page source for persistent paginators
+def page_source(name):
+    """
+    Register a function building the paginator of a persistent page source.
+
+    The function is called with the argument given to Paginator.start on every click, so it
+    should build a cheap paginator (e.g. over KeysetPages) rather than load the data.
+
+    Args:
+        name (str): The name of the page source, without ':'.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(function):
+        PAGE_SOURCES[name] = function
+        return function
+    return decorator
+
+# Define the handler of clicks on persistent paginators
+async def handle_persistent_click(interaction):
+    """
+    Handles a click on a persistent paginator by rebuilding it from its custom ID.
+
+    The keyset cursor stored with the page is handed back to the provider, so reaching the
+    target page costs the same few queries whatever its position. Only the target page is
+    rendered.
+
+    Args:
+        interaction (disnake.MessageInteraction): The button interaction.
+    """
+    parts = (interaction.component.custom_id or '').split(':', 5)
+    if len(parts) != 6 or parts[0] != PERSISTENT_PREFIX or parts[1] not in PAGE_SOURCES:
+        return
+    _, source, author_id, page, action, argument = parts
+    paginator = PAGE_SOURCES[source](argument)
+    if interaction.author.id != int(author_id):
+        await paginator.invalid_user_function(interaction)
+        return
+    registry.persistent_clicks += 1
+    paginator.cache_size = 1  # Nothing outlives the click, so don't prefetch
+    page, _, cursor = page.partition('@')
+    paginator.current_page = int(page)
+    if cursor and hasattr(paginator._provider, 'seek'):
+        paginator._provider.seek(paginator.current_page, int(cursor))
+    await paginator._read_page_count()
+    embed = await paginator.move(paginator.target(action))
+    await interaction.response.edit_message(embed=embed, components=paginator.persistent_components(source, argument, author_id))
+
+# Define the function to attach persistent paginators to a bot
+def install(bot):
+    """
+    Register the listener handling clicks on persistent paginators.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+    """
+    bot.add_listener(handle_persistent_click, 'on_button_click')
+
 # Example usage of Paginator class:
 # segments = ["Page 1 content", disnake.Embed(title="Page 2", description="Page 2 content")]
 # paginator = Paginator(segments, title="Example Pagination", color=0x00ff00, prefix="**", suffix="**")
-# await paginator.start(interaction)
\ No newline at end of file
+# await paginator.start(interaction)
+#
+# Page through a large table without loading it, one keyset query per visible page:
+# pages = KeysetPages(Balance, lambda rows, page: "\n".join(f"<@{row.user_id}>: {row.amount}" for row in rows),
+#                     per_page=10, columns=['user_id', 'amount'])
+# await Paginator(pages, title="Balances").start(interaction)
+#
+# A persistent paginator, whose buttons keep working after a restart:
+# @page_source('balances')
+# def balance_pages(argument):
+#     return Paginator(KeysetPages(Balance, render_balances, per_page=10), title="Balances")
+#
+# await balance_pages('').start(interaction, persistent='balances')
+#
+# registry.stats()   # {'active': 12, 'users': 9, 'evicted': 3, 'timed_out': 40, ...}
@@ -0,0 +1,568 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# The outcome of a rate limit decision
+RateLimitResult = namedtuple('RateLimitResult', 'allowed limit remaining retry_after')
+
+# Define the token bucket algorithm
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens are refilled every `per` seconds, up to `burst` tokens. Allows
+    short bursts while holding the long-run rate. The state of a key is (tokens, updated_at).
+
+    Attributes:
+        rate (int): The tokens refilled every `per` seconds.
+        per (float): The refill period in seconds.
+        burst (int): The bucket capacity.
+    """
+
+    def __init__(self, rate, per, burst=None):
+        """
+        Initializes the TokenBucket class.
+
+        Args:
+            rate (int): The tokens refilled every `per` seconds.
+            per (float): The refill period in seconds.
+            burst (int, optional): The bucket capacity. Defaults to `rate`.
+        """
+        self.rate = rate
+        self.per = per
+        self.burst = burst or rate
+        self._fill = rate / per
+
+    def consume(self, state, now, cost=1):
+        """
+        Take `cost` tokens if the bucket holds them.
+
+        Args:
+            state (tuple): The key's state, or None for a new key.
+            now (float): The current time.
+            cost (int): The tokens to take. Defaults to 1.
+
+        Returns:
+            tuple: (new state, RateLimitResult).
+        """
+        tokens, updated_at = state if state is not None else (self.burst, now)
+        tokens = min(self.burst, tokens + (now - updated_at) * self._fill)
+        if tokens >= cost:
+            tokens -= cost
+            return (tokens, now), RateLimitResult(True, self.burst, int(tokens), 0.0)
+        return (tokens, now), RateLimitResult(False, self.burst, int(tokens), (cost - tokens) / self._fill)
+
+# Define the sliding window algorithm
+class SlidingWindow:
+    """
+    Sliding window counter: at most `limit` hits in any `window` seconds, estimated from the
+    current and previous fixed windows (the previous count weighted by its overlap). The state of
+    a key is (window_start, current_count, previous_count), so decisions are O(1). The estimate
+    assumes the previous window's hits were evenly spread, so bursts can exceed the limit by a few
+    percent in some windows.
+
+    Attributes:
+        limit (int): The hits allowed per window.
+        window (float): The window length in seconds.
+    """
+
+    def __init__(self, limit, window):
+        """
+        Initializes the SlidingWindow class.
+
+        Args:
+            limit (int): The hits allowed per window.
+            window (float): The window length in seconds.
+        """
+        self.limit = limit
+        self.window = window
+
+    def consume(self, state, now, cost=1):
+        """
+        Count `cost` hits if they fit in the window.
+
+        Args:
+            state (tuple): The key's state, or None for a new key.
+            now (float): The current time.
+            cost (int): The hits to count. Defaults to 1.
+
+        Returns:
+            tuple: (new state, RateLimitResult).
+        """
+        start = now - now % self.window
+        if state is None or state[0] < start - self.window:
+            current, previous = 0, 0  # Both windows of the state are over
+        elif state[0] < start:
+            current, previous = 0, state[1]  # The current window of the state is now the previous one
+        else:
+            current, previous = state[1], state[2]
+        weight = 1 - (now - start) / self.window
+        used = previous * weight + current
+        if used + cost <= self.limit:
+            current += cost
+            return (start, current, previous), RateLimitResult(True, self.limit, int(self.limit - used - cost), 0.0)
+        if previous and current + cost <= self.limit:
+            # Wait until enough of the previous window has slid out
+            retry_after = (used + cost - self.limit) / previous * self.window
+        else:
+            retry_after = start + self.window - now
+        return (start, current, previous), RateLimitResult(False, self.limit, max(0, int(self.limit - used)), retry_after)
+
+# Define the interface every rate limit backend implements
+class RateLimitBackend:
+    """
+    Interface for the stores of rate limit state.
+
+    A shared backend (e.g. Redis, with WATCH/MULTI or a Lua script) only needs an atomic
+    read-modify-write of one key's small state tuple to enforce limits across processes.
+    """
+
+    def update(self, key, function):
+        """
+        Atomically replace a key's state.
+
+        Args:
+            key (str): The key.
+            function (callable): Called with the current state (or None); returns (new state, result).
+
+        Returns:
+            Any: The result returned by `function`.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Forget every key.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Get the backend statistics.
+
+        Returns:
+            dict: At least 'keys'.
+        """
+        raise NotImplementedError
+
+# Define the in-memory backend
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Thread-safe in-process backend holding at most `maxsize` keys. The least recently used
+    (idle) keys are evicted first; an evicted key simply starts again with a full allowance.
+
+    Attributes:
+        maxsize (int): The maximum number of keys kept.
+        evictions (int): The number of keys evicted.
+    """
+
+    def __init__(self, maxsize=10000):
+        """
+        Initializes the MemoryRateLimitBackend class.
+
+        Args:
+            maxsize (int): The maximum number of keys kept. Defaults to 10000.
+        """
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key, function):
+        with self._lock:
+            state, result = function(self._states.pop(key, None))
+            self._states[key] = state
+            if len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+                self.evictions += 1
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._states), 'maxsize': self.maxsize, 'evictions': self.evictions}
+
+# Shared in-memory backend of the limiters that don't get their own
+default_backend = MemoryRateLimitBackend(maxsize=int(os.environ.get('RATE_LIMIT_MAX_KEYS') or 10000))
+
+# Every limiter by name, for the statistics (a reloaded cog replaces its limiters)
+_limiters = {}
+_concurrency_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Define the rate limiter
+class RateLimiter:
+    """
+    Applies a rate limit algorithm to keys (a user, a guild, a command, an IP...) in a backend.
+
+    Attributes:
+        name (str): The limiter name, prefixed to its keys.
+        algorithm (TokenBucket or SlidingWindow): The algorithm.
+        backend (RateLimitBackend): The state store.
+        allowed (int): The hits allowed.
+        limited (int): The hits refused.
+    """
+
+    def __init__(self, name, algorithm, backend=None):
+        """
+        Initializes the RateLimiter class.
+
+        Args:
+            name (str): The limiter name.
+            algorithm (TokenBucket or SlidingWindow): The algorithm.
+            backend (RateLimitBackend, optional): The state store. Defaults to the shared memory backend.
+        """
+        self.name = name
+        self.algorithm = algorithm
+        self.backend = backend or default_backend
+        self.allowed = 0
+        self.limited = 0
+        with _limiters_lock:
+            _limiters[name] = self
+
+    def hit(self, key, cost=1, now=None):
+        """
+        Count a hit for a key.
+
+        Args:
+            key (Hashable): The key, e.g. a user ID.
+            cost (int): The weight of the hit. Defaults to 1.
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            RateLimitResult: Whether the hit is allowed, and when to retry if not.
+        """
+        now = time.time() if now is None else now
+        result = self.backend.update(f"{self.name}:{key}", lambda state: self.algorithm.consume(state, now, cost))
+        if result.allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return result
+
+# Define the concurrency limiter
+class ConcurrencyLimiter:
+    """
+    Caps the number of runs in progress per key. Keys are dropped when their last run ends,
+    so memory is bounded by the runs in progress.
+
+    Attributes:
+        name (str): The limiter name.
+        limit (int): The runs allowed at once per key.
+        rejected (int): The runs refused.
+    """
+
+    def __init__(self, name, limit):
+        """
+        Initializes the ConcurrencyLimiter class.
+
+        Args:
+            name (str): The limiter name.
+            limit (int): The runs allowed at once per key.
+        """
+        self.name = name
+        self.limit = limit
+        self.rejected = 0
+        self._running = {}
+        self._lock = threading.Lock()
+        with _limiters_lock:
+            _concurrency_limiters[name] = self
+
+    def acquire(self, key):
+        """
+        Start a run for a key, if it has a free slot.
+
+        Args:
+            key (Hashable): The key.
+
+        Returns:
+            bool: True if the run may start; release() must then be called when it ends.
+        """
+        with self._lock:
+            running = self._running.get(key, 0)
+            if running >= self.limit:
+                self.rejected += 1
+                return False
+            self._running[key] = running + 1
+            return True
+
+    def release(self, key):
+        """
+        End a run for a key.
+
+        Args:
+            key (Hashable): The key.
+        """
+        with self._lock:
+            running = self._running.get(key, 0) - 1
+            if running > 0:
+                self._running[key] = running
+            else:
+                self._running.pop(key, None)
+
+    def running(self):
+        """
+        Get the number of runs in progress.
+
+        Returns:
+            int: The runs in progress, over all keys.
+        """
+        with self._lock:
+            return sum(self._running.values())
+
+# Build an algorithm by name
+def make_algorithm(algorithm, rate, per, burst=None):
+    """
+    Build a rate limit algorithm.
+
+    Args:
+        algorithm (str): 'token_bucket' or 'sliding_window'.
+        rate (int): The hits allowed every `per` seconds.
+        per (float): The period in seconds.
+        burst (int, optional): The token bucket capacity. Defaults to `rate`.
+
+    Returns:
+        TokenBucket or SlidingWindow: The algorithm.
+
+    Raises:
+        ValueError: If the algorithm is unknown.
+    """
+    if algorithm == 'token_bucket':
+        return TokenBucket(rate, per, burst)
+    if algorithm == 'sliding_window':
+        return SlidingWindow(rate, per)
+    raise ValueError(f"Unknown rate limit algorithm '{algorithm}'")
+
+# Parse a limit such as '60/60'
+def parse_limit(value):
+    """
+    Parse a limit written as '<hits>/<seconds>', e.g. '60/60' or '5/1'.
+
+    Args:
+        value (str): The limit.
+
+    Returns:
+        tuple: (hits, seconds), or None if `value` is blank or 'off'.
+    """
+    value = (value or '').strip().lower()
+    if not value or value == 'off':
+        return None
+    hits, seconds = value.split('/', 1)
+    return int(hits), float(seconds)
+
+# Get a limiter configured by an environment variable
+def limiter_from_env(name, variable, default, algorithm='sliding_window'):
+    """
+    Build a rate limiter from a '<hits>/<seconds>' environment variable.
+
+    Args:
+        name (str): The limiter name.
+        variable (str): The environment variable, e.g. 'RATE_LIMIT_GUILD'.
+        default (str): The limit when the variable is unset.
+        algorithm (str): 'token_bucket' or 'sliding_window'. Defaults to 'sliding_window'.
+
+    Returns:
+        RateLimiter: The limiter, or None if the limit is 'off'.
+    """
+    parsed = parse_limit(os.environ.get(variable) or default)
+    return RateLimiter(name, make_algorithm(algorithm, *parsed)) if parsed else None
+
+# Get the statistics of every limiter
+def rate_limit_stats():
+    """
+    Get the counters of every rate and concurrency limiter and of the shared backend.
+
+    Returns:
+        dict: 'limiters' (name -> allowed, limited), 'concurrency' (name -> running, rejected)
+            and 'backend' (keys, maxsize, evictions).
+    """
+    with _limiters_lock:
+        limiters = {name: {'allowed': limiter.allowed, 'limited': limiter.limited} for name, limiter in _limiters.items()}
+        concurrency = {name: {'running': limiter.running(), 'rejected': limiter.rejected} for name, limiter in _concurrency_limiters.items()}
+    return {'limiters': limiters, 'concurrency': concurrency, 'backend': default_backend.stats()}
+
+# Find the context or interaction among a command callback's arguments
+def _invocation(args):
+    from disnake import Interaction
+    from disnake.ext.commands import Context
+
+    for arg in args:
+        if isinstance(arg, (Context, Interaction)):
+            return arg
+    return None
+
+# Get the key of an invocation
+def _invocation_key(source, key):
+    """
+    Get the bucket of a command invocation.
+
+    Args:
+        source (Context or Interaction): The invocation.
+        key (str): 'user', 'guild' (the user in DMs), 'channel' or 'command'.
+
+    Returns:
+        Hashable: The bucket.
+    """
+    author = getattr(source, 'author', None)
+    if key == 'user':
+        return author.id
+    if key == 'guild':
+        guild = getattr(source, 'guild', None)
+        return f"g{guild.id}" if guild else f"u{author.id}"
+    if key == 'channel':
+        return getattr(source, 'channel_id', None) or source.channel.id
+    if key == 'command':
+        return ''
+    raise ValueError(f"Unknown rate limit key '{key}'")
+
+# Tell the invoker that the command was refused
+async def _refuse(source, message):
+    from disnake import Interaction
+
+    if isinstance(source, Interaction):
+        if not source.response.is_done():
+            await source.response.send_message(message, ephemeral=True)
+        return
+    await source.send(message)
+
+# Define the rate limit decorator for commands
+def rate_limit(rate=None, per=None, key='user', algorithm='token_bucket', burst=None, limiter=None, message=None):
+    """
+    Rate-limit a prefix or slash command. Put it below the command decorator.
+
+    Refused invocations get a short reply (ephemeral for slash commands) instead of running.
+
+    Args:
+        rate (int, optional): The invocations allowed every `per` seconds (unless `limiter` is given).
+        per (float, optional): The period in seconds (unless `limiter` is given).
+        key (str): What the limit is per: 'user', 'guild', 'channel' or 'command'. Defaults to 'user'.
+        algorithm (str): 'token_bucket' (allows bursts) or 'sliding_window'. Defaults to 'token_bucket'.
+        burst (int, optional): The token bucket capacity. Defaults to `rate`.
+        limiter (RateLimiter, optional): A limiter shared with other commands, overriding the above.
+        message (str, optional): The refusal, formatted with {retry_after}.
+
+    Returns:
+        function: The decorator.
+    """
+    message = message or "You're doing that too fast, try again in {retry_after:.1f}s."
+
+    def decorator(callback):
+        if limiter is None and rate is None:
+            return callback  # Disabled, e.g. a limiter_from_env() limit set to 'off'
+        shared = limiter or RateLimiter(f"command:{callback.__qualname__}:{key}", make_algorithm(algorithm, rate, per, burst))
+
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            source = _invocation(args)
+            if source is not None:
+                result = shared.hit(_invocation_key(source, key))
+                if not result.allowed:
+                    await _refuse(source, message.format(retry_after=result.retry_after))
+                    return None
+            return await callback(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Define the concurrency limit decorator for commands
+def concurrency_limit(limit, key='guild', message=None):
+    """
+    Cap the invocations of a prefix or slash command running at once. Put it below the command decorator.
+
+    Args:
+        limit (int): The invocations allowed at once per key.
+        key (str): What the cap is per: 'user', 'guild', 'channel' or 'command'. Defaults to 'guild'.
+        message (str, optional): The refusal.
+
+    Returns:
+        function: The decorator.
+    """
+    message = message or "This command is busy, try again in a moment."
+
+    def decorator(callback):
+        limiter = ConcurrencyLimiter(f"command:{callback.__qualname__}:{key}", limit)
+
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            source = _invocation(args)
+            if source is None:
+                return await callback(*args, **kwargs)
+            bucket = _invocation_key(source, key)
+            if not limiter.acquire(bucket):
+                await _refuse(source, message)
+                return None
+            try:
+                return await callback(*args, **kwargs)
+            finally:
+                limiter.release(bucket)
+        return wrapper
+    return decorator
+
+# Define the rate limit middleware of a Flask app or blueprint
+def init_rate_limit(target, limit=None, algorithm=None, exempt=(), backend=None, skip=None):
+    """
+    Rate-limit every request to a Flask app or blueprint per client IP, answering 429 with
+    Retry-After when the limit is exceeded, and X-RateLimit-* headers on every response.
+
+    Args:
+        target (Flask or Blueprint): The app or blueprint.
+        limit (str, optional): '<hits>/<seconds>'. Defaults to RATE_LIMIT_API, or '120/60'; 'off' disables it.
+        algorithm (str, optional): Defaults to RATE_LIMIT_ALGORITHM, or 'sliding_window'.
+        exempt (tuple of str): Endpoints that are not limited, e.g. ('api.api_webhook',).
+        backend (RateLimitBackend, optional): The state store. Defaults to the shared memory backend.
+        skip (callable, optional): Called in each request; requests for which it returns True are
+            not limited, e.g. an authenticated scraper. Defaults to None.
+
+    Returns:
+        RateLimiter: The limiter, or None when disabled.
+    """
+    from flask import g, jsonify, request
+
+    parsed = parse_limit(limit or os.environ.get('RATE_LIMIT_API') or '120/60')
+    if parsed is None:
+        return None
+    algorithm = algorithm or (os.environ.get('RATE_LIMIT_ALGORITHM') or 'sliding_window').strip().lower()
+    limiter = RateLimiter(f"http:{target.name}", make_algorithm(algorithm, *parsed), backend)
+    trust_proxy = (os.environ.get('RATE_LIMIT_TRUST_PROXY') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+    @target.before_request
+    def check_rate_limit():
+        if request.endpoint in exempt or (skip is not None and skip()):
+            return None
+        client = request.access_route[0] if trust_proxy and request.access_route else request.remote_addr
+        result = g.rate_limit = limiter.hit(client)
+        if not result.allowed:
+            retry_after = max(1, int(result.retry_after + 0.999))
+            response = jsonify({'error': 'Too many requests', 'retry_after': retry_after})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        return None
+
+    @target.after_request
+    def add_rate_limit_headers(response):
+        result = g.pop('rate_limit', None)
+        if result is not None:
+            response.headers['X-RateLimit-Limit'] = str(result.limit)
+            response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+        return response
+
+    return limiter
+
+# Budget shared by all the commands invoked in one guild (RATE_LIMIT_GUILD), so one busy guild
+# can't saturate the bot and the database pool
+guild_commands = limiter_from_env('guild-commands', 'RATE_LIMIT_GUILD', '120/60')
+
+# Example usage of the rate limiting helpers:
+# class BalanceSlash(commands.Cog):
+#     @commands.slash_command(name="withdraw", description="Withdraw money")
+#     @rate_limit(5, 60, key='user')               # 5 per minute per user, bursts allowed
+#     @concurrency_limit(2, key='guild')           # At most 2 running at once per guild
+#     async def withdraw(self, inter, amount: float):
+#         ...
+#
+# @rate_limit(key='guild', limiter=guild_commands)   # Shares one budget per guild between commands
+#
+# init_rate_limit(api, exempt=('api.api_webhook',))     # Done in routes/api.py
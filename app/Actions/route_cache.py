@@ -0,0 +1,142 @@
+import functools
+import hashlib
+import os
+import threading
+import time
+from flask import Response, make_response, request
+from database.cache import LRUCache, MISSING
+
+# Shared backend of cached responses; entries carry their own expiry, so the LRU has no TTL
+_default_cache = LRUCache(maxsize=int(os.environ.get('ROUTE_CACHE_SIZE') or 1024), ttl=None)
+
+# ETag and Last-Modified of every cached URL, kept past expiry so an unchanged page keeps its date
+_validators = LRUCache(maxsize=int(os.environ.get('ROUTE_CACHE_SIZE') or 1024) * 4, ttl=None)
+
+# Per-route counters: endpoint -> {'hits', 'misses', 'not_modified', 'bypassed'}
+_route_stats = {}
+_stats_lock = threading.Lock()
+
+# Count an outcome for a route
+def _count(endpoint, name):
+    with _stats_lock:
+        stats = _route_stats.setdefault(endpoint, {'hits': 0, 'misses': 0, 'not_modified': 0, 'bypassed': 0})
+        stats[name] += 1
+
+# Get the per-route cache statistics
+def route_cache_stats():
+    """
+    Get the cache counters and hit ratio of every cached route.
+
+    Returns:
+        dict: endpoint -> hits, misses, not_modified (304 answers), bypassed and hit_ratio.
+    """
+    with _stats_lock:
+        stats = {}
+        for endpoint, counters in _route_stats.items():
+            lookups = counters['hits'] + counters['misses']
+            stats[endpoint] = dict(counters, hit_ratio=round(counters['hits'] / lookups, 4) if lookups else None)
+        return stats
+
+# Define the response caching decorator for Flask routes
+def cached_route(ttl=60, vary_args=True, vary_headers=(), cache=None, cache_control=None):
+    """
+    Cache the responses of a GET route and answer conditional requests with 304.
+
+    Responses are cached per URL path (plus query string and headers when varied), and served
+    with ETag and Last-Modified validators, so a client sending If-None-Match/If-Modified-Since
+    for an unchanged page gets an empty 304. Only 200 responses without cookies or
+    'Cache-Control: no-store/private' are cached; other methods bypass the cache.
+
+    Args:
+        ttl (float): Seconds a response stays cached. Defaults to 60.
+        vary_args (bool): Whether the query string is part of the cache key. Defaults to True.
+        vary_headers (tuple of str): Request headers that are part of the cache key, e.g.
+            ('Accept-Language',); they are also sent in the Vary header. Defaults to ().
+        cache (CacheBackend, optional): The backend. Defaults to a shared in-memory LRU of
+            ROUTE_CACHE_SIZE responses.
+        cache_control (str, optional): The Cache-Control header. Defaults to 'public, max-age=<ttl>'.
+
+    Returns:
+        function: The decorator.
+    """
+    backend = cache or _default_cache
+    cache_control = cache_control or f'public, max-age={int(ttl)}'
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            endpoint = request.endpoint or view.__name__
+            if request.method not in ('GET', 'HEAD'):
+                _count(endpoint, 'bypassed')
+                return view(*args, **kwargs)
+
+            key = (
+                endpoint,
+                request.path,
+                request.query_string if vary_args else b'',
+                tuple(request.headers.get(header, '') for header in vary_headers),
+            )
+            entry = backend.get(key)
+            if entry is not MISSING and entry['expires_at'] > time.time():
+                _count(endpoint, 'hits')
+                response = Response(entry['body'], status=entry['status'], headers=entry['headers'])
+                response.headers['X-Cache'] = 'HIT'
+            else:
+                _count(endpoint, 'misses')
+                response = make_response(view(*args, **kwargs))
+                response.headers['X-Cache'] = 'MISS'
+                if not _cacheable(response):
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                validators = _validators.get(key)
+                last_modified = validators[1] if validators is not MISSING and validators[0] == etag else int(time.time())
+                _validators.set(key, (etag, last_modified))
+                response.set_etag(etag)
+                response.last_modified = last_modified
+                response.headers['Cache-Control'] = cache_control
+                if vary_headers:
+                    response.vary.update(vary_headers)
+                backend.set(key, {
+                    'body': body,
+                    'status': response.status_code,
+                    'headers': [(name, value) for name, value in response.headers if name != 'X-Cache'],
+                    'expires_at': time.time() + ttl,
+                })
+
+            # Turns the response into an empty 304 when the client's copy is still current
+            response.make_conditional(request)
+            if response.status_code == 304:
+                _count(endpoint, 'not_modified')
+            return response
+        return wrapper
+    return decorator
+
+# Check whether a response may be cached
+def _cacheable(response):
+    """
+    Check whether a freshly rendered response may be cached and shared.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        bool: True for complete 200 responses without cookies or private/no-store caching.
+    """
+    if response.status_code != 200 or response.is_streamed or 'Set-Cookie' in response.headers:
+        return False
+    cache_control = response.headers.get('Cache-Control', '')
+    return 'no-store' not in cache_control and 'private' not in cache_control
+
+# Example usage of the cached_route decorator:
+# @app.route('/')
+# @cached_route(ttl=300)
+# def home():
+#     return render_template('index.html')
+#
+# @api.route('/leaderboard')
+# @cached_route(ttl=30, vary_headers=('Accept-Language',))
+# def leaderboard():
+#     ...
+#
+# route_cache_stats()   # {'home': {'hits': 950, 'misses': 50, 'not_modified': 400, 'hit_ratio': 0.95, ...}}
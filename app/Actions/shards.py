@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+# Define a per-second ring buffer to compute event rates in O(1)
+class RateCounter:
+    """
+    Counts events in one-second buckets over a sliding window.
+
+    Attributes:
+        window (int): The number of seconds the rate is averaged over.
+    """
+
+    def __init__(self, window=60):
+        """
+        Initializes the RateCounter class with the given window.
+
+        Args:
+            window (int): The number of seconds the rate is averaged over. Defaults to 60.
+        """
+        self.window = window
+        self._buckets = [0] * window
+        self._stamps = [0] * window
+
+    def add(self, count=1):
+        """
+        Count events in the current second.
+
+        Args:
+            count (int): The number of events. Defaults to 1.
+        """
+        second = int(time.time())
+        index = second % self.window
+        if self._stamps[index] != second:
+            self._stamps[index] = second
+            self._buckets[index] = 0
+        self._buckets[index] += count
+
+    def rate(self):
+        """
+        Get the average number of events per second over the window.
+
+        Returns:
+            float: The events per second.
+        """
+        oldest = int(time.time()) - self.window
+        return sum(count for count, stamp in zip(self._buckets, self._stamps) if stamp > oldest) / self.window
+
+# Define the shard statistics collector
+class ShardStats:
+    """
+    Collects gateway statistics of the bot: per-shard latency and connection state, and the
+    rate of gateway events received by this process.
+
+    Gateway events don't carry their shard, so event rates are per process; run one process per
+    shard range (DISCORD_SHARD_IDS) to get per-range rates.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ShardStats class.
+        """
+        self.bot = None
+        self.started_at = time.time()
+        self.events = RateCounter()
+        self.events_total = 0
+        self.event_types = Counter()
+        self.shards = {}
+        self._lock = threading.Lock()
+
+    def record_event(self, event_type):
+        """
+        Count a gateway event.
+
+        Args:
+            event_type (str): The gateway event type, e.g. 'MESSAGE_CREATE'.
+        """
+        with self._lock:
+            self.events_total += 1
+            self.event_types[event_type] += 1
+            self.events.add()
+
+    def record_shard(self, shard_id, state):
+        """
+        Record a shard connection state change.
+
+        Args:
+            shard_id (int): The shard ID (0 for an unsharded bot).
+            state (str): 'connected', 'ready', 'resumed' or 'disconnected'.
+        """
+        with self._lock:
+            shard = self.shards.setdefault(shard_id, Counter())
+            shard[state] += 1
+            shard['state'] = state
+
+    def snapshot(self):
+        """
+        Get the current statistics.
+
+        Returns:
+            dict: The per-shard latency and connection counters, and the event rates.
+        """
+        latencies = {}
+        bot = self.bot
+        if bot is not None:
+            if getattr(bot, 'shards', None):
+                latencies = {shard_id: latency for shard_id, latency in bot.latencies}
+            else:
+                latencies = {bot.shard_id or 0: bot.latency}
+
+        with self._lock:
+            shard_ids = sorted(set(latencies) | set(self.shards))
+            shards = {}
+            for shard_id in shard_ids:
+                counters = self.shards.get(shard_id, {})
+                latency = latencies.get(shard_id)
+                shards[str(shard_id)] = {
+                    'latency_ms': round(latency * 1000, 1) if latency is not None and latency == latency and latency != float('inf') else None,
+                    'state': counters.get('state'),
+                    'connects': counters.get('connected', 0),
+                    'disconnects': counters.get('disconnected', 0),
+                    'resumes': counters.get('resumed', 0),
+                }
+            return {
+                'shard_count': getattr(bot, 'shard_count', None) if bot is not None else None,
+                'shards': shards,
+                'events_total': self.events_total,
+                'events_per_second': round(self.events.rate(), 2),
+                'event_types': dict(self.event_types.most_common(20)),
+                'uptime_seconds': round(time.time() - self.started_at),
+                'updated_at': time.time(),
+            }
+
+shard_stats = ShardStats()
+
+# Define the function to attach the collector to a bot
+def install(bot):
+    """
+    Register the gateway listeners collecting shard statistics on a bot.
+
+    When SHARD_STATS_FILE is set, a snapshot is also written to that file every
+    SHARD_STATS_INTERVAL seconds (default 15) so a web process can serve it.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+    """
+    shard_stats.bot = bot
+
+    async def on_socket_event_type(event_type):
+        shard_stats.record_event(event_type)
+
+    async def on_shard_connect(shard_id):
+        shard_stats.record_shard(shard_id, 'connected')
+
+    async def on_shard_ready(shard_id):
+        shard_stats.record_shard(shard_id, 'ready')
+
+    async def on_shard_resumed(shard_id):
+        shard_stats.record_shard(shard_id, 'resumed')
+
+    async def on_shard_disconnect(shard_id):
+        shard_stats.record_shard(shard_id, 'disconnected')
+
+    for listener in (on_socket_event_type, on_shard_connect, on_shard_ready, on_shard_resumed, on_shard_disconnect):
+        bot.add_listener(listener)
+
+    path = os.environ.get('SHARD_STATS_FILE')
+    if path:
+        interval = int(os.environ.get('SHARD_STATS_INTERVAL') or 15)
+
+        async def write_snapshots():
+            import asyncio
+            while True:
+                await asyncio.sleep(interval)
+                temporary = f'{path}.tmp'
+                with open(temporary, 'w') as file:
+                    json.dump(shard_stats.snapshot(), file)
+                os.replace(temporary, path)
+
+        async def on_ready():
+            if getattr(bot, '_shard_stats_writer', None) is None:
+                bot._shard_stats_writer = bot.loop.create_task(write_snapshots())
+
+        bot.add_listener(on_ready)
+
+# Define the function to get the statistics from any process
+def get_stats():
+    """
+    Get the shard statistics: live when the bot runs in this process, otherwise the last snapshot
+    written to SHARD_STATS_FILE by the bot process.
+
+    Returns:
+        dict: The statistics, or None if no bot is running here and no snapshot is available.
+    """
+    if shard_stats.bot is not None:
+        return shard_stats.snapshot()
+    path = os.environ.get('SHARD_STATS_FILE')
+    if path and os.path.exists(path):
+        with open(path) as file:
+            return json.load(file)
+    return None
+
+# Define the function to get the latency of the shard serving a guild
+def shard_latency(bot, guild=None):
+    """
+    Get the gateway latency of the shard serving a guild.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        guild (disnake.Guild, optional): The guild; the bot-wide average is used without one.
+
+    Returns:
+        float: The latency in seconds.
+    """
+    if guild is not None and getattr(bot, 'shards', None):
+        shard = bot.get_shard(guild.shard_id)
+        if shard is not None:
+            return shard.latency
+    return bot.latency
+
+# Example usage of shard statistics:
+# install(bot)                          # Done in config/boot.py
+# latency = shard_latency(bot, ctx.guild)
+# stats = get_stats()                   # {'shards': {'0': {'latency_ms': 42.0, ...}}, ...}
@@ -1,19 +1,462 @@
-import requests
+import asyncio
+import email.utils
+import hashlib
+import hmac
+import json
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from database.cache import LRUCache, MISSING
+from database.db import begin_scope, end_scope
+
+# Statuses worth retrying: rate limited, or a transient server/proxy failure
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Define the settings shared by the async and the sync webhook clients
+class WebhookSettings:
+    """
+    The connection pool, timeout and retry settings of the webhook clients.
+
+    Attributes:
+        timeout (float): Seconds allowed for a whole attempt (connect, send and read).
+        retries (int): Attempts made after the first one fails.
+        backoff (float): The delay before the first retry; doubled on every retry, with jitter.
+        max_backoff (float): The longest delay between attempts. A Retry-After longer than this
+            isn't waited for; the 429 response is returned instead.
+        max_connections (int): Open connections allowed across every host.
+        max_per_host (int): Concurrent requests (and open connections) allowed per host.
+    """
+
+    def __init__(self, timeout=None, retries=None, backoff=None, max_backoff=None, max_connections=None, max_per_host=None):
+        """
+        Initializes the WebhookSettings class, reading unset values from environment variables.
+
+        Args:
+            timeout (float, optional): WEBHOOK_TIMEOUT, defaults to 10.
+            retries (int, optional): WEBHOOK_RETRIES, defaults to 3.
+            backoff (float, optional): WEBHOOK_BACKOFF, defaults to 0.5.
+            max_backoff (float, optional): WEBHOOK_MAX_BACKOFF, defaults to 30.
+            max_connections (int, optional): WEBHOOK_MAX_CONNECTIONS, defaults to 100.
+            max_per_host (int, optional): WEBHOOK_MAX_PER_HOST, defaults to 10.
+        """
+        def setting(value, name, default, cast):
+            if value is not None:
+                return value
+            raw = (os.environ.get(name) or '').strip()
+            return cast(raw) if raw else default
+
+        self.timeout = setting(timeout, 'WEBHOOK_TIMEOUT', 10.0, float)
+        self.retries = setting(retries, 'WEBHOOK_RETRIES', 3, int)
+        self.backoff = setting(backoff, 'WEBHOOK_BACKOFF', 0.5, float)
+        self.max_backoff = setting(max_backoff, 'WEBHOOK_MAX_BACKOFF', 30.0, float)
+        self.max_connections = setting(max_connections, 'WEBHOOK_MAX_CONNECTIONS', 100, int)
+        self.max_per_host = setting(max_per_host, 'WEBHOOK_MAX_PER_HOST', 10, int)
+
+    @staticmethod
+    def retry_after_seconds(retry_after):
+        """
+        Parse a Retry-After header, given as seconds or as an HTTP date.
+
+        Args:
+            retry_after (str): The header value.
+
+        Returns:
+            float: The seconds to wait (0 for a negative value or a past date), or None if the
+                value is not valid.
+        """
+        try:
+            wait = float(retry_after)
+        except (TypeError, ValueError):
+            try:
+                date = email.utils.parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return None
+            if date is None:
+                return None
+            wait = date.timestamp() - time.time()
+        if wait != wait or wait == float('inf'):
+            return None
+        return max(0.0, wait)
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Get the delay before the next attempt.
+
+        Args:
+            attempt (int): The number of attempts made so far (1 after the first one).
+            retry_after (str, optional): The Retry-After header of the last response. An invalid
+                value falls back to the exponential backoff.
+
+        Returns:
+            float: The delay in seconds, or None if the server asks to wait longer than max_backoff.
+        """
+        wait = self.retry_after_seconds(retry_after) if retry_after else None
+        if wait is not None:
+            return wait if wait <= self.max_backoff else None
+        wait = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return wait / 2 + random.uniform(0, wait / 2)
+
+# Define the response returned by the webhook clients
+class WebhookResponse:
+    """
+    The response to a webhook, read in full so it outlives its connection.
+
+    The attributes mirror requests.Response, so callers work with either client.
+
+    Attributes:
+        status_code (int): The HTTP status.
+        headers (dict): The response headers.
+        text (str): The response body.
+        attempts (int): The number of attempts made.
+    """
+
+    def __init__(self, status_code, headers, text, attempts):
+        """
+        Initializes the WebhookResponse class with the given parameters.
+
+        Args:
+            status_code (int): The HTTP status.
+            headers (dict): The response headers.
+            text (str): The response body.
+            attempts (int): The number of attempts made.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.attempts = attempts
+
+    @property
+    def ok(self):
+        """
+        Check whether the status is below 400.
+
+        Returns:
+            bool: True on success.
+        """
+        return self.status_code < 400
+
+    def json(self):
+        """
+        Decode the response body.
+
+        Returns:
+            Any: The decoded JSON.
+        """
+        return json.loads(self.text)
+
+# Define the counters shared by both clients
+class WebhookStats:
+    """
+    Thread-safe webhook counters.
+    """
+
+    def __init__(self, names=('requests', 'attempts', 'retries', 'rate_limited', 'failures')):
+        """
+        Initializes the WebhookStats class with the given counters.
+
+        Args:
+            names (tuple): The counter names. Defaults to the counters of outgoing webhooks.
+        """
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(names, 0)
+
+    def add(self, **counts):
+        """
+        Increase counters.
+
+        Args:
+            **counts: The amount to add per counter name.
+        """
+        with self._lock:
+            for name, count in counts.items():
+                self.counters[name] += count
+
+    def snapshot(self):
+        """
+        Get the counters.
+
+        Returns:
+            dict: The counters.
+        """
+        with self._lock:
+            return dict(self.counters)
+
+webhook_stats = WebhookStats()
+
+# Define the async webhook client
+class WebhookClient:
+    """
+    An async webhook client sharing one aiohttp connection pool.
+
+    Connections are kept alive and reused, requests to a host are limited to max_per_host at a
+    time, and failed attempts (connection errors, timeouts, 429 and 5xx) are retried with
+    exponential backoff, honouring Retry-After.
+
+    Attributes:
+        settings (WebhookSettings): The pool, timeout and retry settings.
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initializes the WebhookClient class with the given settings.
+
+        Args:
+            settings (WebhookSettings, optional): The settings. Defaults to the environment.
+        """
+        self.settings = settings or WebhookSettings()
+        self._session = None  # Created on first use, inside the event loop
+        self._session_loop = None  # The event loop the session was created on
+
+    def _get_session(self):
+        """
+        Get the pooled session of the running event loop, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        import aiohttp  # Imported on first use, so web-only processes don't load it
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.settings.max_connections,
+                limit_per_host=self.settings.max_per_host,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.settings.timeout),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def post(self, url, data=None, headers=None):
+        """
+        POST a JSON payload, retrying transient failures.
+
+        Args:
+            url (str): The webhook URL.
+            data (dict, optional): The JSON payload.
+            headers (dict, optional): Extra request headers.
+
+        Returns:
+            WebhookResponse: The last response (which may be an error status once retries run out).
+
+        Raises:
+            aiohttp.ClientError: If the last attempt failed to connect.
+            asyncio.TimeoutError: If the last attempt timed out.
+        """
+        import aiohttp
+
+        session = self._get_session()
+        webhook_stats.add(requests=1)
+        attempt = 0
+        while True:
+            attempt += 1
+            webhook_stats.add(attempts=1)
+            retry_after = None
+            try:
+                async with session.post(url, json=data, headers=headers) as response:
+                    result = WebhookResponse(response.status, dict(response.headers), await response.text(), attempt)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt > self.settings.retries:
+                    webhook_stats.add(failures=1)
+                    raise
+                result = None
+            else:
+                if result.status_code not in RETRY_STATUSES or attempt > self.settings.retries:
+                    webhook_stats.add(failures=0 if result.ok else 1)
+                    return result
+                if result.status_code == 429:
+                    webhook_stats.add(rate_limited=1)
+                retry_after = result.headers.get('Retry-After')
+            delay = self.settings.delay(attempt, retry_after)
+            if delay is None:
+                webhook_stats.add(failures=1)
+                return result
+            webhook_stats.add(retries=1)
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        """
+        Close the pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+# Define the sync webhook client
+class SyncWebhookClient:
+    """
+    A blocking webhook client for Flask and threads, sharing one requests.Session pool.
+
+    It applies the same timeouts, per-host limits and retry policy as WebhookClient. A request
+    waits at most settings.timeout for one of the max_per_host slots of its host; a host that
+    stays busy longer fails the attempt with requests.Timeout, so a slow host can't hold the
+    calling threads indefinitely.
+
+    Attributes:
+        settings (WebhookSettings): The pool, timeout and retry settings.
+        session (requests.Session): The pooled session.
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initializes the SyncWebhookClient class with the given settings.
+
+        Args:
+            settings (WebhookSettings, optional): The settings. Defaults to the environment.
+        """
+        import requests  # Imported on first use, so processes that never send synchronously don't load it
+        from requests.adapters import HTTPAdapter
+
+        self.settings = settings or WebhookSettings()
+        self.session = requests.Session()
+        # Concurrency per host is capped by _host_slots rather than pool_block, whose wait has no timeout
+        adapter = HTTPAdapter(pool_connections=self.settings.max_connections, pool_maxsize=self.settings.max_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        """
+        Get the semaphore limiting concurrent requests to the host of a URL.
+
+        Args:
+            url (str): The webhook URL.
+
+        Returns:
+            threading.BoundedSemaphore: The host's semaphore, of max_per_host slots.
+        """
+        parts = urlsplit(url)
+        host = (parts.scheme, parts.netloc.lower())
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.settings.max_per_host)
+            return slot
+
+    def post(self, url, data=None, headers=None):
+        """
+        POST a JSON payload, retrying transient failures.
+
+        Args:
+            url (str): The webhook URL.
+            data (dict, optional): The JSON payload.
+            headers (dict, optional): Extra request headers.
+
+        Returns:
+            WebhookResponse: The last response (which may be an error status once retries run out).
+
+        Raises:
+            requests.RequestException: If the last attempt failed to connect or timed out.
+        """
+        import requests
+
+        slot = self._host_slot(url)
+        webhook_stats.add(requests=1)
+        attempt = 0
+        while True:
+            attempt += 1
+            webhook_stats.add(attempts=1)
+            retry_after = None
+            try:
+                if not slot.acquire(timeout=self.settings.timeout):
+                    raise requests.Timeout(f"no free connection to {url} within {self.settings.timeout}s")
+                try:
+                    response = self.session.post(url, json=data, headers=headers, timeout=self.settings.timeout)
+                    result = WebhookResponse(response.status_code, dict(response.headers), response.text, attempt)
+                finally:
+                    slot.release()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt > self.settings.retries:
+                    webhook_stats.add(failures=1)
+                    raise
+                result = None
+            else:
+                if result.status_code not in RETRY_STATUSES or attempt > self.settings.retries:
+                    webhook_stats.add(failures=0 if result.ok else 1)
+                    return result
+                if result.status_code == 429:
+                    webhook_stats.add(rate_limited=1)
+                retry_after = result.headers.get('Retry-After')
+            delay = self.settings.delay(attempt, retry_after)
+            if delay is None:
+                webhook_stats.add(failures=1)
+                return result
+            webhook_stats.add(retries=1)
+            time.sleep(delay)
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+
+_client = None
+_sync_client = None
+_clients_lock = threading.Lock()
+
+# Get the shared async client
+def get_webhook_client():
+    """
+    Get the process-wide async webhook client.
+
+    Returns:
+        WebhookClient: The client.
+    """
+    global _client
+    with _clients_lock:
+        if _client is None:
+            _client = WebhookClient()
+        return _client
+
+# Get the shared sync client
+def get_sync_webhook_client():
+    """
+    Get the process-wide sync webhook client.
+
+    Returns:
+        SyncWebhookClient: The client.
+    """
+    global _sync_client
+    with _clients_lock:
+        if _sync_client is None:
+            _sync_client = SyncWebhookClient()
+        return _sync_client
+
+# Define the function to send a webhook without blocking the event loop
+async def asend_webhook(url, data):
+    """
+    Send a webhook to the specified URL with the given data, for cogs and other async code.
+
+    Args:
+        url (str): The webhook URL.
+        data (dict): The data to send in the webhook.
+
+    Returns:
+        WebhookResponse: The response from the webhook request.
+    """
+    return await get_webhook_client().post(url, data)
 
 # Define the function to send a webhook
 def send_webhook(url, data):
     """
-    Send a webhook to the specified URL with the given data.
+    Send a webhook to the specified URL with the given data. Blocks; for Flask routes and threads.
 
     Args:
         url (str): The webhook URL.
         data (dict): The data to send in the webhook.
 
     Returns:
-        Response: The response from the webhook request.
+        WebhookResponse: The response from the webhook request.
     """
-    response = requests.post(url, json=data)
-    return response
+    return get_sync_webhook_client().post(url, data)
 
 # Define the function to process a webhook
 def process_webhook(data):
@@ -31,13 +474,211 @@ def process_webhook(data):
     # Process the webhook data here
     return f"Webhook received with data: {data}"
 
-# Example usage of send_webhook function
+# Handlers of inbound webhooks: source -> function(data)
+WEBHOOK_HANDLERS = {}
+
+# Define a decorator to register the handler of an inbound webhook source
+def webhook_handler(source):
+    """
+    Register the function processing the webhooks received at /api/v1/webhooks/<source>.
+
+    Handlers run in the inbound worker pool with their own database unit of work, after the
+    sender already got its acknowledgement. Sources without a handler use process_webhook.
+    A source only accepts webhooks once its secret is set (see webhook_secret).
+
+    Args:
+        source (str): The source name in the URL.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(function):
+        WEBHOOK_HANDLERS[source] = function
+        return function
+    return decorator
+
+# Define the settings of inbound webhooks
+def webhook_secret(source):
+    """
+    Get the HMAC secret of an inbound webhook source.
+
+    Args:
+        source (str): The source name.
+
+    Returns:
+        str: WEBHOOK_SECRET_<SOURCE> (upper-cased, '-' as '_'), else WEBHOOK_SECRET, else None.
+    """
+    name = 'WEBHOOK_SECRET_' + source.upper().replace('-', '_')
+    return os.environ.get(name) or os.environ.get('WEBHOOK_SECRET') or None
+
+# Define the function to verify the signature of an inbound webhook
+def verify_signature(secret, body, signature):
+    """
+    Check an HMAC-SHA256 signature of the raw body in constant time.
+
+    Args:
+        secret (str): The shared secret.
+        body (bytes): The raw request body.
+        signature (str): The signature header, as 'sha256=<hex>' or '<hex>'.
+
+    Returns:
+        bool: True if the signature matches.
+    """
+    if not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest().encode()
+    received = signature.split('=', 1)[1] if signature.startswith('sha256=') else signature
+    # compare_digest() only accepts ASCII strings, so compare bytes: a malformed header is a mismatch
+    return hmac.compare_digest(expected, received.strip().lower().encode('utf-8', 'replace'))
+
+# Define the queue and worker pool processing inbound webhooks
+class InboundWebhooks:
+    """
+    Accepts inbound webhooks and processes them in a pool of worker threads.
+
+    accept() only checks the signature and the idempotency key and queues the raw body, so the
+    HTTP worker answers at once whatever the handler costs. When the queue is full, webhooks are
+    refused with 503 so the sender retries later.
+
+    Idempotency keys (the first header of WEBHOOK_IDEMPOTENCY_HEADERS present) are remembered in
+    an LRU cache for WEBHOOK_DEDUPE_TTL seconds; a webhook repeating a key is acknowledged but not
+    processed again. A key is forgotten when its webhook is refused or its handler fails, so the
+    sender's retry is processed. The cache is per process: use one web process, or a shared
+    CacheBackend.
+
+    Attributes:
+        workers (int): The number of worker threads.
+        max_queue (int): The number of webhooks allowed to wait.
+        dedupe (CacheBackend): The cache of seen idempotency keys.
+    """
+
+    def __init__(self, workers=None, max_queue=None, dedupe=None):
+        """
+        Initializes the InboundWebhooks class, reading unset values from environment variables.
+
+        Args:
+            workers (int, optional): WEBHOOK_WORKERS, defaults to 4.
+            max_queue (int, optional): WEBHOOK_QUEUE_SIZE, defaults to 10000.
+            dedupe (CacheBackend, optional): Defaults to an LRUCache of WEBHOOK_DEDUPE_SIZE keys
+                (100000) kept WEBHOOK_DEDUPE_TTL seconds (86400).
+        """
+        self.workers = workers or int(os.environ.get('WEBHOOK_WORKERS') or 4)
+        self.max_queue = max_queue or int(os.environ.get('WEBHOOK_QUEUE_SIZE') or 10000)
+        self.dedupe = dedupe or LRUCache(
+            maxsize=int(os.environ.get('WEBHOOK_DEDUPE_SIZE') or 100000),
+            ttl=float(os.environ.get('WEBHOOK_DEDUPE_TTL') or 86400),
+        )
+        self.signature_header = os.environ.get('WEBHOOK_SIGNATURE_HEADER') or 'X-Signature-256'
+        self.idempotency_headers = [
+            header.strip() for header in
+            (os.environ.get('WEBHOOK_IDEMPOTENCY_HEADERS') or 'Idempotency-Key,X-Idempotency-Key,X-GitHub-Delivery,Webhook-Id').split(',')
+            if header.strip()
+        ]
+        self.queue = queue.Queue(maxsize=self.max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.stats = WebhookStats(('received', 'accepted', 'duplicates', 'unauthorized', 'rejected_full', 'processed', 'failed'))
+
+    def _start_workers(self):
+        """
+        Start the worker threads on first use (after a server fork, in the worker process).
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'webhook-{index + 1}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        """
+        Process queued webhooks forever.
+        """
+        while True:
+            source, body, key = self.queue.get()
+            token = begin_scope()
+            try:
+                data = json.loads(body) if body else None
+                WEBHOOK_HANDLERS.get(source, process_webhook)(data)
+                self.stats.add(processed=1)
+            except Exception as e:
+                if key is not None:
+                    self.dedupe.delete(key)  # Not processed, so the sender's retry must go through
+                self.stats.add(failed=1)
+                print(f"Webhook from {source} failed: {e}")
+            finally:
+                end_scope(token)
+                self.queue.task_done()
+
+    def accept(self, source, body, headers):
+        """
+        Verify and queue an inbound webhook.
+
+        Args:
+            source (str): The source name in the URL.
+            body (bytes): The raw request body.
+            headers (Mapping): The request headers.
+
+        Returns:
+            tuple: (HTTP status, response JSON, extra response headers).
+        """
+        self.stats.add(received=1)
+        secret = webhook_secret(source)
+        if secret is None:
+            # Only sources with a secret are accepted, so nothing unsigned is ever processed
+            return 404, {'status': 'unknown source'}, {}
+        if not verify_signature(secret, body, headers.get(self.signature_header)):
+            self.stats.add(unauthorized=1)
+            return 401, {'status': 'invalid signature'}, {}
+
+        key = next((headers.get(header) for header in self.idempotency_headers if headers.get(header)), None)
+        if key is not None:
+            key = (source, key)
+            with self._lock:
+                if self.dedupe.get(key) is not MISSING:
+                    self.stats.add(duplicates=1)
+                    return 200, {'status': 'duplicate'}, {}
+                self.dedupe.set(key, True)
+
+        self._start_workers()
+        try:
+            self.queue.put_nowait((source, body, key))
+        except queue.Full:
+            if key is not None:
+                self.dedupe.delete(key)  # Not processed, so the retry must go through
+            self.stats.add(rejected_full=1)
+            return 503, {'status': 'busy'}, {'Retry-After': '1'}
+        self.stats.add(accepted=1)
+        return 202, {'status': 'accepted'}, {}
+
+    def snapshot(self):
+        """
+        Get the inbound webhook metrics.
+
+        Returns:
+            dict: The counters, the queue depth and the dedupe cache stats.
+        """
+        return dict(self.stats.snapshot(), queued=self.queue.qsize(), workers=len(self._threads), dedupe=self.dedupe.stats())
+
+inbound_webhooks = InboundWebhooks()
+
+# Example usage of asend_webhook function (in a cog)
+# response = await asend_webhook("https://example.com/webhook", {"key": "value"})
+# print(f"Webhook sent with status: {response.status_code} after {response.attempts} attempt(s)")
+
+# Example usage of send_webhook function (in a Flask route)
 # url = "https://example.com/webhook"
 # data = {"key": "value"}
 # response = send_webhook(url, data)
 # print(f"Webhook sent with status: {response.status_code}")
 
+# Example usage of an inbound webhook handler (POST /api/v1/webhooks/payments, signed with WEBHOOK_SECRET_PAYMENTS)
+# @webhook_handler('payments')
+# def handle_payment(data):
+#     Users.get(data['user_id']).deposit(data['amount'])
+
 # Example usage of process_webhook function
 # incoming_data = {"key": "value"}
 # response_message = process_webhook(incoming_data)
-# print(response_message)
\ No newline at end of file
+# print(response_message)
@@ -1,5 +1,7 @@
 import disnake
 from disnake.ext import commands
+from app.Actions.shards import shard_latency, shard_stats
+from app.Actions.ratelimit import rate_limit, guild_commands
 
 class Ping(commands.Cog):
     """
@@ -22,6 +24,8 @@ class Ping(commands.Cog):
         self.bot = bot
 
     @commands.command()
+    @rate_limit(3, 10, key='user')
+    @rate_limit(key='guild', limiter=guild_commands)
     async def ping(self, ctx):
         """
         Command to check the bot's latency.
@@ -31,8 +35,10 @@ class Ping(commands.Cog):
         Args:
             ctx (commands.Context): The context in which the command was invoked.
         """
-        latency = round(self.bot.latency * 1000)  # Calculate bot's latency in milliseconds
-        await ctx.send(f'Pong! Latency: {latency}ms')
+        latency = round(shard_latency(self.bot, ctx.guild) * 1000)  # Calculate the latency of this guild's shard in milliseconds
+        shard = f' (shard {ctx.guild.shard_id})' if ctx.guild and self.bot.shard_count else ''
+        events = shard_stats.snapshot()['events_per_second']
+        await ctx.send(f'Pong! Latency: {latency}ms{shard}, {events} events/s')
 
 def setup(bot):
     bot.add_cog(Ping(bot))
\ No newline at end of file
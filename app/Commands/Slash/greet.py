@@ -1,6 +1,7 @@
 import disnake
 from disnake.ext import commands
 from app.Controllers.Discord.greetUser import greet_user
+from app.Actions.ratelimit import rate_limit, guild_commands
 
 class GreetSlash(commands.Cog):
     """
@@ -26,6 +27,8 @@ class GreetSlash(commands.Cog):
         name="hello", 
         description="Greet the user"
     )
+    @rate_limit(5, 10, key='user')
+    @rate_limit(key='guild', limiter=guild_commands)
     async def hello(self, ctx):
         """
         Command to greet the user who invoked it using the Controller: app/Controllers/Discord/greetUser.py.
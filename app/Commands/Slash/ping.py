@@ -1,5 +1,7 @@
 from disnake import OptionType, OptionChoice
 from disnake.ext import commands
+from app.Actions.shards import shard_latency, shard_stats
+from app.Actions.ratelimit import rate_limit, guild_commands
 
 class PingSlash(commands.Cog):
     """
@@ -25,6 +27,8 @@ class PingSlash(commands.Cog):
         name="ping",
         description="Check the bot's latency",
     )
+    @rate_limit(3, 10, key='user')
+    @rate_limit(key='guild', limiter=guild_commands)
     async def ping(self, ctx):
         """
         Command to check the bot's latency.
@@ -34,7 +38,9 @@ class PingSlash(commands.Cog):
         Args:
             ctx (commands.Context): The context in which the command was invoked.
         """
-        await ctx.send(f"Pong! Latency: {round(self.bot.latency * 1000)}ms")
+        latency = round(shard_latency(self.bot, ctx.guild) * 1000)
+        shard = f" (shard {ctx.guild.shard_id})" if ctx.guild and self.bot.shard_count else ""
+        await ctx.send(f"Pong! Latency: {latency}ms{shard}, {shard_stats.snapshot()['events_per_second']} events/s")
 
 def setup(bot):
     bot.add_cog(PingSlash(bot))
\ No newline at end of file
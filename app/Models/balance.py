@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, func, select
 from sqlalchemy.orm import relationship
 from database.db import BaseModel
 
@@ -14,9 +14,38 @@ class Balance(BaseModel):
     """
     __tablename__ = 'balances'  # Define the table name
 
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)  # Define the user_id column with a foreign key
+    user_id = Column(Integer, ForeignKey('users.id'), unique=True, index=True, nullable=False)  # Define the user_id column with a foreign key, one balance per user
     amount = Column(Float, nullable=False)  # Define the amount column
 
+    @classmethod
+    def before_create_index(cls, connection, index):
+        """
+        Remove duplicate balance rows before the unique index on user_id is added to an existing
+        table (see database/migrate.py). Without the index, Users._ensure_balance()'s
+        INSERT ... ON CONFLICT (user_id) DO NOTHING fails on SQLite and PostgreSQL and inserts
+        duplicates on MySQL.
+
+        Each user keeps the row with the lowest ID, the one Users.balance() reads, and the removed
+        rows are printed so they can be reconciled by hand.
+
+        Args:
+            connection (Connection): The migration's connection, inside its transaction.
+            index (Index): The index about to be created.
+        """
+        if not index.unique or [column.name for column in index.columns] != ['user_id']:
+            return
+        table = cls.__table__
+        keep = select(func.min(table.c.id)).group_by(table.c.user_id)
+        duplicates = connection.execute(
+            select(table.c.id, table.c.user_id, table.c.amount).where(table.c.id.not_in(keep)).order_by(table.c.user_id, table.c.id)
+        ).all()
+        if not duplicates:
+            return
+        for id, user_id, amount in duplicates:
+            print(f"Removing duplicate balance row id={id} user_id={user_id} amount={amount}")
+        connection.execute(table.delete().where(table.c.id.in_([id for id, _, _ in duplicates])))
+        cls.invalidate_cache()
+
     def __repr__(self):
         """
         String representation of the Balance model.
@@ -51,6 +80,23 @@ class Balance(BaseModel):
 # filtered_balances = Balance.filter(user_id=1)
 # print(filtered_balances)  # Output: [<Balance(user_id=1, amount=150.0)>]
 
+# Create, update and delete many balance instances in batches
+# Balance.bulk_create([{"user_id": 1, "amount": 10.0}, {"user_id": 2, "amount": 20.0}], batch_size=500)
+# Balance.bulk_update([{"id": 1, "amount": 15.0}, {"id": 2, "amount": 25.0}])
+# Balance.bulk_delete([1, 2])
+
 # Check if a balance instance exists by ID
 # exists = Balance.exists(balance.id)
-# print(exists)  # Output: True
\ No newline at end of file
+# print(exists)  # Output: True
+
+# Walk all balances page by page with keyset pagination, loading only the columns needed
+# page = Balance.paginate(limit=100, columns=['user_id', 'amount'])
+# next_page = Balance.paginate(after_id=page[-1].id, limit=100, columns=['user_id', 'amount'])
+
+# Stream every balance without building a list
+# for balance in Balance.iter_all(batch_size=500):
+#     print(balance)
+
+# From a Discord cog, use the async twins so the event loop isn't blocked
+# balance = await Balance.aget(1)
+# balances = await Balance.afilter(user_id=1)
\ No newline at end of file
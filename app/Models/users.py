@@ -1,5 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Boolean, DateTime, Text, Date
-from database.db import BaseModel, session
+import os
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Boolean, DateTime, Text, Date, select, update
+from database.db import BaseModel, unit_of_work, insert_ignore
+from database.cache import LRUCache
 from sqlalchemy.orm import relationship
 from app.Models.balance import Balance  # Import the Balance model
 from datetime import datetime
@@ -11,6 +13,9 @@ class Users(BaseModel):
 
     Attributes:
         __tablename__ (str): The name of the table in the database.
+        __cache__ (LRUCache): The read-through cache of get() and filter() lookups, or None unless
+            USERS_CACHE is set. It is per process: with BOOT_ROLE splitting the bot and the web server,
+            a write in one process leaves the other reading the old row for up to USERS_CACHE_TTL.
         name (str): The name of the user.
         username (str): The unique username of the user.
         discord_id (int): The unique Discord ID of the user.
@@ -22,6 +27,11 @@ class Users(BaseModel):
         balances (relationship): The relationship to the Balance model.
     """
     __tablename__ = 'users'  # Define the table name
+    __cache__ = (
+        LRUCache(maxsize=4096, ttl=float(os.environ.get('USERS_CACHE_TTL') or 60))
+        if (os.environ.get('USERS_CACHE') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+        else None
+    )  # Opt-in cache of get()/filter() lookups such as filter(discord_id=...)
 
     # Define the columns of the Users model
     name = Column(String, index=True, nullable=True)  # Define the name column
@@ -45,82 +55,172 @@ class Users(BaseModel):
         """
         return f"<User(name={self.name}, email={self.email})>"
 
-    def get_balance(self):
+    @staticmethod
+    def _ensure_balance(db_session, user_id):
+        """
+        Create a user's zero balance row unless it exists, with INSERT ... ON CONFLICT DO NOTHING.
+
+        Args:
+            db_session (Session): The database session.
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the row was created.
+        """
+        dialect_name = db_session.get_bind().dialect.name
+        result = db_session.execute(insert_ignore(Balance, dialect_name, ['user_id'], user_id=user_id, amount=0.0))
+        return result.rowcount == 1
+
+    def get_balance(self, db_session=None):
         """
         Get the user's balance model instance, creating one if it doesn't exist.
 
+        Args:
+            db_session (Session, optional): The database session. Defaults to None.
+
         Returns:
             Balance: The user's balance model instance.
         """
-        if not self.balances:
-            new_balance = Balance(user_id=self.id, amount=0.0)
-            session.add(new_balance)
-            session.commit()
-            return new_balance
-        return self.balances[0]
-    
-    def balance(self):
+        with unit_of_work(db_session) as db_session:
+            query = db_session.query(Balance).filter(Balance.user_id == self.id)
+            balance = query.first()
+            if balance is None:
+                if self._ensure_balance(db_session, self.id):
+                    db_session.commit()
+                    Balance.invalidate_cache()
+                balance = query.first()
+            return balance
+
+    def balance(self, db_session=None):
         """
-        Get the user's balance amount, creating one if it doesn't exist.
+        Get the user's balance amount.
+
+        This is a single indexed SELECT of the amount column. A user without a balance row has
+        a balance of 0.0; the row is created by the first deposit or get_balance() call.
+
+        Args:
+            db_session (Session, optional): The database session. Defaults to None.
 
         Returns:
             float: The user's balance amount.
         """
-        if not self.balances:
-            new_balance = Balance(user_id=self.id, amount=0.0)
-            session.add(new_balance)
-            session.commit()
-            return new_balance.amount
-        return self.balances[0].amount
+        with unit_of_work(db_session) as db_session:
+            amount = db_session.scalar(select(Balance.amount).where(Balance.user_id == self.id))
+            return amount if amount is not None else 0.0
+
+    @staticmethod
+    def _credit(db_session, user_id, amount):
+        """
+        Add an amount to a user's balance with a single atomic UPDATE.
+
+        Args:
+            db_session (Session): The database session.
+            user_id (int): The ID of the user.
+            amount (float): The amount to add.
+        """
+        statement = (
+            update(Balance)
+            .where(Balance.user_id == user_id)
+            .values(amount=Balance.amount + amount)
+        )
+        if db_session.execute(statement).rowcount == 0:
+            # First deposit: create the row (a concurrent creator wins harmlessly), then add
+            Users._ensure_balance(db_session, user_id)
+            db_session.execute(statement)
+
+    @staticmethod
+    def _debit(db_session, user_id, amount):
+        """
+        Subtract an amount from a user's balance with a single atomic conditional UPDATE.
+
+        Args:
+            db_session (Session): The database session.
+            user_id (int): The ID of the user.
+            amount (float): The amount to subtract.
 
-    def deposit(self, amount):
+        Raises:
+            ValueError: If the balance is insufficient.
+        """
+        result = db_session.execute(
+            update(Balance)
+            .where(Balance.user_id == user_id, Balance.amount >= amount)
+            .values(amount=Balance.amount - amount)
+        )
+        if result.rowcount == 0:
+            raise ValueError("Insufficient balance")
+
+    def deposit(self, amount, db_session=None):
         """
         Deposit an amount to the user's balance.
 
         Args:
             amount (float): The amount to deposit.
-        """
-        balance = self.get_balance()
-        balance.amount += amount
-        session.commit()
+            db_session (Session, optional): The database session. Defaults to None.
 
-    def withdraw(self, amount):
+        Raises:
+            ValueError: If the amount is not positive.
+        """
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        with unit_of_work(db_session) as db_session:
+            self._credit(db_session, self.id, amount)
+            db_session.commit()
+        Balance.invalidate_cache()
+
+    def withdraw(self, amount, db_session=None):
         """
         Withdraw an amount from the user's balance.
 
+        The balance check and the subtraction are one UPDATE ... WHERE amount >= :amount,
+        so concurrent withdrawals can never overdraw the balance.
+
         Args:
             amount (float): The amount to withdraw.
+            db_session (Session, optional): The database session. Defaults to None.
 
         Raises:
-            ValueError: If the balance is insufficient.
+            ValueError: If the amount is not positive or the balance is insufficient.
         """
-        balance = self.get_balance()
-        if balance.amount >= amount:
-            balance.amount -= amount
-            session.commit()
-        else:
-            raise ValueError("Insufficient balance")
-        
-        
-    def transfer(self, recipient, amount):
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        with unit_of_work(db_session) as db_session:
+            try:
+                self._debit(db_session, self.id, amount)
+            except ValueError:
+                db_session.rollback()
+                raise
+            db_session.commit()
+        Balance.invalidate_cache()
+
+    def transfer(self, recipient, amount, db_session=None):
         """
         Transfer an amount from the user's balance to the recipient's balance.
 
+        Both balances change in one transaction. The rows are updated in user ID order, so
+        concurrent transfers in opposite directions lock them in the same order and can't deadlock.
+
         Args:
             recipient (Users): The recipient user.
             amount (float): The amount to transfer.
+            db_session (Session, optional): The database session. Defaults to None.
 
         Raises:
-            ValueError: If the balance is insufficient.
+            ValueError: If the amount is not positive or the balance is insufficient.
         """
-        balance = self.get_balance()
-        if balance.amount >= amount:
-            balance.amount -= amount
-            recipient_balance = recipient.get_balance()
-            recipient_balance.amount += amount
-            session.commit()
-        else:
-            raise ValueError("Insufficient balance")
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        if recipient.id == self.id:
+            return
+        steps = sorted([(self.id, self._debit), (recipient.id, self._credit)], key=lambda step: step[0])
+        with unit_of_work(db_session) as db_session:
+            try:
+                for user_id, apply in steps:
+                    apply(db_session, user_id, amount)
+            except ValueError:
+                db_session.rollback()
+                raise
+            db_session.commit()
+        Balance.invalidate_cache()
      
 # Example usage of the Users model
 
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, Integer, Float, Text, Index
+from database.db import BaseModel
+
+# Define the WebhookOutbox model class, inheriting from BaseModel
+class WebhookOutbox(BaseModel):
+    """
+    WebhookOutbox model holding webhooks waiting to be delivered by the outbox worker.
+
+    Attributes:
+        __tablename__ (str): The name of the table in the database.
+        url (str): The webhook URL.
+        payload (str): The JSON payload.
+        status (str): 'pending', 'sending' (claimed by a worker), 'sent' or 'dead'.
+        attempts (int): The number of delivery attempts made.
+        next_attempt_at (float): The UNIX time from which the webhook may be (re)sent.
+        claim (str): The token of the worker batch that claimed the webhook.
+        claimed_at (float): The UNIX time the webhook was claimed.
+        created_at (float): The UNIX time the webhook was enqueued.
+        sent_at (float): The UNIX time the webhook was delivered.
+        last_error (str): The error of the last failed attempt.
+    """
+    __tablename__ = 'webhook_outbox'  # Define the table name
+    __table_args__ = (
+        Index('ix_webhook_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),  # Finds the due webhooks
+    )
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    url = Column(Text, nullable=False)  # Define the url column
+    payload = Column(Text, nullable=False)  # Define the payload column
+    status = Column(String(16), nullable=False, default=PENDING)  # Define the status column
+    attempts = Column(Integer, nullable=False, default=0)  # Define the attempts column
+    next_attempt_at = Column(Float, nullable=False)  # Define the next_attempt_at column
+    claim = Column(String(32), nullable=True)  # Define the claim column
+    claimed_at = Column(Float, nullable=True)  # Define the claimed_at column
+    created_at = Column(Float, nullable=False)  # Define the created_at column
+    sent_at = Column(Float, nullable=True)  # Define the sent_at column
+    last_error = Column(Text, nullable=True)  # Define the last_error column
+
+    def __repr__(self):
+        """
+        String representation of the WebhookOutbox model.
+
+        Returns:
+            str: A string representation of the WebhookOutbox instance.
+        """
+        return f"<WebhookOutbox(id={self.id}, status={self.status}, attempts={self.attempts})>"
+
+# Example usage of the WebhookOutbox model (webhooks are normally enqueued with app/Actions/outbox.py)
+
+# List the webhooks that failed for good
+# dead = WebhookOutbox.filter(status=WebhookOutbox.DEAD)
+
+# Count the webhooks waiting to be delivered
+# WebhookOutbox.query().filter(status=WebhookOutbox.PENDING).count()
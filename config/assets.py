@@ -0,0 +1,286 @@
+"""
+assets.py
+This file compresses the Flask app's responses and builds and serves its static assets.
+
+Compression:
+- Responses of a compressible type (HTML, CSS, JS, JSON, SVG, ...) of at least COMPRESS_MIN_SIZE
+  bytes are compressed with brotli or gzip, whichever the client prefers (brotli needs the
+  'brotli' package). Compressed bodies are kept in a small LRU keyed by ETag, so cached routes
+  (see app/Actions/route_cache.py) are only compressed once.
+
+Static assets:
+- Put CSS, JS, images and fonts in 'resources/css', 'resources/js', 'resources/images' and
+  'resources/fonts'. They are copied to 'resources/build' with a content hash in their name
+  (e.g. 'css/app.3f2a1b9c4d5e.css') plus precompressed '.br' and '.gz' variants, and listed in
+  'resources/build/manifest.json'.
+- Templates link them with {{ asset_url('css/app.css') }}. Fingerprinted files are served from
+  '/assets/' with 'Cache-Control: public, max-age=31536000, immutable', picking the
+  precompressed variant the client accepts, so serving them costs no compression CPU.
+- Assets are built at startup (ASSETS_BUILD_ON_START, default true) or at build time with:
+
+    python config/assets.py build
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+from flask import request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Add the project root to the Python path when run as a script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.cache import LRUCache, MISSING
+
+# Folders of the static asset sources and of the built assets
+RESOURCES_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'resources'))
+ASSET_DIRECTORIES = ('css', 'js', 'images', 'fonts')
+BUILD_DIRECTORY = os.path.join(RESOURCES_DIRECTORY, 'build')
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml', 'application/manifest+json')
+
+# Read an integer setting from environment variables
+def _env_int(name, default):
+    value = (os.environ.get(name) or '').strip()
+    return int(value) if value else default
+
+# Check whether a content type is compressible
+def is_compressible(mimetype):
+    """
+    Check whether a content type is worth compressing.
+
+    Args:
+        mimetype (str): The content type, without parameters.
+
+    Returns:
+        bool: True for text-like types.
+    """
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+# Get the encodings the server can produce, in order of preference
+def available_encodings():
+    """
+    Get the content encodings the server can produce, preferred first.
+
+    Returns:
+        list: 'br' (when the brotli package is installed) and 'gzip'.
+    """
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+# Compress data with an encoding
+def compress(data, encoding, level=None):
+    """
+    Compress data with brotli or gzip.
+
+    Args:
+        data (bytes): The data.
+        encoding (str): 'br' or 'gzip'.
+        level (int, optional): The compression level: brotli quality 0-11 or gzip level 1-9.
+            Defaults to a level suited to per-request compression (brotli 5, gzip 6).
+
+    Returns:
+        bytes: The compressed data.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=5 if level is None else level)
+    return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+
+# Define the response compression of the Flask app
+def init_compression(app, min_size=None, cache_size=None):
+    """
+    Compress the app's responses with the encoding the client prefers.
+
+    Args:
+        app (Flask): The Flask app.
+        min_size (int, optional): COMPRESS_MIN_SIZE, the smallest body compressed. Defaults to 500 bytes.
+        cache_size (int, optional): COMPRESS_CACHE_SIZE, compressed bodies kept by ETag. Defaults to 256.
+    """
+    min_size = min_size or _env_int('COMPRESS_MIN_SIZE', 500)
+    compressed_bodies = LRUCache(maxsize=cache_size or _env_int('COMPRESS_CACHE_SIZE', 256), ttl=None)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        body = MISSING
+        if etag:
+            body = compressed_bodies.get((etag, encoding))
+        if body is MISSING:
+            body = compress(data, encoding)
+            if etag:
+                compressed_bodies.set((etag, encoding), body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # A weak ETag still matches If-None-Match (weak comparison) against the plain version
+            response.set_etag(etag, weak=True)
+        return response
+
+# Build the fingerprinted, precompressed static assets
+def build_assets(resources=RESOURCES_DIRECTORY, output=BUILD_DIRECTORY, min_size=None):
+    """
+    Copy the static assets to the build folder under content-hashed names, with maximally
+    compressed '.br' and '.gz' variants, and write the manifest.
+
+    Files already built (same content, same name) are skipped, and earlier builds are kept so
+    pages rendered before a deploy can still load their assets.
+
+    Args:
+        resources (str): The resources folder. Defaults to 'resources'.
+        output (str): The build folder. Defaults to 'resources/build'.
+        min_size (int, optional): The smallest file precompressed. Defaults to COMPRESS_MIN_SIZE.
+
+    Returns:
+        dict: The manifest: logical path -> fingerprinted path.
+    """
+    min_size = min_size if min_size is not None else _env_int('COMPRESS_MIN_SIZE', 500)
+    manifest = {}
+    for directory in ASSET_DIRECTORIES:
+        source_root = os.path.join(resources, directory)
+        for root, _, files in os.walk(source_root):
+            for filename in sorted(files):
+                source = os.path.join(root, filename)
+                logical = os.path.relpath(source, resources).replace(os.sep, '/')
+                with open(source, 'rb') as file:
+                    data = file.read()
+                name, extension = os.path.splitext(logical)
+                fingerprinted = f"{name}.{hashlib.sha256(data).hexdigest()[:12]}{extension}"
+                manifest[logical] = fingerprinted
+
+                target = os.path.join(output, fingerprinted)
+                if os.path.exists(target):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+                if len(data) >= min_size and is_compressible(mimetypes.guess_type(filename)[0]):
+                    with open(target + '.gz', 'wb') as file:
+                        file.write(compress(data, 'gzip', level=9))
+                    if brotli is not None:
+                        with open(target + '.br', 'wb') as file:
+                            file.write(compress(data, 'br', level=11))
+
+    os.makedirs(output, exist_ok=True)
+    temporary = os.path.join(output, 'manifest.json.tmp')
+    with open(temporary, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(temporary, os.path.join(output, 'manifest.json'))
+    return manifest
+
+# Load the asset manifest
+def load_manifest(output=BUILD_DIRECTORY):
+    """
+    Load the manifest written by build_assets().
+
+    Args:
+        output (str): The build folder. Defaults to 'resources/build'.
+
+    Returns:
+        dict: The manifest, empty if the assets were never built.
+    """
+    try:
+        with open(os.path.join(output, 'manifest.json')) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+# Define the static asset serving of the Flask app
+def init_assets(app, build=None):
+    """
+    Build the static assets (optionally), serve them from '/assets/' and add asset_url() to templates.
+
+    Args:
+        app (Flask): The Flask app.
+        build (bool, optional): Whether to build the assets now. Defaults to ASSETS_BUILD_ON_START (true).
+    """
+    if build is None:
+        build = (os.environ.get('ASSETS_BUILD_ON_START') or 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+    manifest = build_assets() if build else load_manifest()
+    fingerprinted = set(manifest.values())
+    variants = {}  # fingerprinted path -> encodings with a precompressed file, checked once per path
+    variants_lock = threading.Lock()
+
+    def precompressed(filename):
+        target = safe_join(BUILD_DIRECTORY, filename)
+        if target is None:
+            return []
+        return [encoding for encoding, suffix in (('br', '.br'), ('gzip', '.gz')) if os.path.isfile(target + suffix)]
+
+    def asset_url(path):
+        """
+        Get the URL of a static asset, fingerprinted when it was built.
+
+        Args:
+            path (str): The logical path, e.g. 'css/app.css'.
+
+        Returns:
+            str: The URL, e.g. '/assets/css/app.3f2a1b9c4d5e.css'.
+        """
+        return url_for('assets', filename=manifest.get(path, path))
+
+    app.add_template_global(asset_url)
+
+    @app.route('/assets/<path:filename>', endpoint='assets')
+    def serve_asset(filename):
+        immutable = filename in fingerprinted
+        if immutable:
+            # Only manifest entries are remembered, so requests for arbitrary paths can't grow it
+            with variants_lock:
+                encodings = variants.get(filename)
+                if encodings is None:
+                    encodings = variants[filename] = precompressed(filename)
+        else:
+            encodings = precompressed(filename)
+        max_age = 31536000 if immutable else 300
+        encoding = request.accept_encodings.best_match(encodings) if encodings else None
+
+        if encoding is None:
+            response = send_from_directory(BUILD_DIRECTORY, filename, max_age=max_age)
+        else:
+            suffix = '.br' if encoding == 'br' else '.gz'
+            response = send_from_directory(
+                BUILD_DIRECTORY, filename + suffix, max_age=max_age,
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+            )
+            response.headers['Content-Encoding'] = encoding
+        if encodings:
+            response.vary.add('Accept-Encoding')
+        if immutable:
+            response.cache_control.immutable = True
+            response.cache_control.public = True
+        return response
+
+# Main execution
+if __name__ == "__main__":
+    if sys.argv[1:] != ['build']:
+        print("Usage: python config/assets.py build")
+        sys.exit(1)
+    built = build_assets()
+    print(f"Built {len(built)} asset(s) into {BUILD_DIRECTORY}")
@@ -5,14 +5,38 @@ This file is responsible for setting up and running a Flask app and a Discord bo
 To customize the Flask app:
 - Set the FLASK_HOST environment variable to specify the host address.
 - Set the FLASK_PORT environment variable to specify the port number.
+- Set the FLASK_SERVER environment variable to 'waitress' or 'gunicorn' to serve with a production
+  server instead of the Flask development server (see 'config/server.py' for the tuning options).
 - Place your HTML templates in the '../resources/views' folder.
+- Place your CSS, JS, images and fonts in '../resources/css', '../resources/js', ... and link them
+  with {{ asset_url('css/app.css') }} (see 'config/assets.py').
 - Create routes in the 'routes/web.py' file.
 - Create API routes in the 'routes/api.py' file.                
 
 To customize the Discord bot:
 - Set the DISCORD_BOT_TOKEN environment variable to specify the bot token.
 - Set the DISCORD_PREFIX environment variable to specify the bot's command prefix.
-- Create commands in the 'app/Commands/Context' and 'app/Commands/Slash' folders.
+- Set DISCORD_INTENTS, DISCORD_MEMBER_CACHE and DISCORD_CHUNK_AT_STARTUP to trim the gateway traffic
+  and member cache, and DISCORD_AUTO_SHARD or DISCORD_SHARD_COUNT/DISCORD_SHARD_IDS to shard the bot
+  (see 'config/bot.py').
+- Create commands in the 'app/Commands/Context' and 'app/Commands/Slash' folders. Only the slash
+  commands that changed since the last start are re-registered, and with COG_HOT_RELOAD=true edited
+  cogs are reloaded without restarting (see 'app/Actions/cogs.py').
+
+Startup is split into phases, and only the enabled subsystem (web or bot) is imported:
+- config:   Read the environment and pick the subsystems to start.
+- database: Create the engine and migrate or check the schema as selected by DB_MIGRATE
+            (see 'database/migrate.py'; 'python database/migrate.py migrate' runs it explicitly).
+- web:      Import Flask and the routes, build the assets (only when the Flask app is enabled).
+- bot:      Import disnake, create the bot and load the cogs (only when the bot is enabled).
+- Set METRICS_ENABLED=true to time commands, requests and queries and serve them in the Prometheus
+  format at /api/v1/metrics to requests carrying STATS_TOKEN (see 'app/Actions/metrics.py').
+- Run 'python config/boot.py --profile-startup' (or set STARTUP_PROFILE=true) to print the import
+  and init time of every phase before serving.
+
+To run the Flask app and the Discord bot in separate processes:
+- Run 'python config/supervisor.py' instead of this file. It starts this file once per role with
+  BOOT_ROLE set to 'web' or 'bot' (and WEB_PROCESSES web processes), restarting them on crashes.
 
 To add more threads/parallel tasks:
 - Create additional functions for each task you want to run concurrently.
@@ -28,82 +52,228 @@ Author: Md Mahedi Zaman Zaber (mahedizaber51)
 import os
 import sys
 import threading
-from flask import Flask
-import disnake as discord
-import glob
-from disnake.ext import commands
-import glob
-from database.db import engine, Base
+import time
+from contextlib import contextmanager
+
+# Define the startup profiler
+class StartupProfile:
+    """
+    Times the import and init steps of each startup phase.
+
+    Attributes:
+        enabled (bool): Whether the timings are recorded and reported.
+        steps (list): (phase, step, seconds, modules imported) of every timed step.
+    """
+
+    def __init__(self, enabled):
+        """
+        Initializes the StartupProfile class.
+
+        Args:
+            enabled (bool): Whether to record the timings.
+        """
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.steps = []
+
+    @contextmanager
+    def phase(self, name, step):
+        """
+        Time one step of a startup phase.
+
+        Args:
+            name (str): The phase, e.g. 'web'.
+            step (str): The step, 'import' or 'init'.
+        """
+        if not self.enabled:
+            yield
+            return
+        modules = len(sys.modules)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, step, time.perf_counter() - started_at, len(sys.modules) - modules))
+
+    def report(self):
+        """
+        Print the timing breakdown of the startup phases.
+        """
+        if not self.enabled:
+            return
+        print(f"{'phase':<10} {'step':<8} {'ms':>9} {'modules':>8}")
+        for name, step, seconds, modules in self.steps:
+            print(f"{name:<10} {step:<8} {seconds * 1000:>9.1f} {modules:>8}")
+        print(f"{'total':<10} {'':<8} {(time.perf_counter() - self.started_at) * 1000:>9.1f} {len(sys.modules):>8}")
+
+profile = StartupProfile(
+    '--profile-startup' in sys.argv[1:]
+    or (os.environ.get('STARTUP_PROFILE') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+)
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
+# Phase 1: configuration
+with profile.phase('config', 'import'):
+    from config.server import run_server, server_mode
 
 # Check if the Flask app and Discord bot are enabled
-flask_enabled = os.environ.get('FLASK_HOST') # Check if the FLASK_HOST environment variable is set
-discord_enabled = os.environ.get('DISCORD_TOKEN') # Check if the DISCORD_BOT_TOKEN environment variable is set
+boot_role = os.environ.get('BOOT_ROLE') or 'all' # 'web' or 'bot' when started by config/supervisor.py
+flask_enabled = os.environ.get('FLASK_HOST') and boot_role in ('all', 'web') # Check if the FLASK_HOST environment variable is set
+discord_enabled = os.environ.get('DISCORD_TOKEN') and boot_role in ('all', 'bot') # Check if the DISCORD_BOT_TOKEN environment variable is set
+
+# Deliver queued webhooks in the bot process, or in the web process when there is no bot
+outbox_enabled = (os.environ.get('OUTBOX_WORKER') or 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+outbox_in_bot = outbox_enabled and discord_enabled
+outbox_in_web = outbox_enabled and flask_enabled and not os.environ.get('DISCORD_TOKEN')
+
+# Collect command, request and query metrics (see app/Actions/metrics.py); nothing is installed when disabled
+metrics_on = (os.environ.get('METRICS_ENABLED') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Phase 2: database
+with profile.phase('database', 'import'):
+    from database.db import begin_scope, end_scope
+    from database.migrate import ensure_schema
+
+with profile.phase('database', 'init'):
+    try:
+        print(f"Database schema {ensure_schema()}") # Migrate or check the schema as selected by DB_MIGRATE
+    except (ValueError, RuntimeError) as e:
+        sys.exit(f"Database schema check failed: {e}")
+
+if metrics_on:
+    with profile.phase('metrics', 'import'):
+        from app.Actions.metrics import instrument_database
+
+    with profile.phase('metrics', 'init'):
+        instrument_database() # Count and time every SQL statement by BaseModel method
 
-# Flask app setup
+# Phase 3: Flask app setup
 if flask_enabled:
     print("Flask app enabled")
-    app = Flask(__name__, template_folder='../resources/views') # Define the Flask app
-    with app.app_context():
-        import routes.web # Import Web routes
-        from routes.api import api # Import API routes
-        app.register_blueprint(api) # Register the API blueprint
+    with profile.phase('web', 'import'):
+        from flask import Flask, g
+        from config.assets import init_assets, init_compression
+
+    with profile.phase('web', 'init'):
+        app = Flask(__name__, template_folder='../resources/views') # Define the Flask app
+        with app.app_context():
+            import routes.web # Import Web routes
+            from routes.api import api # Import API routes
+            app.register_blueprint(api) # Register the API blueprint
+        init_assets(app) # Build and serve the fingerprinted static assets (see config/assets.py)
+        init_compression(app) # Compress responses with brotli/gzip
+        if metrics_on:
+            from app.Actions.metrics import init_metrics
+            init_metrics(app) # Time every request by endpoint and status
+
+    # Scope one database unit of work to each request
+    @app.before_request
+    def open_db_scope():
+        g.db_scope = begin_scope()
+
+    @app.teardown_request
+    def close_db_scope(exception=None):
+        end_scope(g.pop('db_scope', None))
 
     def run_flask():
-        app.run(host=os.environ.get('FLASK_HOST'), port=os.environ.get('FLASK_PORT'))
+        run_server(app, host=os.environ.get('FLASK_HOST'), port=os.environ.get('FLASK_PORT'))
 
-# Discord bot setup
+# Phase 4: Discord bot setup
 if discord_enabled:
     print("Discord bot enabled")
-    intents = discord.Intents.all() # Define the bot's intents
-    bot = commands.Bot(command_prefix=os.environ.get('DISCORD_PREFIX','!'), intents=intents,)
-    
+    with profile.phase('bot', 'import'):
+        from config.bot import create_bot
+        from app.Actions.offload import Offloader, set_offloader
+        from app.Actions.shards import install as install_shard_stats
+        from app.Actions.pagination import install as install_paginators
+        from app.Actions.cogs import CogLoader, install as install_cog_loader
+        if outbox_in_bot:
+            from app.Actions.outbox import install as install_outbox
+
+    with profile.phase('bot', 'init'):
+        bot = create_bot() # Define the bot with the configured intents, member cache and shards
+        install_shard_stats(bot) # Collect per-shard latency and event rates (see app/Actions/shards.py)
+        install_paginators(bot) # Handle clicks on persistent paginators (see app/Actions/pagination.py)
+        if outbox_in_bot:
+            install_outbox(bot) # Deliver queued webhooks on the bot's event loop (see app/Actions/outbox.py)
+        if metrics_on:
+            from app.Actions.metrics import install as install_metrics
+            install_metrics(bot) # Time every command and measure the event loop lag
+
+        # Bounded thread pool for blocking work inside cogs (see app/Actions/offload.py)
+        bot.offloader = Offloader(
+            max_workers=int(os.environ.get('OFFLOAD_WORKERS') or 8),
+            max_pending=int(os.environ.get('OFFLOAD_MAX_PENDING') or 0) or None,
+        )
+        set_offloader(bot.offloader)
+
     # Define the bot's event listeners
     @bot.event
     async def on_ready():
         print(f'Logged in as {bot.user}') # Print the bot's username when it's ready
 
-    def load_cogs(bot):
-        # Load all cogs in the 'app/Commands/Context' and 'app/Commands/Slash' directories
-        cog_directories = ['app/Commands/Context', 'app/Commands/Slash'] 
-        for directory in cog_directories:
-            for filename in glob.glob(f'{directory}/*.py'):
-                if filename.endswith('.py'):
-                    cog = filename.replace('/', '.').replace('\\', '.').replace('.py', '')
-                    try:
-                        bot.load_extension(cog)
-                        print(f'Loaded cog: {cog}') # Print the name of the cog that was loaded
-                    except Exception as e:
-                        print(f'Failed to load cog {cog}: {e}') # Print the name of the cog that failed to load
+    # Scope one database unit of work to each command invocation / interaction
+    async def open_db_scope(_):
+        begin_scope()
+
+    async def close_db_scope(_):
+        end_scope()
+
+    for register in (bot.before_invoke, bot.before_slash_command_invoke, bot.before_user_command_invoke, bot.before_message_command_invoke):
+        register(open_db_scope)
+    for register in (bot.after_invoke, bot.after_slash_command_invoke, bot.after_user_command_invoke, bot.after_message_command_invoke):
+        register(close_db_scope)
+
+    # Load the cogs in 'app/Commands/Context' and 'app/Commands/Slash', push only the changed
+    # application commands and hot-reload edited cogs (see app/Actions/cogs.py)
+    cog_loader = CogLoader(bot)
+    install_cog_loader(bot, cog_loader)
 
     def run_discord_bot():
         # Start the Discord bot
         try:
             print("Starting Discord bot...")
-            load_cogs(bot)
             bot.run(os.environ.get('DISCORD_TOKEN'))
         except Exception as e:
             print(f"Error starting Discord bot: {e}")
+        finally:
+            bot.offloader.shutdown(wait=False)
 
 # Main execution
 if __name__ == "__main__":
+    # Production servers install signal handlers, so they must run in the main thread
+    flask_in_main_thread = flask_enabled and server_mode() != 'dev'
+
+    if discord_enabled:
+        with profile.phase('bot', 'cogs'):
+            cogs = cog_loader.load_all()
+        print(f"Loaded {cogs['loaded']} cog(s), {cogs['failed']} failed, {len(cogs['changed'])} changed command(s) to sync")
+
+    if outbox_in_web:
+        with profile.phase('outbox', 'import'):
+            from app.Actions.outbox import OutboxWorker
+        OutboxWorker().start_in_thread()
+
+    profile.report() # Print the startup timings when --profile-startup is set
+
     # Create threads for Flask and Discord bot
-    if flask_enabled:
+    if flask_enabled and not flask_in_main_thread:
         flask_thread = threading.Thread(target=run_flask)
         flask_thread.start()
         
     if discord_enabled:
-        discord_thread = threading.Thread(target=run_discord_bot)
+        # Don't keep the process alive once a production web server has shut down
+        discord_thread = threading.Thread(target=run_discord_bot, daemon=flask_in_main_thread)
         discord_thread.start() 
+
+    if flask_in_main_thread:
+        run_flask()
         
     # Join threads to the main thread
-    if flask_enabled:
+    if flask_enabled and not flask_in_main_thread:
         flask_thread.join()
         
-    if discord_enabled:
+    if discord_enabled and not flask_in_main_thread:
         discord_thread.join()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+bot.py
+This file builds the Discord bot from environment variables: sharding, gateway intents and the
+member cache.
+
+Sharding (all optional; without them a single, unsharded connection is used):
+- DISCORD_AUTO_SHARD: 'true' to use an AutoShardedBot with Discord's recommended shard count.
+- DISCORD_SHARD_COUNT: The total number of shards across every bot process.
+- DISCORD_SHARD_IDS: The shards this process runs, e.g. '0-3' or '0,2,4'; requires
+  DISCORD_SHARD_COUNT. Run one process per range to spread a large bot over several processes.
+
+Intents and member caching:
+- DISCORD_INTENTS: 'all' (default), 'default' or 'none', optionally followed by intents to add or
+  remove, e.g. 'default,members,message_content' or 'all,-presences'.
+- DISCORD_MEMBER_CACHE: 'intents' (default, cache what the intents allow), 'all', 'none', or a
+  list of flags, e.g. 'voice,joined'.
+- DISCORD_CHUNK_AT_STARTUP: 'true'/'false', whether to download every guild's member list on
+  startup. Defaults to true when the members intent is enabled; turn it off for large bots.
+
+Application commands:
+- COMMAND_SYNC: 'changed' (default) to create, edit or delete only the commands that changed since
+  they were last registered (see 'app/Actions/command_sync.py'), 'full' for disnake's sync of every
+  command on each start, or 'off' to never register commands from this process (e.g. all but one
+  shard process).
+- COMMAND_SYNC_GUILDS: Guild IDs to register the global commands in instead, for testing.
+"""
+
+import os
+import disnake as discord
+from disnake.ext import commands
+
+# Parse a boolean setting from environment variables
+def env_bool(name, default=None):
+    """
+    Read a boolean setting from environment variables.
+
+    Args:
+        name (str): The environment variable name.
+        default (bool, optional): The value to use when the variable is unset or blank.
+
+    Returns:
+        bool: The configured value.
+    """
+    value = (os.environ.get(name) or '').strip().lower()
+    if not value:
+        return default
+    return value in ('1', 'true', 'yes', 'on')
+
+# Parse a list of shard IDs
+def parse_shard_ids(value):
+    """
+    Parse a list of shard IDs such as '0-3' or '0,2,4-6'.
+
+    Args:
+        value (str): The shard IDs.
+
+    Returns:
+        list: The sorted shard IDs, or None if `value` is blank.
+    """
+    if not (value or '').strip():
+        return None
+    shard_ids = set()
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-', 1)
+            shard_ids.update(range(int(start), int(end) + 1))
+        elif part:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+# Build the gateway intents
+def bot_intents(value=None):
+    """
+    Build the gateway intents from DISCORD_INTENTS (or `value`).
+
+    Args:
+        value (str, optional): The intents specification, overriding DISCORD_INTENTS.
+
+    Returns:
+        discord.Intents: The intents.
+
+    Raises:
+        ValueError: If an intent name is unknown.
+    """
+    parts = [part.strip().lower() for part in (value or os.environ.get('DISCORD_INTENTS') or 'all').split(',') if part.strip()]
+    bases = {'all': discord.Intents.all, 'default': discord.Intents.default, 'none': discord.Intents.none}
+    intents = bases[parts.pop(0)]() if parts and parts[0] in bases else discord.Intents.none()
+    for part in parts:
+        enabled = not part.startswith('-')
+        name = part.lstrip('+-')
+        if name not in discord.Intents.VALID_FLAGS:
+            raise ValueError(f"Unknown intent '{name}' in DISCORD_INTENTS")
+        setattr(intents, name, enabled)
+    return intents
+
+# Build the member cache policy
+def member_cache_flags(intents, value=None):
+    """
+    Build the member cache flags from DISCORD_MEMBER_CACHE (or `value`).
+
+    Args:
+        intents (discord.Intents): The gateway intents the bot uses.
+        value (str, optional): The cache specification, overriding DISCORD_MEMBER_CACHE.
+
+    Returns:
+        discord.MemberCacheFlags: The member cache flags.
+
+    Raises:
+        ValueError: If a flag name is unknown.
+    """
+    value = (value or os.environ.get('DISCORD_MEMBER_CACHE') or 'intents').strip().lower()
+    if value == 'intents':
+        return discord.MemberCacheFlags.from_intents(intents)
+    if value == 'all':
+        return discord.MemberCacheFlags.all()
+    flags = discord.MemberCacheFlags.none()
+    for name in value.split(','):
+        name = name.strip()
+        if name in ('', 'none'):
+            continue
+        if name not in discord.MemberCacheFlags.VALID_FLAGS:
+            raise ValueError(f"Unknown member cache flag '{name}' in DISCORD_MEMBER_CACHE")
+        setattr(flags, name, True)
+    return flags
+
+# Modes of COMMAND_SYNC: sync only the changed commands, let disnake sync everything, or never sync
+COMMAND_SYNC_MODES = ('changed', 'full', 'off')
+
+# Get the command sync mode
+def command_sync_mode():
+    """
+    Get the application command sync mode selected by COMMAND_SYNC.
+
+    Returns:
+        str: One of COMMAND_SYNC_MODES, 'changed' by default.
+
+    Raises:
+        ValueError: If COMMAND_SYNC is not a known mode.
+    """
+    mode = (os.environ.get('COMMAND_SYNC') or 'changed').strip().lower()
+    if mode not in COMMAND_SYNC_MODES:
+        raise ValueError(f"COMMAND_SYNC must be one of {', '.join(COMMAND_SYNC_MODES)}, not '{mode}'")
+    return mode
+
+# Build the bot
+def create_bot():
+    """
+    Build the bot configured by the environment: an AutoShardedBot when sharding is enabled,
+    otherwise a single-connection Bot.
+
+    Returns:
+        commands.Bot: The bot instance.
+
+    Raises:
+        ValueError: If DISCORD_SHARD_IDS is set without DISCORD_SHARD_COUNT.
+    """
+    intents = bot_intents()
+    options = {
+        'command_prefix': os.environ.get('DISCORD_PREFIX', '!'),
+        'intents': intents,
+        'member_cache_flags': member_cache_flags(intents),
+        # disnake's own sync fetches and compares every command on each start; the cog loader
+        # (app/Actions/cogs.py) pushes only the changed ones instead
+        'command_sync_flags': commands.CommandSyncFlags.default() if command_sync_mode() == 'full' else commands.CommandSyncFlags.none(),
+    }
+    chunk_at_startup = env_bool('DISCORD_CHUNK_AT_STARTUP')
+    if chunk_at_startup is not None:
+        options['chunk_guilds_at_startup'] = chunk_at_startup
+
+    shard_count = (os.environ.get('DISCORD_SHARD_COUNT') or '').strip()
+    shard_ids = parse_shard_ids(os.environ.get('DISCORD_SHARD_IDS'))
+    if shard_ids is not None:
+        if not shard_count:
+            raise ValueError("DISCORD_SHARD_IDS requires DISCORD_SHARD_COUNT")
+        print(f"Running shards {shard_ids} of {shard_count}")
+        return commands.AutoShardedBot(shard_ids=shard_ids, shard_count=int(shard_count), **options)
+    if env_bool('DISCORD_AUTO_SHARD', False) or shard_count:
+        return commands.AutoShardedBot(shard_count=int(shard_count) if shard_count else None, **options)
+    return commands.Bot(**options)
+
+# Example usage:
+# DISCORD_INTENTS=default,members DISCORD_MEMBER_CACHE=none DISCORD_CHUNK_AT_STARTUP=false
+# DISCORD_SHARD_COUNT=8 DISCORD_SHARD_IDS=0-3   # Process 1
+# DISCORD_SHARD_COUNT=8 DISCORD_SHARD_IDS=4-7   # Process 2
+# bot = create_bot()
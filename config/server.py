@@ -0,0 +1,198 @@
+"""
+server.py
+This file runs the Flask app under the server selected by the FLASK_SERVER environment variable.
+
+Server modes:
+- dev:      Flask's development server (default). One process, a thread per request.
+- waitress: Waitress, a production threaded server with a fixed worker thread pool (all platforms).
+- gunicorn: Gunicorn with FLASK_WORKERS pre-forked worker processes, each running FLASK_THREADS
+            threads (Linux/macOS). Handles SIGTERM with a graceful shutdown and SIGHUP with a
+            rolling reload of the workers.
+
+Tuning (all optional):
+- FLASK_WORKERS: Worker processes (gunicorn). Defaults to 2 x CPUs + 1.
+- FLASK_THREADS: Worker threads per process (waitress, gunicorn). Defaults to 4.
+- FLASK_BACKLOG: Pending connections queued by the listening socket. Defaults to 2048.
+- FLASK_TIMEOUT: Seconds before a silent worker/connection is dropped. Defaults to 30.
+- FLASK_KEEPALIVE: Seconds to keep an idle keep-alive connection open (gunicorn). Defaults to 5.
+- FLASK_GRACEFUL_TIMEOUT: Seconds workers get to finish in-flight requests on shutdown. Defaults to 30.
+
+When FLASK_SOCKET_FD is set (by 'config/supervisor.py'), the server accepts connections on that
+already-bound, inherited listening socket instead of binding FLASK_HOST:FLASK_PORT itself, so
+several web processes can share one port.
+"""
+
+import os
+import socket
+import signal
+import sys
+import threading
+
+# Define the supported server modes
+SERVER_MODES = ('dev', 'waitress', 'gunicorn')
+
+# Get the selected server mode
+def server_mode():
+    """
+    Get the server mode selected by FLASK_SERVER.
+
+    Returns:
+        str: One of SERVER_MODES.
+
+    Raises:
+        ValueError: If FLASK_SERVER names an unknown mode.
+    """
+    mode = (os.environ.get('FLASK_SERVER') or 'dev').strip().lower()
+    if mode not in SERVER_MODES:
+        raise ValueError(f"Unknown FLASK_SERVER '{mode}', expected one of: {', '.join(SERVER_MODES)}")
+    return mode
+
+# Read the server tuning options from environment variables
+def server_options():
+    """
+    Read the server tuning options from environment variables.
+
+    Returns:
+        dict: The workers, threads, backlog, timeout, keepalive and graceful_timeout settings.
+    """
+    def env_int(name, default):
+        value = (os.environ.get(name) or '').strip()
+        return int(value) if value else default
+
+    return {
+        'workers': env_int('FLASK_WORKERS', (os.cpu_count() or 1) * 2 + 1),
+        'threads': env_int('FLASK_THREADS', 4),
+        'backlog': env_int('FLASK_BACKLOG', 2048),
+        'timeout': env_int('FLASK_TIMEOUT', 30),
+        'keepalive': env_int('FLASK_KEEPALIVE', 5),
+        'graceful_timeout': env_int('FLASK_GRACEFUL_TIMEOUT', 30),
+    }
+
+# Get the inherited listening socket, if any
+def inherited_socket_fd():
+    """
+    Get the file descriptor of the listening socket passed down by the supervisor.
+
+    Returns:
+        int: The file descriptor from FLASK_SOCKET_FD, or None.
+    """
+    value = (os.environ.get('FLASK_SOCKET_FD') or '').strip()
+    return int(value) if value else None
+
+# Run the app with Flask's development server
+def run_dev(app, host, port, fd=None):
+    """
+    Serve the app with Flask's development server (Werkzeug), a thread per request.
+
+    Args:
+        app (Flask): The Flask app.
+        host (str): The host address to bind.
+        port (int): The port to bind.
+        fd (int, optional): An already-bound listening socket to serve on. Defaults to None.
+    """
+    if fd is None:
+        app.run(host=host, port=port, threaded=True)
+        return
+    from werkzeug.serving import make_server
+    make_server(host, port, app, threaded=True, fd=fd).serve_forever()
+
+# Run the app with Waitress
+def run_waitress(app, host, port, options, fd=None):
+    """
+    Serve the app with Waitress' thread pool until SIGINT/SIGTERM.
+
+    On SIGTERM (when running in the main thread) Waitress stops accepting connections and
+    lets its worker threads finish the requests in flight.
+
+    Args:
+        app (Flask): The Flask app.
+        host (str): The host address to bind.
+        port (int): The port to bind.
+        options (dict): The server options.
+        fd (int, optional): An already-bound listening socket to serve on. Defaults to None.
+    """
+    try:
+        from waitress import serve
+    except ImportError as e:
+        raise RuntimeError("FLASK_SERVER=waitress requires the 'waitress' package") from e
+
+    # Waitress shuts its thread pool down cleanly on SystemExit
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    if fd is None:
+        listen = {'host': host, 'port': port}
+    else:
+        listen = {'sockets': [socket.socket(fileno=fd)]}
+    serve(
+        app,
+        threads=options['threads'],
+        backlog=options['backlog'],
+        channel_timeout=options['timeout'],
+        **listen,
+    )
+
+# Run the app with Gunicorn
+def run_gunicorn(app, host, port, options, fd=None):
+    """
+    Serve the app with Gunicorn's pre-fork worker model until SIGINT/SIGTERM.
+
+    Gunicorn installs its own signal handlers, so this must be called from the main thread.
+
+    Args:
+        app (Flask): The Flask app.
+        host (str): The host address to bind.
+        port (int): The port to bind.
+        options (dict): The server options.
+        fd (int, optional): An already-bound listening socket to serve on. Defaults to None.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise RuntimeError("FLASK_SERVER=gunicorn requires the 'gunicorn' package (Linux/macOS only)") from e
+
+    def post_fork(server, worker):
+        # Pooled connections opened by the master can't be shared with forked workers
+        from database.db import engine
+        engine.dispose(close=False)
+
+    class GunicornApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}' if fd is None else f'fd://{fd}')
+            self.cfg.set('workers', options['workers'])
+            self.cfg.set('threads', options['threads'])
+            self.cfg.set('worker_class', 'gthread' if options['threads'] > 1 else 'sync')
+            self.cfg.set('backlog', options['backlog'])
+            self.cfg.set('timeout', options['timeout'])
+            self.cfg.set('keepalive', options['keepalive'])
+            self.cfg.set('graceful_timeout', options['graceful_timeout'])
+            self.cfg.set('post_fork', post_fork)
+
+        def load(self):
+            return app
+
+    GunicornApplication().run()
+
+# Run the app with the selected server
+def run_server(app, host, port, mode=None):
+    """
+    Serve the app with the server selected by FLASK_SERVER (or `mode`).
+
+    Args:
+        app (Flask): The Flask app.
+        host (str): The host address to bind.
+        port (int or str): The port to bind.
+        mode (str, optional): The server mode, overriding FLASK_SERVER. Defaults to None.
+    """
+    mode = mode or server_mode()
+    port = int(port or 5000)
+    options = server_options()
+    fd = inherited_socket_fd()
+    print(f"Serving Flask app with the '{mode}' server on {host}:{port}" + (f" (socket fd {fd})" if fd is not None else ""))
+
+    if mode == 'waitress':
+        run_waitress(app, host, port, options, fd=fd)
+    elif mode == 'gunicorn':
+        run_gunicorn(app, host, port, options, fd=fd)
+    else:
+        run_dev(app, host, port, fd=fd)
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+supervisor.py
+This file runs the web app and the Discord bot in separate processes and keeps them running.
+
+Use it instead of 'config/boot.py' when request handling and the bot gateway shouldn't share one
+interpreter (and its GIL), or when a crash of one shouldn't take the other down:
+
+    python config/supervisor.py
+
+Each child is 'config/boot.py' started with BOOT_ROLE=web or BOOT_ROLE=bot. The supervisor
+binds FLASK_HOST:FLASK_PORT once and passes the listening socket to every web process, so the
+web tier can be scaled to WEB_PROCESSES processes on one port (POSIX only; on Windows a single
+web process binds the port itself). With FLASK_SERVER=gunicorn, prefer WEB_PROCESSES=1 and
+scale with FLASK_WORKERS instead.
+
+Behaviour:
+- A child that exits is restarted after an exponential backoff (1s, 2s, 4s, ... up to
+  SUPERVISOR_MAX_BACKOFF), which resets once the child has run for SUPERVISOR_STABLE_AFTER seconds.
+- SIGTERM/SIGINT stop every child with SIGTERM, then SIGKILL after SUPERVISOR_GRACE seconds.
+- SIGHUP performs a rolling restart: each web process is replaced one at a time, the new one
+  accepting on the shared socket before the old one is stopped; the bot is restarted last.
+
+To run both in one process (small installs), keep using 'python config/boot.py'.
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# Path of the boot script started for every child
+BOOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boot.py')
+
+# Read an integer setting from environment variables
+def env_int(name, default):
+    """
+    Read an integer setting from environment variables.
+
+    Args:
+        name (str): The environment variable name.
+        default (int): The value to use when the variable is unset or blank.
+
+    Returns:
+        int: The configured value.
+    """
+    value = (os.environ.get(name) or '').strip()
+    return int(value) if value else default
+
+# Define a supervised child process
+class Child:
+    """
+    A supervised child process running one role of the application.
+
+    Attributes:
+        name (str): The display name of the child, e.g. 'web-1'.
+        role (str): The BOOT_ROLE of the child ('web' or 'bot').
+        process (subprocess.Popen): The running process, or None.
+        failures (int): The number of consecutive quick exits, used for the backoff.
+        restart_at (float): The monotonic time of the next restart, or None.
+    """
+
+    def __init__(self, name, role, env, pass_fds=()):
+        """
+        Initializes the Child class with the given parameters.
+
+        Args:
+            name (str): The display name of the child.
+            role (str): The BOOT_ROLE of the child.
+            env (dict): The environment of the child.
+            pass_fds (tuple): File descriptors inherited by the child. Defaults to ().
+        """
+        self.name = name
+        self.role = role
+        self.env = env
+        self.pass_fds = pass_fds
+        self.process = None
+        self.started_at = None
+        self.failures = 0
+        self.restart_at = None
+
+    def start(self):
+        """
+        Start the child process.
+        """
+        self.process = subprocess.Popen([sys.executable, BOOT_SCRIPT], env=self.env, pass_fds=self.pass_fds)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        print(f"[supervisor] started {self.name} (pid {self.process.pid})")
+
+    def stop(self, grace):
+        """
+        Stop the child with SIGTERM, then SIGKILL if it doesn't exit within `grace` seconds.
+
+        Args:
+            grace (float): The number of seconds to wait for a graceful exit.
+        """
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            print(f"[supervisor] {self.name} didn't stop in {grace}s, killing it")
+            process.kill()
+            process.wait()
+
+# Define the process supervisor
+class Supervisor:
+    """
+    Starts the web and bot children, restarts them when they exit, and handles signals.
+    """
+
+    def __init__(self):
+        """
+        Initializes the Supervisor class from environment variables.
+        """
+        self.max_backoff = env_int('SUPERVISOR_MAX_BACKOFF', 60)
+        self.stable_after = env_int('SUPERVISOR_STABLE_AFTER', 60)
+        self.grace = env_int('SUPERVISOR_GRACE', env_int('FLASK_GRACEFUL_TIMEOUT', 30))
+        self.children = []
+        self.listener = None
+        self.stopping = False
+        self.reload_requested = False
+
+        if os.environ.get('FLASK_HOST'):
+            self._add_web_children()
+        if os.environ.get('DISCORD_TOKEN'):
+            self.children.append(Child('bot', 'bot', dict(os.environ, BOOT_ROLE='bot')))
+
+    def _add_web_children(self):
+        """
+        Bind the shared listening socket and create the web children.
+        """
+        processes = max(1, env_int('WEB_PROCESSES', 1))
+        env = dict(os.environ, BOOT_ROLE='web')
+        pass_fds = ()
+        if os.name == 'posix':
+            self.listener = socket.create_server(
+                (os.environ['FLASK_HOST'], int(os.environ.get('FLASK_PORT') or 5000)),
+                backlog=env_int('FLASK_BACKLOG', 2048),
+            )
+            self.listener.set_inheritable(True)
+            env['FLASK_SOCKET_FD'] = str(self.listener.fileno())
+            pass_fds = (self.listener.fileno(),)
+        elif processes > 1:
+            print("[supervisor] sharing the web port needs POSIX, starting a single web process")
+            processes = 1
+        for index in range(processes):
+            self.children.append(Child(f'web-{index + 1}', 'web', env, pass_fds))
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def rolling_restart(self):
+        """
+        Replace every child one at a time, web processes first.
+        """
+        print("[supervisor] rolling restart")
+        for child in sorted(self.children, key=lambda child: child.role != 'web'):
+            if self.stopping:
+                return
+            if child.role != 'web':
+                # Two bot processes would both answer commands, so stop the old one first
+                child.stop(self.grace)
+                child.start()
+                continue
+            old = child.process
+            child.start()
+            if old is not None:
+                # Let the new process start accepting on the shared socket before the old one drains
+                time.sleep(min(5, self.grace))
+                if old.poll() is None:
+                    old.terminate()
+                    try:
+                        old.wait(timeout=self.grace)
+                    except subprocess.TimeoutExpired:
+                        old.kill()
+                        old.wait()
+            child.failures = 0
+
+    def check_children(self):
+        """
+        Restart children that exited, once their backoff has elapsed.
+        """
+        now = time.monotonic()
+        for child in self.children:
+            if child.process is not None and child.process.poll() is not None:
+                code = child.process.returncode
+                ran_for = now - child.started_at
+                child.process = None
+                child.failures = 0 if ran_for >= self.stable_after else child.failures + 1
+                delay = min(self.max_backoff, 2 ** max(0, child.failures - 1)) if child.failures else 0
+                child.restart_at = now + delay
+                print(f"[supervisor] {child.name} exited with code {code} after {ran_for:.1f}s, restarting in {delay}s")
+            if child.process is None and child.restart_at is not None and child.restart_at <= now:
+                child.start()
+
+    def run(self):
+        """
+        Start the children and supervise them until SIGTERM/SIGINT.
+        """
+        if not self.children:
+            print("[supervisor] nothing to run, set FLASK_HOST and/or DISCORD_TOKEN")
+            return
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self._on_reload)
+
+        for child in self.children:
+            child.start()
+        try:
+            while not self.stopping:
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.rolling_restart()
+                self.check_children()
+                time.sleep(0.5)
+        finally:
+            print("[supervisor] stopping children")
+            for child in self.children:
+                if child.process is not None and child.process.poll() is None:
+                    child.process.terminate()
+            deadline = time.monotonic() + self.grace
+            for child in self.children:
+                child.stop(max(0.0, deadline - time.monotonic()))
+            if self.listener is not None:
+                self.listener.close()
+
+# Main execution
+if __name__ == "__main__":
+    Supervisor().run()
\ No newline at end of file
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by CacheBackend.get on a miss (None is a valid cached value)
+MISSING = object()
+
+# Define the interface every cache backend implements
+class CacheBackend:
+    """
+    Interface for the cache backends used by BaseModel.
+
+    Values are plain Python data (dicts and lists of column values), so a shared backend such
+    as Redis only needs to serialize them.
+
+    Every delete() and clear() bumps a generation counter. A reader takes generation() before
+    querying the database and passes it to set(), which drops the value if a write invalidated
+    the cache in the meantime, so a slow reader can't put back the row a writer just replaced.
+
+    An in-process backend is only invalidated by writes made in its own process. When the bot and
+    the web server run as separate processes (BOOT_ROLE), a write in one leaves the other serving
+    the old value for up to its ttl; use a shared backend or keep the cache off in that setup.
+    """
+
+    def get(self, key):
+        """
+        Get a cached value.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Any: The cached value, or MISSING if it is absent or expired.
+        """
+        raise NotImplementedError
+
+    def generation(self):
+        """
+        Get the invalidation counter, bumped by every delete() and clear().
+
+        Returns:
+            int: The current generation.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, generation=None):
+        """
+        Store a value.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            generation (int, optional): The generation() taken before the value was read from the
+                database; the value is dropped if the cache was invalidated since. Defaults to None.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Remove a value.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove every value.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: The hits, misses, evictions, expirations, stale sets and current size.
+        """
+        raise NotImplementedError
+
+# Define the in-process LRU cache with a time-to-live
+class LRUCache(CacheBackend):
+    """
+    An in-process, thread-safe LRU cache with a time-to-live.
+
+    Only writes made in this process invalidate it, see CacheBackend.
+
+    Attributes:
+        maxsize (int): The maximum number of entries before the least recently used is evicted.
+        ttl (float): The number of seconds an entry stays valid, or None to never expire.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        """
+        Initializes the LRUCache class with the given parameters.
+
+        Args:
+            maxsize (int): The maximum number of entries. Defaults to 1024.
+            ttl (float, optional): The number of seconds an entry stays valid. Defaults to 60.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale = 0
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, generation=None):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self.stale += 1  # Read before a write invalidated the cache: don't resurrect it
+                return
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale': self.stale,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+# Example usage of LRUCache on a model:
+# class Users(BaseModel):
+#     __cache__ = LRUCache(maxsize=4096, ttl=60)
+#
+# Users.filter(discord_id=1234)   # Hits the database and fills the cache
+# Users.filter(discord_id=1234)   # Served from the cache
+# Users.cache_stats()             # {'hits': 1, 'misses': 1, ...}
@@ -1,20 +1,376 @@
 import os
-from sqlalchemy import create_engine, Column, Integer
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, select, exists, inspect, Column, Integer, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker, scoped_session, make_transient_to_detached
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from database.cache import MISSING
 
 # Get the database URL from environment variables
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Read an integer setting from environment variables
+def _env_int(name, default):
+    """
+    Read an integer setting from environment variables.
+
+    Args:
+        name (str): The environment variable name.
+        default (int): The value to use when the variable is unset or blank.
+
+    Returns:
+        int: The configured value.
+    """
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
+
+# Read a boolean setting from environment variables
+def _env_bool(name, default):
+    """
+    Read a boolean setting ('1', 'true', 'yes', 'on') from environment variables.
+
+    Args:
+        name (str): The environment variable name.
+        default (bool): The value to use when the variable is unset or blank.
+
+    Returns:
+        bool: The configured value.
+    """
+    value = os.environ.get(name, '').strip().lower()
+    return value in ('1', 'true', 'yes', 'on') if value else default
+
+# Collects pool checkout statistics for sizing the pool under load
+class PoolStats:
+    """
+    Thread-safe counters for connection pool checkouts.
+
+    Attributes:
+        checkouts (int): The number of connections handed out by the pool.
+        timeouts (int): The number of checkouts that gave up after DB_POOL_TIMEOUT.
+        wait_total (float): The total time spent waiting for a connection, in seconds.
+        wait_max (float): The longest wait for a connection, in seconds.
+        hold_total (float): The total time connections were checked out, in seconds.
+        hold_max (float): The longest time a connection was checked out, in seconds.
+    """
+
+    def __init__(self):
+        """
+        Initializes the PoolStats class with zeroed counters.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset all counters to zero.
+        """
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.hold_total = 0.0
+            self.hold_max = 0.0
+            self._holds = 0
+
+    def record_wait(self, seconds, timed_out=False):
+        """
+        Record the time a caller waited for a connection.
+
+        Args:
+            seconds (float): The time spent waiting.
+            timed_out (bool, optional): Whether the wait ended in a pool timeout. Defaults to False.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_hold(self, seconds):
+        """
+        Record the time a connection was checked out before being returned.
+
+        Args:
+            seconds (float): The time the connection was held.
+        """
+        with self._lock:
+            self._holds += 1
+            self.hold_total += seconds
+            self.hold_max = max(self.hold_max, seconds)
+
+    def snapshot(self):
+        """
+        Get a copy of the counters with averages.
+
+        Returns:
+            dict: The pool statistics.
+        """
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total': self.wait_total,
+                'wait_avg': self.wait_total / waits if waits else 0.0,
+                'wait_max': self.wait_max,
+                'hold_total': self.hold_total,
+                'hold_avg': self.hold_total / self._holds if self._holds else 0.0,
+                'hold_max': self.hold_max,
+            }
+
+pool_stats = PoolStats()
+
+# QueuePool that measures how long callers wait for a connection
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records checkout wait times in `pool_stats`.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+# Check whether a database URL points to an in-memory SQLite database
+def _is_sqlite_memory(url):
+    """
+    Check whether a SQLite URL refers to an in-memory database.
+
+    Args:
+        url (URL): The parsed database URL.
+
+    Returns:
+        bool: True for in-memory SQLite databases.
+    """
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+# Build the create_engine() arguments from environment variables
+def _engine_options(url):
+    """
+    Build the engine and pool options for the given database URL from environment variables.
+
+    Args:
+        url (URL): The parsed database URL.
+
+    Returns:
+        dict: Keyword arguments for create_engine().
+    """
+    options = {'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)}
+    if url.get_backend_name() == 'sqlite':
+        # SQLite connections are shared between the Flask and Discord threads
+        options['connect_args'] = {'check_same_thread': False}
+        if _is_sqlite_memory(url):
+            # In-memory databases live in a single connection, keep SQLAlchemy's default pool
+            return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=_env_int('DB_POOL_SIZE', 5),
+        max_overflow=_env_int('DB_MAX_OVERFLOW', 10),
+        pool_timeout=_env_int('DB_POOL_TIMEOUT', 30),
+        pool_recycle=_env_int('DB_POOL_RECYCLE', 1800),
+    )
+    return options
+
+# Build the PRAGMA statements run on every new SQLite connection
+def _sqlite_pragmas(url):
+    """
+    Build the PRAGMA statements for the SQLite tuned profile.
+
+    Args:
+        url (URL): The parsed database URL.
+
+    Returns:
+        list: The PRAGMA statements to run on each new connection.
+    """
+    pragmas = [f"PRAGMA busy_timeout={_env_int('DB_SQLITE_BUSY_TIMEOUT', 5000)}"]
+    if not _is_sqlite_memory(url) and _env_bool('DB_SQLITE_WAL', True):
+        pragmas.append("PRAGMA journal_mode=WAL")
+    pragmas.append(f"PRAGMA synchronous={os.environ.get('DB_SQLITE_SYNCHRONOUS', '').strip() or 'NORMAL'}")
+    # Extra pragmas, for example 'cache_size=-20000;temp_store=MEMORY'
+    for pragma in os.environ.get('DB_SQLITE_PRAGMAS', '').split(';'):
+        if pragma.strip():
+            pragmas.append(f"PRAGMA {pragma.strip()}")
+    return pragmas
+
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+_url = make_url(DATABASE_URL)
+engine = create_engine(_url, **_engine_options(_url))
+
+# Apply the SQLite profile to every new DBAPI connection of an engine
+def _install_sqlite_pragmas(target, url):
+    """
+    Run the SQLite tuned profile pragmas on every new connection of an engine.
+
+    Args:
+        target (Engine): The (sync) engine to configure.
+        url (URL): The parsed database URL.
+    """
+    pragmas = _sqlite_pragmas(url)
+
+    @event.listens_for(target, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+if _url.get_backend_name() == 'sqlite':
+    _install_sqlite_pragmas(engine, _url)
+
+# Track how long each connection stays checked out of the pool
+@event.listens_for(engine, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info['checkout_at'] = time.perf_counter()
+
+@event.listens_for(engine, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    checkout_at = connection_record.info.pop('checkout_at', None)
+    if checkout_at is not None:
+        pool_stats.record_hold(time.perf_counter() - checkout_at)
+
+# Get the connection pool metrics
+def get_pool_stats():
+    """
+    Get the connection pool metrics, including the current pool occupancy.
+
+    Returns:
+        dict: The pool statistics (see PoolStats) plus 'size', 'checked_out' and 'overflow'
+            when the pool reports them.
+    """
+    stats = pool_stats.snapshot()
+    for name, key in (('size', 'size'), ('checkedout', 'checked_out'), ('overflow', 'overflow')):
+        method = getattr(engine.pool, name, None)
+        if callable(method):
+            stats[key] = method()
+    return stats
 
-# Create a configured "Session" class
-SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+# The unit of work bound to the current thread or asyncio task, if any
+_current_scope = ContextVar('db_scope', default=None)
+
+def _scopefunc():
+    """
+    Key SessionLocal by the active unit of work, falling back to the current thread.
+
+    Returns:
+        Hashable: The key of the session registry entry to use.
+    """
+    scope = _current_scope.get()
+    return scope if scope is not None else threading.get_ident()
+
+# Create a configured "Session" class, scoped per unit of work
+# Instances stay readable after their unit of work is torn down, so don't expire them on commit
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine),
+    scopefunc=_scopefunc,
+)
 
 # Create a base class for declarative class definitions
 Base = declarative_base()
 
+# Split an iterable of rows into lists of at most `size` items
+def _chunks(rows, size):
+    """
+    Split an iterable into consecutive lists of at most `size` items.
+
+    Args:
+        rows (iterable): The items to split.
+        size (int): The maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk of items.
+    """
+    if size < 1:
+        raise ValueError("batch_size must be at least 1")
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Start a unit of work for the current thread or asyncio task
+def begin_scope():
+    """
+    Start a unit of work for the current thread or asyncio task.
+
+    Every SessionLocal() call made until end_scope() returns the same session. Use it to scope
+    a session to a Flask request or a Discord interaction.
+
+    Returns:
+        Token: The token to pass to end_scope().
+    """
+    return _current_scope.set(object())
+
+# Tear down the unit of work started by begin_scope
+def end_scope(token=None):
+    """
+    Close the session of the current unit of work and remove it from the registry.
+
+    Args:
+        token (Token, optional): The token returned by begin_scope(). When omitted, the
+            current unit of work is simply cleared. Defaults to None.
+    """
+    SessionLocal.remove()
+    try:
+        if token is not None:
+            _current_scope.reset(token)
+            return
+    except ValueError:
+        # The token belongs to another context, e.g. a generator closed elsewhere
+        pass
+    _current_scope.set(None)
+
+# Context manager used by every BaseModel classmethod
+@contextmanager
+def unit_of_work(db_session=None):
+    """
+    Provide a database session for a unit of work.
+
+    An explicit session is used as-is and left to its owner. Otherwise the session of the
+    enclosing unit of work (for example the current Flask request) is joined, or a new unit
+    of work is started and torn down with SessionLocal.remove() on exit.
+
+    Args:
+        db_session (Session, optional): The database session. Defaults to None.
+
+    Yields:
+        Session: The database session.
+    """
+    if db_session is not None:
+        yield db_session
+        return
+
+    token = begin_scope() if _current_scope.get() is None else None
+    session = SessionLocal()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if token is not None:
+            end_scope(token)
+
 # Dependency to get the database session
 def get_db():
     """
@@ -23,11 +379,168 @@ def get_db():
     Yields:
         Session: The database session.
     """
-    db = SessionLocal()
-    try:
+    with unit_of_work() as db:
         yield db
+
+# Build an INSERT that skips rows conflicting with a unique index
+def insert_ignore(model, dialect_name, index_elements, **values):
+    """
+    Build an INSERT ... ON CONFLICT DO NOTHING (INSERT IGNORE on MySQL) statement.
+
+    Args:
+        model (BaseModel): The model to insert into.
+        dialect_name (str): The dialect of the session's bind, e.g. session.get_bind().dialect.name.
+        index_elements (list of str): The columns of the unique index to check for conflicts.
+        **values: The column values of the row.
+
+    Returns:
+        Insert: The insert statement; its rowcount is 0 when the row already existed.
+
+    Raises:
+        NotImplementedError: If the dialect has no conflict-ignoring insert.
+    """
+    if dialect_name == 'sqlite':
+        return sqlite_insert(model).values(**values).on_conflict_do_nothing(index_elements=index_elements)
+    # The other dialects are imported on use; loading them all costs ~50 ms of startup
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert(model).values(**values).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        return mysql_insert(model).values(**values).prefix_with('IGNORE')
+    raise NotImplementedError(f"insert_ignore is not supported for the '{dialect_name}' dialect")
+
+# Async drivers used for the async engine when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql',
+}
+
+# The async engine and session factory, created on first use
+_async_engine = None
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
+# Event listeners added to the async engine when it is created: (identifier, function)
+_engine_listeners = []
+
+# The async session of the current asyncio task, if any
+_current_async_session = ContextVar('db_async_session', default=None)
+
+# Get the database URL used by the async engine
+def _async_url():
+    """
+    Get the async database URL: ASYNC_DATABASE_URL, or DATABASE_URL with its async driver.
+
+    Returns:
+        URL: The parsed async database URL.
+
+    Raises:
+        RuntimeError: If no async driver is known for the database backend.
+    """
+    override = os.environ.get('ASYNC_DATABASE_URL', '').strip()
+    if override:
+        return make_url(override)
+    backend = _url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver known for '{backend}', set ASYNC_DATABASE_URL")
+    return _url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+# Get the async twin of `engine`
+def get_async_engine():
+    """
+    Get the async engine, creating it on first use with the same pool settings as `engine`.
+
+    Returns:
+        AsyncEngine: The async SQLAlchemy engine.
+    """
+    global _async_engine
+    if _async_engine is None:
+        with _async_lock:
+            if _async_engine is None:
+                url = _async_url()
+                options = _engine_options(url)
+                if options.pop('poolclass', None) is not None:
+                    options['poolclass'] = AsyncAdaptedQueuePool
+                async_engine = create_async_engine(url, **options)
+                if url.get_backend_name() == 'sqlite':
+                    _install_sqlite_pragmas(async_engine.sync_engine, url)
+                for identifier, function in _engine_listeners:
+                    event.listen(async_engine.sync_engine, identifier, function)
+                _async_engine = async_engine
+    return _async_engine
+
+# Listen to an event of both engines
+def listen_engines(identifier, function):
+    """
+    Register an engine event listener on `engine` and on the async engine, now or when it is created.
+
+    Args:
+        identifier (str): The event, e.g. 'before_cursor_execute'.
+        function (callable): The listener.
+    """
+    event.listen(engine, identifier, function)
+    with _async_lock:
+        _engine_listeners.append((identifier, function))
+        if _async_engine is not None:
+            event.listen(_async_engine.sync_engine, identifier, function)
+
+# Get the async twin of the "Session" class
+def get_async_sessionmaker():
+    """
+    Get the async session factory bound to the async engine.
+
+    Returns:
+        async_sessionmaker: The factory creating AsyncSession instances.
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+# Async context manager used by every BaseModel async classmethod
+@asynccontextmanager
+async def async_unit_of_work(db_session=None):
+    """
+    Provide an async database session for a unit of work.
+
+    An explicit session is used as-is and left to its owner. Otherwise the session of the
+    enclosing async unit of work in the current task is joined, or a new session is opened
+    and closed on exit.
+
+    Args:
+        db_session (AsyncSession, optional): The async database session. Defaults to None.
+
+    Yields:
+        AsyncSession: The async database session.
+    """
+    if db_session is not None:
+        yield db_session
+        return
+
+    session = _current_async_session.get()
+    owner = session is None
+    if owner:
+        session = get_async_sessionmaker()()
+        token = _current_async_session.set(session)
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
     finally:
-        db.close()
+        if owner:
+            _current_async_session.reset(token)
+            await session.close()
+
+# Close the async engine's connections
+async def dispose_async_engine():
+    """
+    Dispose of the async engine's connection pool, if it was created.
+    """
+    if _async_engine is not None:
+        await _async_engine.dispose()
 
 # Base model class with common methods for all models
 class BaseModel(Base):
@@ -36,12 +549,127 @@ class BaseModel(Base):
     
     Attributes:
         __abstract__ (bool): Indicates that this class will not be mapped to a table in the database.
+        __cache__ (CacheBackend): The read-through cache of get() and filter(), or None to disable it.
+            Writes through the model clear it, but only in the current process (see CacheBackend).
         id (int): The primary key of the model.
     """
     __abstract__ = True  # This class will not be mapped to a table in the database
+    __cache__ = None  # Opt in per model, e.g. __cache__ = LRUCache(maxsize=1024, ttl=60)
 
     id = Column(Integer, primary_key=True, index=True)  # Every model will have an id column
 
+    @classmethod
+    def _cache_key(cls, *parts):
+        """
+        Build the cache key of a lookup, or None if the lookup can't be cached.
+
+        Args:
+            *parts: The method name and its arguments.
+
+        Returns:
+            tuple: The cache key, or None when caching is disabled or the arguments are unhashable.
+        """
+        if cls.__cache__ is None:
+            return None
+        key = (cls.__name__,) + parts
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @classmethod
+    def _to_cache(cls, instance):
+        """
+        Convert an instance to the plain column values stored in the cache.
+
+        Args:
+            instance (BaseModel): The instance, or None.
+
+        Returns:
+            dict: The column values, or None.
+        """
+        if instance is None:
+            return None
+        return {attr.key: getattr(instance, attr.key) for attr in inspect(cls).column_attrs}
+
+    @classmethod
+    def _from_cache(cls, row):
+        """
+        Rebuild a detached instance from cached column values.
+
+        Args:
+            row (dict): The cached column values, or None.
+
+        Returns:
+            BaseModel: The detached instance, to be merged into a session with load=False, or None.
+        """
+        if row is None:
+            return None
+        instance = cls(**row)
+        make_transient_to_detached(instance)
+        return instance
+
+    @classmethod
+    def _projection(cls, columns):
+        """
+        Get the entities to select: the model itself, or only the given columns plus 'id'.
+
+        Args:
+            columns (list of str, optional): The column names to load.
+
+        Returns:
+            list: The entities to pass to query()/select().
+        """
+        if not columns:
+            return [cls]
+        names = ['id'] + [name for name in columns if name != 'id']
+        return [getattr(cls, name) for name in names]
+
+    @classmethod
+    def before_create_index(cls, connection, index):
+        """
+        Prepare the table's data before database/migrate.py adds an index missing from the
+        existing table, e.g. remove the duplicates a new unique index would reject. Does nothing
+        by default.
+
+        Args:
+            connection (Connection): The migration's connection, inside its transaction.
+            index (Index): The index about to be created.
+        """
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Drop every cached lookup of the model. Called automatically after every write.
+        """
+        if cls.__cache__ is not None:
+            cls.__cache__.clear()
+
+    @classmethod
+    def cache_stats(cls):
+        """
+        Get the hit/miss/eviction counters of the model's cache.
+
+        Returns:
+            dict: The cache statistics, or None if the model has no cache.
+        """
+        return cls.__cache__.stats() if cls.__cache__ is not None else None
+
+    @classmethod
+    def query(cls, db_session=None):
+        """
+        Start a chainable query on the model.
+
+        Args:
+            db_session (Session or AsyncSession, optional): The database session. Defaults to None.
+
+        Returns:
+            QuerySet: The query set, e.g. Users.query().filter(id__in=[1, 2]).order_by('-id').all().
+        """
+        from database.query import QuerySet  # database.query imports this module
+        return QuerySet(cls, db_session)
+
     @classmethod
     def create(cls, db_session=None, **kwargs):
         """
@@ -54,13 +682,13 @@ class BaseModel(Base):
         Returns:
             BaseModel: The created instance of the model.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        instance = cls(**kwargs)
-        db_session.add(instance)
-        db_session.commit()
-        db_session.refresh(instance)
-        return instance
+        with unit_of_work(db_session) as db_session:
+            instance = cls(**kwargs)
+            db_session.add(instance)
+            db_session.commit()
+            cls.invalidate_cache()
+            db_session.refresh(instance)
+            return instance
 
     @classmethod
     def get(cls, id, db_session=None):
@@ -74,9 +702,17 @@ class BaseModel(Base):
         Returns:
             BaseModel: The instance of the model, or None if not found.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        return db_session.query(cls).filter(cls.id == id).first()
+        key = cls._cache_key('get', id)
+        with unit_of_work(db_session) as db_session:
+            if key is not None:
+                generation = cls.__cache__.generation()
+                cached = cls.__cache__.get(key)
+                if cached is not MISSING:
+                    return db_session.merge(cls._from_cache(cached), load=False) if cached else None
+            instance = db_session.query(cls).filter(cls.id == id).first()
+            if key is not None:
+                cls.__cache__.set(key, cls._to_cache(instance), generation=generation)
+            return instance
 
     @classmethod
     def all(cls, db_session=None):
@@ -89,9 +725,8 @@ class BaseModel(Base):
         Returns:
             list: A list of all instances of the model.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        return db_session.query(cls).all()
+        with unit_of_work(db_session) as db_session:
+            return db_session.query(cls).all()
 
     @classmethod
     def update(cls, id, db_session=None, **kwargs):
@@ -106,15 +741,15 @@ class BaseModel(Base):
         Returns:
             BaseModel: The updated instance of the model, or None if not found.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        instance = db_session.query(cls).filter(cls.id == id).first()
-        if instance:
-            for key, value in kwargs.items():
-                setattr(instance, key, value)
-            db_session.commit()
-            db_session.refresh(instance)
-        return instance
+        with unit_of_work(db_session) as db_session:
+            instance = db_session.query(cls).filter(cls.id == id).first()
+            if instance:
+                for key, value in kwargs.items():
+                    setattr(instance, key, value)
+                db_session.commit()
+                cls.invalidate_cache()
+                db_session.refresh(instance)
+            return instance
 
     @classmethod
     def delete(cls, id, db_session=None):
@@ -128,13 +763,13 @@ class BaseModel(Base):
         Returns:
             BaseModel: The deleted instance of the model, or None if not found.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        instance = db_session.query(cls).filter(cls.id == id).first()
-        if instance:
-            db_session.delete(instance)
-            db_session.commit()
-        return instance
+        with unit_of_work(db_session) as db_session:
+            instance = db_session.query(cls).filter(cls.id == id).first()
+            if instance:
+                db_session.delete(instance)
+                db_session.commit()
+                cls.invalidate_cache()
+            return instance
 
     @classmethod
     def filter(cls, db_session=None, **kwargs):
@@ -143,17 +778,23 @@ class BaseModel(Base):
 
         Args:
             db_session (Session, optional): The database session. Defaults to None.
-            **kwargs: The attributes to filter by.
+            **kwargs: The attributes to filter by, with optional lookups such as `amount__gte`
+                (see database/query.py).
 
         Returns:
             list: A list of instances of the model that match the filter criteria.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        query = db_session.query(cls)
-        for key, value in kwargs.items():
-            query = query.filter(getattr(cls, key) == value)
-        return query.all()
+        cache_key = cls._cache_key('filter', tuple(sorted(kwargs.items())))
+        with unit_of_work(db_session) as db_session:
+            if cache_key is not None:
+                generation = cls.__cache__.generation()
+                cached = cls.__cache__.get(cache_key)
+                if cached is not MISSING:
+                    return [db_session.merge(cls._from_cache(row), load=False) for row in cached]
+            instances = cls.query(db_session).filter(**kwargs).all()
+            if cache_key is not None:
+                cls.__cache__.set(cache_key, [cls._to_cache(instance) for instance in instances], generation=generation)
+            return instances
     
     @classmethod
     def exists(cls, id, db_session=None):
@@ -167,6 +808,372 @@ class BaseModel(Base):
         Returns:
             bool: True if the instance exists, False otherwise.
         """
-        if db_session is None:
-            db_session = SessionLocal()
-        return db_session.query(cls).filter(cls.id == id).exists()
\ No newline at end of file
+        return cls.query(db_session).filter(id=id).exists()
+
+    @classmethod
+    async def acreate(cls, db_session=None, **kwargs):
+        """
+        Create a new instance of the model without blocking the event loop.
+
+        Args:
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+            **kwargs: The attributes of the model.
+
+        Returns:
+            BaseModel: The created instance of the model.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            instance = cls(**kwargs)
+            db_session.add(instance)
+            await db_session.commit()
+            cls.invalidate_cache()
+            await db_session.refresh(instance)
+            return instance
+
+    @classmethod
+    async def aget(cls, id, db_session=None):
+        """
+        Get an instance of the model by ID without blocking the event loop.
+
+        Args:
+            id (int): The ID of the model instance.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+
+        Returns:
+            BaseModel: The instance of the model, or None if not found.
+        """
+        key = cls._cache_key('get', id)
+        async with async_unit_of_work(db_session) as db_session:
+            if key is not None:
+                generation = cls.__cache__.generation()
+                cached = cls.__cache__.get(key)
+                if cached is not MISSING:
+                    return await db_session.merge(cls._from_cache(cached), load=False) if cached else None
+            instance = await db_session.scalar(select(cls).where(cls.id == id))
+            if key is not None:
+                cls.__cache__.set(key, cls._to_cache(instance), generation=generation)
+            return instance
+
+    @classmethod
+    async def aall(cls, db_session=None):
+        """
+        Get all instances of the model without blocking the event loop.
+
+        Args:
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+
+        Returns:
+            list: A list of all instances of the model.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            return list(await db_session.scalars(select(cls)))
+
+    @classmethod
+    async def aupdate(cls, id, db_session=None, **kwargs):
+        """
+        Update an instance of the model by ID without blocking the event loop.
+
+        Args:
+            id (int): The ID of the model instance.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+            **kwargs: The attributes to update.
+
+        Returns:
+            BaseModel: The updated instance of the model, or None if not found.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            instance = await db_session.scalar(select(cls).where(cls.id == id))
+            if instance:
+                for key, value in kwargs.items():
+                    setattr(instance, key, value)
+                await db_session.commit()
+                cls.invalidate_cache()
+                await db_session.refresh(instance)
+            return instance
+
+    @classmethod
+    async def adelete(cls, id, db_session=None):
+        """
+        Delete an instance of the model by ID without blocking the event loop.
+
+        Args:
+            id (int): The ID of the model instance.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+
+        Returns:
+            BaseModel: The deleted instance of the model, or None if not found.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            instance = await db_session.scalar(select(cls).where(cls.id == id))
+            if instance:
+                await db_session.delete(instance)
+                await db_session.commit()
+                cls.invalidate_cache()
+            return instance
+
+    @classmethod
+    async def afilter(cls, db_session=None, **kwargs):
+        """
+        Filter instances of the model by the given keyword arguments without blocking the event loop.
+
+        Args:
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+            **kwargs: The attributes to filter by, with optional lookups such as `amount__gte`.
+
+        Returns:
+            list: A list of instances of the model that match the filter criteria.
+        """
+        cache_key = cls._cache_key('filter', tuple(sorted(kwargs.items())))
+        async with async_unit_of_work(db_session) as db_session:
+            if cache_key is not None:
+                generation = cls.__cache__.generation()
+                cached = cls.__cache__.get(cache_key)
+                if cached is not MISSING:
+                    return [await db_session.merge(cls._from_cache(row), load=False) for row in cached]
+            instances = await cls.query(db_session).filter(**kwargs).aall()
+            if cache_key is not None:
+                cls.__cache__.set(cache_key, [cls._to_cache(instance) for instance in instances], generation=generation)
+            return instances
+
+    @classmethod
+    async def aexists(cls, id, db_session=None):
+        """
+        Check if an instance of the model exists by ID without blocking the event loop.
+
+        Args:
+            id (int): The ID of the model instance.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+
+        Returns:
+            bool: True if the instance exists, False otherwise.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            return bool(await db_session.scalar(select(exists().where(cls.id == id))))
+
+    @classmethod
+    def paginate(cls, after_id=None, limit=50, columns=None, db_session=None, **kwargs):
+        """
+        Get one page of instances ordered by ID, using keyset pagination on the indexed id.
+
+        Unlike OFFSET, the cost of a page doesn't grow with its position: pass the id of the
+        last row of a page as `after_id` to get the next one.
+
+        Args:
+            after_id (int, optional): Only return rows with an ID greater than this. Defaults to None.
+            limit (int, optional): The maximum number of rows. Defaults to 50.
+            columns (list of str, optional): Load only these columns (and 'id'); rows are then
+                returned as named tuples instead of model instances. Defaults to None.
+            db_session (Session, optional): The database session. Defaults to None.
+            **kwargs: The attributes to filter by.
+
+        Returns:
+            list: The instances (or rows) of the page.
+        """
+        with unit_of_work(db_session) as db_session:
+            query = db_session.query(*cls._projection(columns))
+            for key, value in kwargs.items():
+                query = query.filter(getattr(cls, key) == value)
+            if after_id is not None:
+                query = query.filter(cls.id > after_id)
+            return query.order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def iter_all(cls, batch_size=1000, columns=None, db_session=None, **kwargs):
+        """
+        Stream instances ordered by ID without loading them all into memory.
+
+        Rows are fetched `batch_size` at a time with yield_per, which uses a server-side cursor
+        on backends that support one.
+
+        Without db_session, the generator opens a dedicated session instead of joining the
+        current unit of work, and closes it when the iteration ends, is broken out of, or the
+        generator is garbage collected. A generator may be finalized in another thread or task,
+        so it must not touch the caller's unit of work. Pass db_session to stream inside a
+        specific session, e.g. to see its uncommitted changes.
+
+        Args:
+            batch_size (int, optional): The number of rows fetched per round trip. Defaults to 1000.
+            columns (list of str, optional): Load only these columns (and 'id'); rows are then
+                returned as named tuples instead of model instances. Defaults to None.
+            db_session (Session, optional): The database session. Defaults to None.
+            **kwargs: The attributes to filter by.
+
+        Yields:
+            BaseModel: The next instance (or row).
+        """
+        session = db_session if db_session is not None else SessionLocal.session_factory()
+        try:
+            query = session.query(*cls._projection(columns))
+            for key, value in kwargs.items():
+                query = query.filter(getattr(cls, key) == value)
+            yield from query.order_by(cls.id).yield_per(batch_size)
+        finally:
+            if db_session is None:
+                session.close()
+
+    @classmethod
+    async def apaginate(cls, after_id=None, limit=50, columns=None, db_session=None, **kwargs):
+        """
+        Get one page of instances ordered by ID without blocking the event loop. See paginate().
+
+        Args:
+            after_id (int, optional): Only return rows with an ID greater than this. Defaults to None.
+            limit (int, optional): The maximum number of rows. Defaults to 50.
+            columns (list of str, optional): Load only these columns (and 'id'). Defaults to None.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+            **kwargs: The attributes to filter by.
+
+        Returns:
+            list: The instances (or rows) of the page.
+        """
+        async with async_unit_of_work(db_session) as db_session:
+            statement = select(*cls._projection(columns))
+            for key, value in kwargs.items():
+                statement = statement.where(getattr(cls, key) == value)
+            if after_id is not None:
+                statement = statement.where(cls.id > after_id)
+            result = await db_session.execute(statement.order_by(cls.id).limit(limit))
+            return list(result.scalars() if not columns else result)
+
+    @classmethod
+    async def aiter_all(cls, batch_size=1000, columns=None, db_session=None, **kwargs):
+        """
+        Stream instances ordered by ID without blocking the event loop. See iter_all(); likewise,
+        without db_session a dedicated session is opened and closed when the iteration ends.
+
+        Args:
+            batch_size (int, optional): The number of rows fetched per round trip. Defaults to 1000.
+            columns (list of str, optional): Load only these columns (and 'id'). Defaults to None.
+            db_session (AsyncSession, optional): The async database session. Defaults to None.
+            **kwargs: The attributes to filter by.
+
+        Yields:
+            BaseModel: The next instance (or row).
+        """
+        session = db_session if db_session is not None else get_async_sessionmaker()()
+        try:
+            statement = select(*cls._projection(columns))
+            for key, value in kwargs.items():
+                statement = statement.where(getattr(cls, key) == value)
+            statement = statement.order_by(cls.id).execution_options(yield_per=batch_size)
+            result = await session.stream(statement)
+            try:
+                async for row in (result.scalars() if not columns else result):
+                    yield row
+            finally:
+                await result.close()
+        finally:
+            if db_session is None:
+                await session.close()
+
+    @classmethod
+    def bulk_create(cls, rows, db_session=None, batch_size=1000, refresh=True):
+        """
+        Create many instances of the model using batched INSERT statements.
+
+        Every chunk of rows is sent as a single executemany INSERT and committed once.
+
+        Args:
+            rows (iterable of dict): The attributes of each instance to create.
+            db_session (Session, optional): The database session. Defaults to None.
+            batch_size (int, optional): The number of rows per INSERT/commit. Defaults to 1000.
+            refresh (bool, optional): Whether to return the created instances loaded from the
+                database (one SELECT per chunk). Defaults to True.
+
+        Returns:
+            list or int: The created instances if `refresh` is True, otherwise the number of rows inserted.
+        """
+        with unit_of_work(db_session) as db_session:
+            created = [] if refresh else 0
+            for chunk in _chunks(rows, batch_size):
+                if refresh:
+                    # Let the unit of work batch the INSERTs, then reload the chunk in one query
+                    instances = [cls(**row) for row in chunk]
+                    db_session.add_all(instances)
+                    db_session.flush()
+                    ids = [instance.id for instance in instances]
+                    db_session.commit()
+                    cls.invalidate_cache()
+                    created.extend(
+                        db_session.query(cls)
+                        .filter(cls.id.in_(ids))
+                        .order_by(cls.id)
+                        .populate_existing()
+                        .all()
+                    )
+                else:
+                    db_session.execute(cls.__table__.insert(), chunk)
+                    db_session.commit()
+                    cls.invalidate_cache()
+                    created += len(chunk)
+            return created
+
+    @classmethod
+    def bulk_update(cls, rows, db_session=None, batch_size=1000):
+        """
+        Update many instances of the model by ID using batched UPDATE statements.
+
+        Rows are grouped by the set of columns they update, and every chunk of a group is sent
+        as a single executemany UPDATE and committed once.
+
+        Args:
+            rows (iterable of dict): The attributes to update, each including the instance 'id'.
+            db_session (Session, optional): The database session. Defaults to None.
+            batch_size (int, optional): The number of rows per UPDATE/commit. Defaults to 1000.
+
+        Returns:
+            int: The number of rows sent to the database.
+        """
+        with unit_of_work(db_session) as db_session:
+            table = cls.__table__
+
+            # Group rows by the columns they update so each group shares one statement
+            groups = {}
+            for row in rows:
+                if 'id' not in row:
+                    raise ValueError("Every row passed to bulk_update must include an 'id'")
+                keys = tuple(sorted(key for key in row if key != 'id'))
+                if keys:
+                    groups.setdefault(keys, []).append(row)
+
+            updated = 0
+            for keys, group in groups.items():
+                # Bind parameters can't share a name with a column, so prefix them
+                statement = (
+                    table.update()
+                    .where(table.c.id == bindparam('b_id'))
+                    .values({key: bindparam(f'b_{key}') for key in keys})
+                )
+                for chunk in _chunks(group, batch_size):
+                    params = [{f'b_{key}': value for key, value in row.items()} for row in chunk]
+                    db_session.execute(statement, params)
+                    db_session.commit()
+                    cls.invalidate_cache()
+                    updated += len(chunk)
+            return updated
+
+    @classmethod
+    def bulk_delete(cls, ids, db_session=None, batch_size=1000):
+        """
+        Delete many instances of the model by ID using batched DELETE ... WHERE id IN statements.
+
+        The rows are deleted in SQL directly, so ORM-level cascades (such as 'delete-orphan')
+        are not applied; delete dependent rows first.
+
+        Args:
+            ids (iterable of int): The IDs of the model instances.
+            db_session (Session, optional): The database session. Defaults to None.
+            batch_size (int, optional): The number of IDs per DELETE/commit. Defaults to 1000.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        with unit_of_work(db_session) as db_session:
+            table = cls.__table__
+            deleted = 0
+            for chunk in _chunks(ids, batch_size):
+                result = db_session.execute(table.delete().where(table.c.id.in_(chunk)))
+                db_session.commit()
+                cls.invalidate_cache()
+                deleted += result.rowcount
+            return deleted
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+migrate.py
+This file creates the database schema of the models in 'app/Models' and checks whether it is up to date.
+
+The schema fingerprint is a hash of the DDL of every model table and index. After creating the
+schema, the fingerprint is stored in the 'schema_state' table, so later startups only compare
+fingerprints (one small query) instead of inspecting every table.
+
+Migrating only adds what is missing: create_all() creates the missing tables (with their
+indexes), then the indexes missing from tables that already existed are created, since
+create_all() skips those. Existing columns and indexes are never altered or dropped. Before an
+index is created on an existing table, the table's model gets a chance to fix the data that
+would break it (see BaseModel.before_create_index()).
+
+DB_MIGRATE selects what config/boot.py does on startup:
+- auto:  Migrate when the fingerprint changed (default).
+- check: Exit with an error when the fingerprint changed, e.g. when deploys run the migrate step.
+- off:   Don't touch the schema.
+
+Run the step explicitly with:
+
+    python database/migrate.py migrate [--force]
+    python database/migrate.py check
+"""
+
+import hashlib
+import importlib
+import os
+import sys
+import time
+from sqlalchemy import Column, Float, MetaData, String, Table, inspect, select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# Add the project root to the Python path when run as a script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db import engine, Base
+
+# Folder of the model modules
+MODELS_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app', 'Models'))
+
+# Startup modes selected by DB_MIGRATE
+MIGRATE_MODES = ('auto', 'check', 'off')
+
+# Version of what migrate() applies, part of the fingerprint so databases migrated by an older
+# version are migrated again (2: indexes missing from existing tables are created)
+MIGRATOR_VERSION = 2
+
+# Bookkeeping table, kept out of Base.metadata so it is not part of the fingerprint
+schema_state = Table(
+    'schema_state', MetaData(),
+    Column('name', String(64), primary_key=True),
+    Column('fingerprint', String(64), nullable=False),
+    Column('applied_at', Float, nullable=False),
+)
+
+# Import every model so its table is registered in Base.metadata
+def import_models(directory=MODELS_DIRECTORY):
+    """
+    Import every module in the models folder.
+
+    Args:
+        directory (str): The models folder. Defaults to 'app/Models'.
+
+    Returns:
+        list: The names of the imported modules.
+    """
+    modules = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.py') and not filename.startswith('_'):
+            modules.append(importlib.import_module(f'app.Models.{filename[:-3]}').__name__)
+    return modules
+
+# Compute the fingerprint of the models' schema
+def schema_fingerprint(metadata=None, dialect=None):
+    """
+    Hash the DDL of every table and index of the models.
+
+    Args:
+        metadata (MetaData, optional): The metadata. Defaults to Base.metadata.
+        dialect (Dialect, optional): The dialect the DDL is compiled for. Defaults to the engine's.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    metadata = metadata if metadata is not None else Base.metadata
+    dialect = dialect or engine.dialect
+    digest = hashlib.sha256(f"{dialect.name}:{MIGRATOR_VERSION}".encode())
+    for table in sorted(metadata.tables.values(), key=lambda table: table.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+# Get the fingerprint stored by the last migration
+def stored_fingerprint(bind=None):
+    """
+    Get the fingerprint of the schema the database was last migrated to.
+
+    Args:
+        bind (Engine, optional): The engine. Defaults to the app's engine.
+
+    Returns:
+        str: The fingerprint, or None if the database was never migrated.
+    """
+    with (bind or engine).connect() as connection:
+        if not connection.dialect.has_table(connection, schema_state.name):
+            return None
+        return connection.execute(
+            select(schema_state.c.fingerprint).where(schema_state.c.name == 'models')
+        ).scalar()
+
+# Find the indexes of the models missing from tables that already exist
+def missing_indexes(connection, metadata=None):
+    """
+    Compare the indexes of the models with the ones of the database tables.
+
+    An index counts as present when the database has an index or unique constraint with the same
+    name, or one on the same columns that is unique whenever the model's index is.
+
+    Args:
+        connection (Connection): The connection.
+        metadata (MetaData, optional): The metadata. Defaults to Base.metadata.
+
+    Returns:
+        list: The missing Index objects, of tables that exist.
+    """
+    metadata = metadata if metadata is not None else Base.metadata
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables or not table.indexes:
+            continue
+        present = [
+            (index['name'], tuple(index['column_names']), bool(index.get('unique')))
+            for index in inspector.get_indexes(table.name)
+        ] + [
+            (constraint['name'], tuple(constraint['column_names']), True)
+            for constraint in inspector.get_unique_constraints(table.name)
+        ]
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            columns = tuple(column.name for column in index.columns)
+            if not any(name == index.name or (names == columns and (unique or not index.unique)) for name, names, unique in present):
+                missing.append(index)
+    return missing
+
+# Create the indexes missing from existing tables
+def create_missing_indexes(connection, metadata=None):
+    """
+    Create the indexes create_all() skipped because their table already existed, letting the
+    table's model fix its data first (see BaseModel.before_create_index()).
+
+    Args:
+        connection (Connection): The connection, inside a transaction.
+        metadata (MetaData, optional): The metadata. Defaults to Base.metadata.
+
+    Returns:
+        list: The names of the created indexes.
+    """
+    models = {mapper.local_table.name: mapper.class_ for mapper in Base.registry.mappers}
+    created = []
+    for index in missing_indexes(connection, metadata):
+        model = models.get(index.table.name)
+        if model is not None:
+            model.before_create_index(connection, index)
+        index.create(bind=connection)
+        created.append(index.name)
+    return created
+
+# Check whether the database schema is up to date
+def check():
+    """
+    Compare the models' fingerprint with the one stored in the database.
+
+    Returns:
+        tuple: (up_to_date, current fingerprint, stored fingerprint or None).
+    """
+    import_models()
+    current = schema_fingerprint()
+    stored = stored_fingerprint()
+    return current == stored, current, stored
+
+# Create the missing tables and store the new fingerprint
+def migrate(force=False):
+    """
+    Create the missing tables and indexes of the models, unless the fingerprint is unchanged.
+
+    Everything runs in one transaction and the fingerprint is only stored once every missing
+    index exists, so a failed step is retried on the next startup.
+
+    Args:
+        force (bool): Whether to run create_all() even when the fingerprint is unchanged.
+
+    Returns:
+        bool: True if the schema was migrated, False if it was already up to date.
+    """
+    up_to_date, current, _ = check()
+    if up_to_date and not force:
+        return False
+    with engine.begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        created = create_missing_indexes(connection)
+        for name in created:
+            print(f"Created missing index {name}")
+        schema_state.create(bind=connection, checkfirst=True)
+        connection.execute(schema_state.delete().where(schema_state.c.name == 'models'))
+        connection.execute(schema_state.insert().values(name='models', fingerprint=current, applied_at=time.time()))
+    if created:
+        # SQLite compiles statements against each connection's cached schema, so a pooled connection
+        # that read the schema before the index existed rejects ON CONFLICT (user_id); reconnect them
+        engine.dispose()
+    return True
+
+# Apply the startup mode selected by DB_MIGRATE
+def ensure_schema(mode=None):
+    """
+    Migrate or check the schema on startup, as selected by DB_MIGRATE.
+
+    Args:
+        mode (str, optional): 'auto', 'check' or 'off'. Defaults to DB_MIGRATE, or 'auto'.
+
+    Returns:
+        str: 'migrated', 'up to date' or 'skipped'.
+
+    Raises:
+        ValueError: If the mode is unknown.
+        RuntimeError: In 'check' mode, if the schema is out of date.
+    """
+    mode = (mode or os.environ.get('DB_MIGRATE') or 'auto').strip().lower()
+    if mode not in MIGRATE_MODES:
+        raise ValueError(f"DB_MIGRATE must be one of {', '.join(MIGRATE_MODES)}, not '{mode}'")
+    if mode == 'off':
+        return 'skipped'
+    if mode == 'check':
+        up_to_date, _, _ = check()
+        if not up_to_date:
+            raise RuntimeError("The database schema is out of date; run 'python database/migrate.py migrate'")
+        return 'up to date'
+    return 'migrated' if migrate() else 'up to date'
+
+# Main execution
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'migrate':
+        migrated = migrate(force='--force' in sys.argv[2:])
+        print("Schema migrated" if migrated else "Schema is up to date")
+    elif command == 'check':
+        up_to_date, current, stored = check()
+        print(f"Schema is {'up to date' if up_to_date else 'out of date'} (models {current[:12]}, database {(stored or 'none')[:12]})")
+        sys.exit(0 if up_to_date else 1)
+    else:
+        print("Usage: python database/migrate.py migrate [--force] | check")
+        sys.exit(1)
@@ -0,0 +1,357 @@
+import threading
+from sqlalchemy import select, exists, func, bindparam, not_, inspect
+from database.db import unit_of_work, async_unit_of_work
+
+# Define the supported lookups: name -> function(column, parameter) building the condition
+LOOKUPS = {
+    'exact': lambda column, param: column == param,
+    'ne': lambda column, param: column != param,
+    'lt': lambda column, param: column < param,
+    'lte': lambda column, param: column <= param,
+    'gt': lambda column, param: column > param,
+    'gte': lambda column, param: column >= param,
+    'in': lambda column, param: column.in_(param),
+    'contains': lambda column, param: column.contains(param, escape='/'),
+    'icontains': lambda column, param: column.icontains(param, escape='/'),
+    'startswith': lambda column, param: column.startswith(param, escape='/'),
+    'endswith': lambda column, param: column.endswith(param, escape='/'),
+}
+
+# Lookups compiled to LIKE, whose values need their wildcards escaped
+LIKE_LOOKUPS = ('contains', 'icontains', 'startswith', 'endswith')
+
+# Statements built so far, keyed by the shape of the query (model, lookups, ordering, ...)
+_statements = {}
+_statements_lock = threading.Lock()
+
+# Define a chainable query on a model
+class QuerySet:
+    """
+    A chainable, lazily evaluated query on a model with Django-style lookups.
+
+    Lookups are written as `<column>__<lookup>=value`, for example `amount__gte=10` or
+    `id__in=[1, 2, 3]`; a bare column name means `exact`, and `exact=None` means IS NULL.
+    Supported lookups: exact, ne, lt, lte, gt, gte, in, contains, icontains, startswith,
+    endswith and isnull.
+
+    Every terminal call (all, first, count, exists) runs a single SQL statement. Statements
+    are built once per query shape and reused with new parameter values, so SQLAlchemy's
+    compiled cache is hit on every later call.
+
+    Attributes:
+        model (BaseModel): The model being queried.
+    """
+
+    def __init__(self, model, db_session=None):
+        """
+        Initializes the QuerySet class with the given parameters.
+
+        Args:
+            model (BaseModel): The model to query.
+            db_session (Session or AsyncSession, optional): The database session. Defaults to None.
+        """
+        self.model = model
+        self._db_session = db_session
+        self._filters = ()  # (column, lookup, negated, isnull) per condition
+        self._params = ()
+        self._order = ()
+        self._columns = ()
+        self._limit = None
+        self._offset = None
+
+    def _clone(self, **changes):
+        """
+        Copy the query set with some attributes changed.
+
+        Returns:
+            QuerySet: The new query set.
+        """
+        clone = QuerySet.__new__(QuerySet)
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.update(changes)
+        return clone
+
+    def _check_columns(self, names):
+        """
+        Make sure every name is a mapped column of the model, not a method or a relationship.
+
+        Args:
+            names (iterable of str): The column names.
+
+        Raises:
+            ValueError: If a name isn't a column of the model.
+        """
+        columns = inspect(self.model).column_attrs
+        for name in names:
+            if name not in columns:
+                raise ValueError(f"{self.model.__name__} has no column '{name}'")
+
+    def _add_filters(self, lookups, negated):
+        """
+        Parse lookups into filter conditions and parameters.
+
+        Args:
+            lookups (dict): The `<column>__<lookup>` keyword arguments.
+            negated (bool): Whether the conditions are negated (exclude).
+
+        Returns:
+            QuerySet: The new query set.
+
+        Raises:
+            ValueError: If a column or lookup is unknown.
+        """
+        filters = list(self._filters)
+        params = list(self._params)
+        for key, value in lookups.items():
+            name, _, lookup = key.partition('__')
+            lookup = lookup or 'exact'
+            self._check_columns([name])
+            if lookup == 'isnull' or (lookup == 'exact' and value is None):
+                # IS NULL / IS NOT NULL change the SQL itself, not just a parameter
+                filters.append((name, 'isnull', negated, True if lookup == 'exact' else bool(value)))
+                continue
+            if lookup not in LOOKUPS:
+                raise ValueError(f"Unknown lookup '{lookup}' in '{key}'")
+            if lookup == 'in':
+                value = list(value)
+            elif lookup in LIKE_LOOKUPS:
+                value = str(value).replace('/', '//').replace('%', '/%').replace('_', '/_')
+            filters.append((name, lookup, negated, None))
+            params.append(value)
+        return self._clone(_filters=tuple(filters), _params=tuple(params))
+
+    def filter(self, **lookups):
+        """
+        Keep only rows matching every lookup.
+
+        Args:
+            **lookups: The `<column>__<lookup>=value` conditions.
+
+        Returns:
+            QuerySet: The new query set.
+        """
+        return self._add_filters(lookups, negated=False)
+
+    def exclude(self, **lookups):
+        """
+        Drop rows matching a lookup.
+
+        Args:
+            **lookups: The `<column>__<lookup>=value` conditions.
+
+        Returns:
+            QuerySet: The new query set.
+        """
+        return self._add_filters(lookups, negated=True)
+
+    def order_by(self, *columns):
+        """
+        Order the rows by the given columns; prefix a column with '-' for descending order.
+
+        Args:
+            *columns (str): The column names.
+
+        Returns:
+            QuerySet: The new query set.
+
+        Raises:
+            ValueError: If a column is unknown.
+        """
+        self._check_columns(name.lstrip('-') for name in columns)
+        return self._clone(_order=tuple(columns))
+
+    def only(self, *columns):
+        """
+        Load only the given columns (and 'id'); rows are returned as named tuples.
+
+        Args:
+            *columns (str): The column names.
+
+        Returns:
+            QuerySet: The new query set.
+
+        Raises:
+            ValueError: If a column is unknown.
+        """
+        self._check_columns(columns)
+        return self._clone(_columns=tuple(columns))
+
+    def limit(self, count):
+        """
+        Return at most `count` rows.
+
+        Args:
+            count (int): The maximum number of rows.
+
+        Returns:
+            QuerySet: The new query set.
+        """
+        return self._clone(_limit=count)
+
+    def offset(self, count):
+        """
+        Skip the first `count` rows.
+
+        Args:
+            count (int): The number of rows to skip.
+
+        Returns:
+            QuerySet: The new query set.
+        """
+        return self._clone(_offset=count)
+
+    def _statement(self, kind):
+        """
+        Get the statement of this query shape, building and caching it on first use.
+
+        Args:
+            kind (str): 'select', 'count' or 'exists'.
+
+        Returns:
+            Select: The statement with bind parameters p0, p1, ... and limit/offset.
+        """
+        shape = (
+            self.model, kind, self._filters, self._columns,
+            self._order if kind == 'select' else (),
+            kind == 'select' and self._limit is not None,
+            kind == 'select' and self._offset is not None,
+        )
+        statement = _statements.get(shape)
+        if statement is not None:
+            return statement
+
+        model = self.model
+        conditions = []
+        index = 0
+        for name, lookup, negated, isnull in self._filters:
+            column = getattr(model, name)
+            if lookup == 'isnull':
+                condition = column.is_(None) if isnull else column.is_not(None)
+            else:
+                param = bindparam(f'p{index}', expanding=lookup == 'in')
+                condition = LOOKUPS[lookup](column, param)
+                index += 1
+            conditions.append(not_(condition) if negated else condition)
+
+        if kind == 'count':
+            statement = select(func.count()).select_from(model).where(*conditions)
+        elif kind == 'exists':
+            statement = select(exists().where(*conditions)) if conditions else select(exists(select(model.id)))
+        else:
+            statement = select(*model._projection(self._columns)).where(*conditions)
+            for name in self._order:
+                column = getattr(model, name.lstrip('-'))
+                statement = statement.order_by(column.desc() if name.startswith('-') else column.asc())
+            if self._limit is not None:
+                statement = statement.limit(bindparam('limit'))
+            if self._offset is not None:
+                statement = statement.offset(bindparam('offset'))
+
+        with _statements_lock:
+            _statements.setdefault(shape, statement)
+        return statement
+
+    def _parameters(self, kind):
+        """
+        Get the parameter values of this query for a statement kind.
+
+        Returns:
+            dict: The bind parameter values.
+        """
+        params = {f'p{index}': value for index, value in enumerate(self._params)}
+        if kind == 'select':
+            if self._limit is not None:
+                params['limit'] = self._limit
+            if self._offset is not None:
+                params['offset'] = self._offset
+        return params
+
+    def all(self):
+        """
+        Run the query.
+
+        Returns:
+            list: The matching instances (or rows when only() is used).
+        """
+        with unit_of_work(self._db_session) as db_session:
+            result = db_session.execute(self._statement('select'), self._parameters('select'))
+            return list(result if self._columns else result.scalars())
+
+    def first(self):
+        """
+        Run the query for a single row.
+
+        Returns:
+            BaseModel: The first matching instance (or row), or None.
+        """
+        rows = self.limit(1).all()
+        return rows[0] if rows else None
+
+    def count(self):
+        """
+        Count the matching rows with SELECT count(*).
+
+        Returns:
+            int: The number of matching rows.
+        """
+        with unit_of_work(self._db_session) as db_session:
+            return db_session.execute(self._statement('count'), self._parameters('count')).scalar()
+
+    def exists(self):
+        """
+        Check whether any row matches with SELECT EXISTS.
+
+        Returns:
+            bool: True if at least one row matches.
+        """
+        with unit_of_work(self._db_session) as db_session:
+            return bool(db_session.execute(self._statement('exists'), self._parameters('exists')).scalar())
+
+    async def aall(self):
+        """
+        Run the query without blocking the event loop.
+
+        Returns:
+            list: The matching instances (or rows when only() is used).
+        """
+        async with async_unit_of_work(self._db_session) as db_session:
+            result = await db_session.execute(self._statement('select'), self._parameters('select'))
+            return list(result if self._columns else result.scalars())
+
+    async def afirst(self):
+        """
+        Run the query for a single row without blocking the event loop.
+
+        Returns:
+            BaseModel: The first matching instance (or row), or None.
+        """
+        rows = await self.limit(1).aall()
+        return rows[0] if rows else None
+
+    async def acount(self):
+        """
+        Count the matching rows without blocking the event loop.
+
+        Returns:
+            int: The number of matching rows.
+        """
+        async with async_unit_of_work(self._db_session) as db_session:
+            return (await db_session.execute(self._statement('count'), self._parameters('count'))).scalar()
+
+    async def aexists(self):
+        """
+        Check whether any row matches without blocking the event loop.
+
+        Returns:
+            bool: True if at least one row matches.
+        """
+        async with async_unit_of_work(self._db_session) as db_session:
+            return bool((await db_session.execute(self._statement('exists'), self._parameters('exists'))).scalar())
+
+    def __iter__(self):
+        return iter(self.all())
+
+# Example usage of the QuerySet class:
+# richest = Balance.query().filter(amount__gte=100).order_by('-amount').limit(10).all()
+# Balance.query().filter(user_id__in=[1, 2, 3]).count()
+# Users.query().filter(email__icontains='@example.com').exclude(is_admin=True).exists()
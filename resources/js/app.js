@@ -0,0 +1,4 @@
+// Scripts of the web pages, linked with {{ asset_url('js/app.js') }}
+document.addEventListener('DOMContentLoaded', () => {
+    document.documentElement.classList.add('js');
+});
@@ -17,9 +17,84 @@ def new_route():
     return 'This is the response for the new route.'
 """
 
-from flask import Blueprint
+from flask import Blueprint, Response, jsonify, request
+from app.Actions.shards import get_stats
+from app.Actions.outbox import get_outbox_stats
+from app.Actions.webhook import inbound_webhooks
+from app.Actions.route_cache import cached_route, route_cache_stats
+from app.Actions.ratelimit import init_rate_limit, rate_limit_stats
+from app.Actions.auth import has_stats_token, stats_token_required
 api = Blueprint('api', __name__, url_prefix='/api/v1') # Define the API blueprint
 
+# Limit each client IP to RATE_LIMIT_API requests (see app/Actions/ratelimit.py); inbound webhooks
+# have their own backpressure, and senders retry on 503 rather than on 429; a metrics scraper
+# presenting STATS_TOKEN must never be refused, anyone else probing /metrics is limited
+init_rate_limit(
+    api,
+    exempt=('api.api_webhook',),
+    skip=lambda: request.endpoint == 'api.api_metrics' and has_stats_token(),
+)
+
 @api.route('/hello/<name>', methods=['GET'])
+@cached_route(ttl=300)
 def api_hello(name):
-    return f"Hello, {name}!"
\ No newline at end of file
+    return f"Hello, {name}!"
+
+# The stats and metrics routes below expose internals of the bot and the database, so they are
+# served only with STATS_TOKEN (see app/Actions/auth.py)
+
+@api.route('/shards', methods=['GET'])
+@stats_token_required
+def api_shards():
+    # Per-shard latency and gateway event rates of the Discord bot (see app/Actions/shards.py)
+    stats = get_stats()
+    if stats is None:
+        return jsonify({'error': 'Discord bot is not running in this process and SHARD_STATS_FILE is not set'}), 404
+    return jsonify(stats)
+
+@api.route('/paginators', methods=['GET'])
+@stats_token_required
+def api_paginators():
+    # Open paginator views of the bot running in this process (see app/Actions/pagination.py)
+    from app.Actions.pagination import registry as paginators  # Imported here so web-only processes don't load disnake
+    return jsonify(paginators.stats())
+
+@api.route('/outbox', methods=['GET'])
+@stats_token_required
+@cached_route(ttl=5, cache_control='private, max-age=5')  # The stats run a GROUP BY over the outbox
+def api_outbox():
+    # Queue depth and lag of the webhook outbox, and delivery counters of this process (see app/Actions/outbox.py)
+    return jsonify(get_outbox_stats())
+
+@api.route('/webhooks/<source>', methods=['POST'])
+def api_webhook(source):
+    # Verify, dedupe and queue an inbound webhook; it is processed in the background (see app/Actions/webhook.py)
+    status, body, headers = inbound_webhooks.accept(source, request.get_data(cache=False), request.headers)
+    return jsonify(body), status, headers
+
+@api.route('/webhooks', methods=['GET'])
+@stats_token_required
+def api_webhooks():
+    # Counters and queue depth of inbound webhooks in this process
+    return jsonify(inbound_webhooks.snapshot())
+
+@api.route('/cache', methods=['GET'])
+@stats_token_required
+def api_cache():
+    # Hit ratios of the routes cached with @cached_route in this process (see app/Actions/route_cache.py)
+    return jsonify(route_cache_stats())
+
+@api.route('/ratelimits', methods=['GET'])
+@stats_token_required
+def api_ratelimits():
+    # Allowed/refused counters of the rate and concurrency limiters in this process (see app/Actions/ratelimit.py)
+    return jsonify(rate_limit_stats())
+
+@api.route('/metrics', methods=['GET'])
+@stats_token_required
+def api_metrics():
+    # Command, request and query metrics in the Prometheus text format (see app/Actions/metrics.py)
+    from app.Actions.metrics import CONTENT_TYPE, metrics_enabled, render_metrics
+    if not metrics_enabled():
+        return jsonify({'error': 'Metrics are disabled; set METRICS_ENABLED=true'}), 404
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
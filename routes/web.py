@@ -1,7 +1,9 @@
 from flask import current_app as app, render_template
 from app.Controllers.Flask.greetUser import greet_user
+from app.Actions.route_cache import cached_route
 
 @app.route('/')
+@cached_route(ttl=300)
 def home():
     """
     Render the home page.
@@ -14,6 +16,7 @@ def home():
     return render_template('index.html')
 
 @app.route('/<name>')
+@cached_route(ttl=300)
 def api_hello(name):
     """
     Greet the user with the provided name using the Controller: app/Controllers/Discord/greetUser.py.
@@ -0,0 +1,108 @@
+"""
+bench_bulk.py
+Compare BaseModel.bulk_create/bulk_update/bulk_delete with the per-row create/update/delete on a
+throwaway SQLite database. Run it from the project root with:
+
+    python scripts/bench_bulk.py --rows 5000 --batch-size 1000
+
+Pass --database-url to benchmark another database; its users table is written to, so never point
+it at production data.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Time a function and return its result with the elapsed seconds
+def timed(function, *args, **kwargs):
+    """
+    Call a function and measure it.
+
+    Args:
+        function (callable): The function to call.
+        *args: Its positional arguments.
+        **kwargs: Its keyword arguments.
+
+    Returns:
+        tuple: The function's result and the elapsed time in seconds.
+    """
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+# Run the per-row and bulk variants and print their timings
+def run(rows, batch_size):
+    """
+    Benchmark the per-row and bulk write paths of the Users model.
+
+    Args:
+        rows (int): The number of users written by each variant.
+        batch_size (int): The batch size of the bulk methods.
+
+    Returns:
+        list: (operation, per-row seconds, bulk seconds) tuples.
+    """
+    from database.migrate import migrate
+    from app.Models.users import Users
+    migrate(force=True)
+
+    def per_row_create(prefix):
+        return [Users.create(email=f'{prefix}{i}@example.com', password='x').id for i in range(rows)]
+
+    def per_row_update(ids):
+        for id in ids:
+            Users.update(id, name='renamed')
+
+    def per_row_delete(ids):
+        for id in ids:
+            Users.delete(id)
+
+    def bulk_rows(prefix):
+        return [{'email': f'{prefix}{i}@example.com', 'password': 'x'} for i in range(rows)]
+
+    results = []
+    ids, create_one = timed(per_row_create, 'row')
+    _, update_one = timed(per_row_update, ids)
+    _, delete_one = timed(per_row_delete, ids)
+
+    created, create_bulk = timed(Users.bulk_create, bulk_rows('bulk'), batch_size=batch_size)
+    ids = [user.id for user in created]
+    _, update_bulk = timed(Users.bulk_update, [{'id': id, 'name': 'renamed'} for id in ids], batch_size=batch_size)
+    _, delete_bulk = timed(Users.bulk_delete, ids, batch_size=batch_size)
+    _, create_fast = timed(Users.bulk_create, bulk_rows('fast'), batch_size=batch_size, refresh=False)
+    Users.bulk_delete([user.id for user in Users.filter(password='x')], batch_size=batch_size)
+
+    results.append(('create', create_one, create_bulk))
+    results.append(('create (refresh=False)', create_one, create_fast))
+    results.append(('update', update_one, update_bulk))
+    results.append(('delete', delete_one, delete_bulk))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the bulk write methods of BaseModel.')
+    parser.add_argument('--rows', type=int, default=5000, help='Users written by each variant (default 5000)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk statement/commit (default 1000)')
+    parser.add_argument('--database-url', help='Database to write to (default: a temporary SQLite file)')
+    options = parser.parse_args()
+
+    # DATABASE_URL must be set before database/db.py is imported
+    os.environ['DATABASE_URL'] = options.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ['DB_MIGRATE'] = 'auto'
+
+    print(f"{options.rows} rows, batch size {options.batch_size}, {os.environ['DATABASE_URL']}")
+    print(f"{'operation':<24}{'per-row':>12}{'bulk':>12}{'speedup':>10}")
+    for operation, one, bulk in run(options.rows, options.batch_size):
+        print(f"{operation:<24}{one:>11.3f}s{bulk:>11.3f}s{one / bulk:>9.1f}x")
+
+# Example output (SQLite on a temporary file):
+# 5000 rows, batch size 1000, sqlite:////tmp/tmpfyxrfasm/bench.db
+# operation                    per-row        bulk   speedup
+# create                        5.871s      0.470s     12.5x
+# create (refresh=False)        5.871s      0.069s     85.2x
+# update                        7.040s      0.047s    149.5x
+# delete                        6.164s      0.019s    326.3x
@@ -0,0 +1,136 @@
+"""
+bench_paginator.py
+Measure the memory held per open Paginator and the time to its first page, for a leaderboard
+of --rows rows shown one row per page. Run it from the project root with:
+
+    python scripts/bench_paginator.py --rows 5000 --open 50
+
+Variants:
+- eager:  an embed built for every page up front, as Paginator did before pages were lazy.
+- lazy:   the same list of formatted rows; only the visible page and its neighbours are rendered.
+- keyset: KeysetPages over the users table of a throwaway SQLite database; no rows are kept.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Format the leaderboard rows the way a command would
+def leaderboard(rows):
+    """
+    Build the text of every leaderboard row.
+
+    Args:
+        rows (int): The number of rows.
+
+    Returns:
+        list of str: One line per row.
+    """
+    return [f"#{rank} <@{1000 + rank}> — {rows - rank} points" for rank in range(1, rows + 1)]
+
+# Open paginators and measure them
+async def measure(open_paginator, count):
+    """
+    Open `count` paginators, keeping them all alive like views waiting for clicks.
+
+    Args:
+        open_paginator (function): Async function building a paginator and rendering its first page.
+        count (int): The number of paginators to open.
+
+    Returns:
+        tuple: The memory held per paginator in KiB, and the mean time to first page in ms.
+    """
+    import gc
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    paginators = []
+    started = time.perf_counter()
+    for _ in range(count):
+        paginators.append(await open_paginator())
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.05)  # Let the neighbour prefetches finish, they stay cached while open
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    for paginator in paginators:
+        paginator.release()
+    return held / count / 1024, elapsed / count * 1000
+
+# Run every variant
+async def run(rows, count):
+    """
+    Benchmark the eager, lazy and keyset paginators.
+
+    Args:
+        rows (int): The number of leaderboard rows.
+        count (int): The number of paginators kept open per variant.
+
+    Returns:
+        list: (variant, KiB per paginator, ms to first page) tuples.
+    """
+    import disnake
+    from app.Actions.pagination import KeysetPages, Paginator
+    from app.Models.users import Users
+    from database.migrate import migrate
+
+    migrate(force=True)
+    Users.bulk_create(
+        ({'name': line, 'email': f'bench{rank}@example.com', 'password': 'bench'} for rank, line in enumerate(leaderboard(rows))),
+        refresh=False,
+    )
+
+    async def eager():
+        embeds = [disnake.Embed(title='Leaderboard', description=line) for line in leaderboard(rows)]
+        paginator = Paginator(embeds)
+        await paginator._first_page()
+        return paginator
+
+    async def lazy():
+        paginator = Paginator(leaderboard(rows), title='Leaderboard')
+        await paginator._first_page()
+        return paginator
+
+    async def keyset():
+        pages = KeysetPages(
+            Users, lambda users, page: disnake.Embed(title='Leaderboard', description=users[0].name),
+            per_page=1, columns=['name'], password='bench',
+        )
+        paginator = Paginator(pages)
+        await paginator._first_page()
+        return paginator
+
+    results = []
+    for name, open_paginator in (('eager', eager), ('lazy', lazy), ('keyset', keyset)):
+        results.append((name, *await measure(open_paginator, count)))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the memory and first-page time of Paginator.')
+    parser.add_argument('--rows', type=int, default=5000, help='Leaderboard rows, one per page (default 5000)')
+    parser.add_argument('--open', type=int, default=50, help='Paginators kept open per variant (default 50)')
+    options = parser.parse_args()
+
+    # DATABASE_URL must be set before database/db.py is imported
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ.pop('ASYNC_DATABASE_URL', None)
+    os.environ['DB_MIGRATE'] = 'auto'
+
+    print(f"{options.rows} pages, {options.open} open paginators per variant")
+    print(f"{'variant':<10}{'KiB/paginator':>15}{'first page ms':>15}")
+    for variant, kib, ms in asyncio.run(run(options.rows, options.open)):
+        print(f"{variant:<10}{kib:>15.1f}{ms:>15.2f}")
+
+# Example output (SQLite on a temporary file):
+# 5000 pages, 50 open paginators per variant
+# variant     KiB/paginator  first page ms
+# eager              1676.3          66.52
+# lazy                660.9          38.14
+# keyset               10.5           8.81
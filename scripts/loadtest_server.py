@@ -0,0 +1,244 @@
+"""
+loadtest_server.py
+Compare the requests per second of the FLASK_SERVER modes (see 'config/server.py'). Every mode
+boots the real app with 'config/boot.py' (BOOT_ROLE=web, bot disabled) on a free local port, and
+is then loaded by keep-alive HTTP clients for a fixed duration. Run it from the project root with:
+
+    python scripts/loadtest_server.py --modes dev,waitress,gunicorn --clients 32 --duration 10
+
+The clients are threads of this process, so on a small machine they compete with the server for
+CPU; for absolute numbers point a dedicated tool such as wrk at a server started the same way.
+Modes whose package isn't installed are skipped. The API rate limit is turned off for the run.
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Get a free local TCP port
+def free_port():
+    """
+    Get a TCP port that is free on 127.0.0.1.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+# Check whether a server mode's package is installed
+def mode_available(mode):
+    """
+    Check whether the package a server mode needs is installed.
+
+    Args:
+        mode (str): The server mode.
+
+    Returns:
+        bool: True if the mode can run here.
+    """
+    if mode == 'dev':
+        return True
+    try:
+        __import__(mode)
+        return True
+    except ImportError:
+        return False
+
+# Start config/boot.py serving the web app with the given mode
+def start_server(mode, port, database_url, log):
+    """
+    Start the web role of the app under a server mode.
+
+    Args:
+        mode (str): The FLASK_SERVER mode.
+        port (int): The port to serve on.
+        database_url (str): The DATABASE_URL of the server.
+        log (file): Where the server's output goes.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+    env = dict(
+        os.environ,
+        FLASK_SERVER=mode,
+        FLASK_HOST='127.0.0.1',
+        FLASK_PORT=str(port),
+        BOOT_ROLE='web',
+        DISCORD_TOKEN='',
+        DATABASE_URL=database_url,
+        DB_MIGRATE='auto',
+        RATE_LIMIT_API='off',
+    )
+    return subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'config', 'boot.py')],
+        cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+# Wait until the server answers
+def wait_ready(process, port, path, timeout=60):
+    """
+    Poll the server until it answers a request.
+
+    Args:
+        process (subprocess.Popen): The server process.
+        port (int): The server's port.
+        path (str): The path to request.
+        timeout (float, optional): Seconds to wait. Defaults to 60.
+
+    Raises:
+        RuntimeError: If the server exits or doesn't answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"the server exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', path)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"the server didn't answer within {timeout}s")
+
+# Stop the server gracefully
+def stop_server(process, grace=30):
+    """
+    Send SIGTERM to the server and kill it if it doesn't exit within the grace period.
+
+    Args:
+        process (subprocess.Popen): The server process.
+        grace (float, optional): Seconds to wait. Defaults to 30.
+    """
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(grace)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# Load the server with keep-alive clients for a fixed duration
+def load(port, path, clients, duration):
+    """
+    Send requests from `clients` threads, each on its own keep-alive connection.
+
+    Args:
+        port (int): The server's port.
+        path (str): The path to request.
+        clients (int): The number of concurrent clients.
+        duration (float): Seconds to keep sending.
+
+    Returns:
+        dict: The requests, errors, req/s and p50/p99 latency in milliseconds.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+    deadline = [0.0]
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        own, failed = [], 0
+        start.wait()
+        while time.monotonic() < deadline[0]:
+            sent = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                    continue
+                own.append(time.perf_counter() - sent)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        connection.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.monotonic() + duration
+    started = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else float('nan')
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(0.50),
+        'p99': percentile(0.99),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load-test the FLASK_SERVER modes against each other.')
+    parser.add_argument('--modes', default='dev,waitress,gunicorn', help='Comma-separated modes (default dev,waitress,gunicorn)')
+    parser.add_argument('--path', default='/api/v1/hello/loadtest', help='Path to request (default /api/v1/hello/loadtest)')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent keep-alive clients (default 32)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load per mode (default 10)')
+    parser.add_argument('--warmup', type=float, default=1, help='Seconds of load before measuring (default 1)')
+    options = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='loadtest-')
+    database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(directory, 'loadtest.db')}"
+    print(f"{options.clients} clients, {options.duration:g}s per mode, GET {options.path}")
+    print(f"{'mode':<10}{'requests':>10}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'vs dev':>8}")
+
+    baseline = None
+    for mode in [mode.strip() for mode in options.modes.split(',') if mode.strip()]:
+        if not mode_available(mode):
+            print(f"{mode:<10}skipped, the '{mode}' package is not installed")
+            continue
+        port = free_port()
+        log_path = os.path.join(directory, f'{mode}.log')
+        with open(log_path, 'w') as log:
+            process = start_server(mode, port, database_url, log)
+            try:
+                wait_ready(process, port, options.path)
+                if options.warmup:
+                    load(port, options.path, options.clients, options.warmup)
+                result = load(port, options.path, options.clients, options.duration)
+            except RuntimeError as e:
+                print(f"{mode:<10}failed: {e} (see {log_path})")
+                continue
+            finally:
+                stop_server(process)
+        if mode == 'dev':
+            baseline = result['rps']
+        speedup = f"{result['rps'] / baseline:.1f}x" if baseline else '-'
+        print(
+            f"{mode:<10}{result['requests']:>10}{result['rps']:>10.0f}{result['p50']:>9.1f}"
+            f"{result['p99']:>9.1f}{result['errors']:>8}{speedup:>8}"
+        )
+
+# Example output (FLASK_WORKERS=4, 1 CPU shared by the server and the clients):
+# 16 clients, 5s per mode, GET /api/v1/hello/loadtest
+# mode        requests     req/s   p50 ms   p99 ms  errors  vs dev
+# dev             3430       685     22.8     42.7       0    1.0x
+# waitress        6012      1200     13.1     26.2       0    1.8x
+# gunicorn        5239      1046     13.1     45.1       0    1.5x
@@ -0,0 +1,34 @@
+"""
+conftest.py
+Shared setup of the test suite. Run it from the project root with:
+
+    python -m pytest -q
+
+The tests run against a temporary SQLite database, so DATABASE_URL is set before any project
+module imports database/db.py.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Use a throwaway SQLite database for the whole session
+_database_directory = tempfile.mkdtemp(prefix='mvc-python-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_database_directory, 'test.db')}"
+os.environ.pop('ASYNC_DATABASE_URL', None)
+os.environ.setdefault('DB_MIGRATE', 'auto')
+
+import pytest
+
+# Create the schema once per test session
+@pytest.fixture(scope='session', autouse=True)
+def schema():
+    """
+    Create the tables of every model in the temporary database.
+    """
+    from database.migrate import migrate
+    migrate(force=True)
+    yield
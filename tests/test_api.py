@@ -0,0 +1,48 @@
+import pytest
+from flask import Flask
+
+STATS_ROUTES = ('/shards', '/paginators', '/outbox', '/webhooks', '/cache', '/ratelimits', '/metrics')
+
+@pytest.fixture
+def client():
+    from routes.api import api
+    app = Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+@pytest.mark.parametrize('route', STATS_ROUTES)
+def test_stats_routes_are_disabled_without_a_token(client, monkeypatch, route):
+    monkeypatch.delenv('STATS_TOKEN', raising=False)
+    assert client.get(f'/api/v1{route}').status_code == 404
+
+@pytest.mark.parametrize('route', STATS_ROUTES)
+def test_stats_routes_require_the_token(client, monkeypatch, route):
+    monkeypatch.setenv('STATS_TOKEN', 'letmein')
+    assert client.get(f'/api/v1{route}').status_code == 401
+    assert client.get(f'/api/v1{route}', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get(f'/api/v1{route}', headers={'X-Stats-Token': 'lëtmein'}).status_code == 401
+
+def test_stats_routes_accept_the_token(client, monkeypatch):
+    monkeypatch.setenv('STATS_TOKEN', 'letmein')
+    assert client.get('/api/v1/outbox', headers={'Authorization': 'Bearer letmein'}).status_code == 200
+    assert client.get('/api/v1/cache', headers={'X-Stats-Token': 'letmein'}).status_code == 200
+
+def test_outbox_stats_are_not_served_from_the_cache_without_a_token(client, monkeypatch):
+    monkeypatch.setenv('STATS_TOKEN', 'letmein')
+    assert client.get('/api/v1/outbox', headers={'Authorization': 'Bearer letmein'}).status_code == 200
+    assert client.get('/api/v1/outbox').status_code == 401
+
+def test_hello_stays_public(client, monkeypatch):
+    monkeypatch.delenv('STATS_TOKEN', raising=False)
+    assert client.get('/api/v1/hello/world').status_code == 200
+
+def test_rate_limit_skips_requests_the_skip_hook_accepts():
+    from flask import request
+    from app.Actions.ratelimit import MemoryRateLimitBackend, init_rate_limit
+    app = Flask(__name__)
+    init_rate_limit(app, limit='1/60', backend=MemoryRateLimitBackend(), skip=lambda: 'X-Scraper' in request.headers)
+    app.add_url_rule('/stats', 'stats', lambda: 'ok')
+    client = app.test_client()
+    assert client.get('/stats').status_code == 200
+    assert client.get('/stats').status_code == 429
+    assert client.get('/stats', headers={'X-Scraper': '1'}).status_code == 200
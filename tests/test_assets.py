@@ -0,0 +1,33 @@
+import inspect
+import pytest
+from flask import Flask
+from config.assets import init_assets, load_manifest
+
+# Build a Flask app serving the built assets
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    init_assets(app, build=not load_manifest())
+    return app
+
+# Get the encodings cache of the '/assets/' route
+def variants(app):
+    return inspect.getclosurevars(app.view_functions['assets']).nonlocals['variants']
+
+def test_unknown_asset_paths_are_not_cached(app):
+    client = app.test_client()
+    for number in range(200):
+        assert client.get(f'/assets/missing/{number}.css').status_code == 404
+    assert client.get('/assets/../../config/boot.py').status_code == 404
+    assert len(variants(app)) == 0
+
+def test_fingerprinted_assets_are_served_precompressed(app):
+    manifest = load_manifest()
+    if not manifest:
+        pytest.skip('no static assets to build')
+    client = app.test_client()
+    path = next(path for path in manifest.values() if path.endswith(('.css', '.js')))
+    response = client.get(f'/assets/{path}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['Cache-Control']
+    assert set(variants(app)) == {path}
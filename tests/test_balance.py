@@ -0,0 +1,78 @@
+import threading
+import pytest
+from app.Models.balance import Balance
+from app.Models.users import Users
+from database.db import unit_of_work
+
+THREADS = 8
+
+@pytest.fixture
+def users():
+    created = [Users.create(email=f'balance{number}@example.com', password='secret') for number in range(2)]
+    yield created
+    with unit_of_work() as db_session:
+        db_session.execute(Balance.__table__.delete().where(Balance.user_id.in_([user.id for user in created])))
+        db_session.commit()
+    Users.bulk_delete([user.id for user in created])
+
+# Run a function from many threads at once and collect the calls that raised ValueError
+def hammer(function, calls):
+    start = threading.Barrier(THREADS)
+    refused = []
+
+    def work(offset):
+        start.wait()
+        for number in range(offset, calls, THREADS):
+            try:
+                function(number)
+            except ValueError:
+                refused.append(number)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return refused
+
+def test_concurrent_deposits_lose_no_updates(users):
+    user = users[0]
+    assert hammer(lambda number: user.deposit(1), 800) == []
+    assert user.balance() == 800
+    assert len(Balance.filter(user_id=user.id)) == 1  # The racing first deposits created one row
+
+def test_concurrent_withdrawals_never_overdraw(users):
+    user = users[0]
+    user.deposit(100)
+    refused = hammer(lambda number: user.withdraw(1), 400)
+    assert len(refused) == 300
+    assert user.balance() == 0
+
+def test_concurrent_transfers_conserve_the_total(users):
+    first, second = users
+    first.deposit(50)
+    second.deposit(50)
+
+    def transfer(number):
+        sender, recipient = (first, second) if number % 2 else (second, first)
+        sender.transfer(recipient, 3)
+
+    hammer(transfer, 800)
+    assert first.balance() + second.balance() == 100
+    assert first.balance() >= 0 and second.balance() >= 0
+
+def test_failed_transfer_changes_neither_balance(users):
+    first, second = users
+    first.deposit(5)
+    second.deposit(1)
+    with pytest.raises(ValueError):
+        first.transfer(second, 10)
+    assert (first.balance(), second.balance()) == (5, 1)
+
+def test_ensure_balance_inserts_once(users):
+    user = users[0]
+    with unit_of_work() as db_session:
+        assert Users._ensure_balance(db_session, user.id) is True
+        assert Users._ensure_balance(db_session, user.id) is False
+        db_session.commit()
+    assert [balance.amount for balance in Balance.filter(user_id=user.id)] == [0.0]
@@ -0,0 +1,37 @@
+import pytest
+from app.Models.users import Users
+
+def rows(count, prefix='bulk'):
+    return [{'email': f'{prefix}{i}@example.com', 'password': 'x'} for i in range(count)]
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    Users.bulk_delete([user.id for user in Users.filter(password='x')])
+
+def test_bulk_create_returns_the_created_rows_across_chunks():
+    created = Users.bulk_create(rows(25), batch_size=10)
+    assert [user.email for user in created] == [f'bulk{i}@example.com' for i in range(25)]
+    assert all(user.id is not None for user in created)
+
+def test_bulk_create_without_refresh_returns_the_count():
+    assert Users.bulk_create(rows(7, 'fast'), batch_size=3, refresh=False) == 7
+    assert len(Users.filter(password='x')) == 7
+
+def test_bulk_update_groups_rows_by_their_columns():
+    ids = [user.id for user in Users.bulk_create(rows(4))]
+    updated = Users.bulk_update(
+        [{'id': ids[0], 'name': 'a'}, {'id': ids[1], 'name': 'b', 'is_admin': True}, {'id': ids[2], 'name': 'c'}],
+        batch_size=1,
+    )
+    assert updated == 3
+    assert [(user.name, user.is_admin) for user in map(Users.get, ids)] == [('a', False), ('b', True), ('c', False), (None, False)]
+
+def test_bulk_update_requires_an_id():
+    with pytest.raises(ValueError):
+        Users.bulk_update([{'name': 'nobody'}])
+
+def test_bulk_delete_counts_deleted_rows():
+    ids = [user.id for user in Users.bulk_create(rows(5))]
+    assert Users.bulk_delete(ids + [10 ** 9], batch_size=2) == 5
+    assert not Users.filter(password='x')
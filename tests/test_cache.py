@@ -0,0 +1,49 @@
+import os
+import pytest
+from database.cache import LRUCache, MISSING
+from app.Models.users import Users
+
+@pytest.fixture
+def users_cache(monkeypatch):
+    cache = LRUCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(Users, '__cache__', cache)
+    user = Users.create(email='cache@example.com', password='secret', discord_id=424242)
+    yield cache
+    Users.delete(user.id)
+
+def test_users_cache_is_opt_in():
+    if os.environ.get('USERS_CACHE'):
+        pytest.skip('USERS_CACHE is set in the environment')
+    assert Users.__cache__ is None
+    assert Users.cache_stats() is None
+
+def test_set_is_dropped_after_an_invalidation():
+    cache = LRUCache()
+    generation = cache.generation()
+    cache.clear()
+    cache.set('key', 'old', generation=generation)
+    assert cache.get('key') is MISSING
+    assert cache.stats()['stale'] == 1
+    cache.set('key', 'new', generation=cache.generation())
+    assert cache.get('key') == 'new'
+
+def test_reader_racing_a_write_does_not_cache_the_old_row(users_cache, monkeypatch):
+    query = Users.query.__func__
+
+    # A write commits (and invalidates) while the reader's query is in flight
+    def racing_query(cls, db_session=None):
+        Users.invalidate_cache()
+        return query(cls, db_session)
+
+    monkeypatch.setattr(Users, 'query', classmethod(racing_query))
+    assert [user.email for user in Users.filter(discord_id=424242)] == ['cache@example.com']
+    assert users_cache.stats()['size'] == 0
+    assert users_cache.stats()['stale'] == 1
+
+def test_reads_are_cached_and_writes_invalidate(users_cache):
+    assert Users.filter(discord_id=424242)[0].email == 'cache@example.com'
+    assert Users.filter(discord_id=424242)[0].email == 'cache@example.com'
+    assert users_cache.stats()['hits'] == 1
+    user = Users.filter(discord_id=424242)[0]
+    Users.update(user.id, email='changed@example.com')
+    assert Users.filter(discord_id=424242)[0].email == 'changed@example.com'
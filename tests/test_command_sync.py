@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+import pytest
+disnake = pytest.importorskip('disnake')
+from disnake.app_commands import SlashCommand
+from disnake.i18n import LocalizationStore
+from app.Actions.command_sync import CommandRegistrar
+
+APPLICATION_ID = 9
+
+# An in-memory stand-in for disnake's HTTPClient, recording every call
+class FakeHTTP:
+    def __init__(self):
+        self.scopes = {}  # guild ID (None for global) -> {command ID -> payload}
+        self.calls = []
+        self._ids = itertools.count(1000)
+
+    def _register(self, guild_id, payload, command_id=None):
+        command_id = command_id or str(next(self._ids))
+        data = dict(payload, id=command_id, application_id=str(APPLICATION_ID), version='1')
+        self.scopes.setdefault(guild_id, {})[command_id] = data
+        return data
+
+    def _existing(self, guild_id, command_id):
+        if command_id not in self.scopes.get(guild_id, {}):
+            raise disnake.NotFound(SimpleNamespace(status=404, reason='Not Found'), 'Unknown application command')
+
+    async def get_global_commands(self, application_id):
+        self.calls.append(('get', None))
+        return list(self.scopes.get(None, {}).values())
+
+    async def get_guild_commands(self, application_id, guild_id):
+        self.calls.append(('get', guild_id))
+        return list(self.scopes.get(guild_id, {}).values())
+
+    async def upsert_global_command(self, application_id, payload):
+        return await self.upsert_guild_command(application_id, None, payload)
+
+    async def upsert_guild_command(self, application_id, guild_id, payload):
+        self.calls.append(('create', guild_id, payload['name']))
+        return self._register(guild_id, payload)
+
+    async def edit_global_command(self, application_id, command_id, payload):
+        return await self.edit_guild_command(application_id, None, command_id, payload)
+
+    async def edit_guild_command(self, application_id, guild_id, command_id, payload):
+        self.calls.append(('edit', guild_id, payload['name']))
+        self._existing(guild_id, command_id)
+        return self._register(guild_id, payload, command_id)
+
+    async def delete_global_command(self, application_id, command_id):
+        await self.delete_guild_command(application_id, None, command_id)
+
+    async def delete_guild_command(self, application_id, guild_id, command_id):
+        self.calls.append(('delete', guild_id, command_id))
+        self._existing(guild_id, command_id)
+        del self.scopes[guild_id][command_id]
+
+    async def bulk_upsert_global_commands(self, application_id, payload):
+        return await self.bulk_upsert_guild_commands(application_id, None, payload)
+
+    async def bulk_upsert_guild_commands(self, application_id, guild_id, payload):
+        self.calls.append(('bulk', guild_id, len(payload)))
+        self.scopes[guild_id] = {}
+        return [self._register(guild_id, command) for command in payload]
+
+# Build a bot exposing the given slash commands ({name: description})
+def make_bot(commands):
+    return SimpleNamespace(
+        application_id=APPLICATION_ID,
+        i18n=LocalizationStore(strict=False),
+        application_commands=[
+            SimpleNamespace(body=SlashCommand(name=name, description=description), guild_ids=None)
+            for name, description in commands.items()
+        ],
+    )
+
+@pytest.fixture
+def http():
+    return FakeHTTP()
+
+@pytest.fixture
+def registrar(http, tmp_path):
+    return CommandRegistrar(http, state_path=str(tmp_path / 'commands.json'), guild_ids=[], bulk_threshold=10)
+
+def sync(registrar, commands, **kwargs):
+    return asyncio.run(registrar.sync(make_bot(commands), **kwargs))
+
+def test_first_sync_fetches_once_then_creates(registrar, http):
+    changes = sync(registrar, {'ping': 'Ping', 'rank': 'Rank'})
+    assert [change.action for change in changes] == ['create', 'create']
+    assert http.calls == [('get', None), ('create', None, 'ping'), ('create', None, 'rank')]
+    http.calls.clear()
+    assert sync(registrar, {'ping': 'Ping', 'rank': 'Rank'}) == []
+    assert http.calls == []  # The cached state is trusted, nothing is fetched
+
+def test_changes_are_diffed_into_create_edit_and_delete(registrar, http):
+    sync(registrar, {'ping': 'Ping', 'rank': 'Rank'})
+    rank_id = registrar.state['global']['chat_input:rank']['id']
+    http.calls.clear()
+    changes = sync(registrar, {'ping': 'Pong!', 'top': 'Top'})
+    assert [(change.action, change.key) for change in changes] == [
+        ('edit', 'chat_input:ping'), ('create', 'chat_input:top'), ('delete', 'chat_input:rank'),
+    ]
+    assert http.calls == [('edit', None, 'ping'), ('create', None, 'top'), ('delete', None, rank_id)]
+    assert sorted(data['name'] for data in http.scopes[None].values()) == ['ping', 'top']
+
+def test_many_changes_are_sent_as_one_bulk_overwrite(registrar, http):
+    registrar.bulk_threshold = 2
+    sync(registrar, {'a': 'A', 'b': 'B', 'c': 'C'})
+    assert http.calls == [('get', None), ('bulk', None, 3)]
+    assert set(registrar.state['global']) == {'chat_input:a', 'chat_input:b', 'chat_input:c'}
+    assert {entry['id'] for entry in registrar.state['global'].values()} == set(http.scopes[None])
+    http.calls.clear()
+    assert sync(registrar, {'a': 'A', 'b': 'B', 'c': 'C'}) == []
+
+def test_stale_cached_ids_fall_back_on_not_found(registrar, http):
+    sync(registrar, {'ping': 'Ping', 'rank': 'Rank'})
+    http.scopes[None].clear()  # Deleted remotely behind the cache's back
+    http.calls.clear()
+    sync(registrar, {'ping': 'Pong!'})
+    assert [call[0] for call in http.calls] == ['edit', 'create', 'delete']
+    assert [data['description'] for data in http.scopes[None].values()] == ['Pong!']
+    assert set(registrar.state['global']) == {'chat_input:ping'}
+
+def test_refresh_caches_matching_remote_commands_without_editing_them(registrar, http):
+    asyncio.run(http.upsert_global_command(APPLICATION_ID, SlashCommand(name='ping', description='Ping').to_dict()))
+    http.calls.clear()
+    assert sync(registrar, {'ping': 'Ping'}, refresh=True) == []
+    assert http.calls == [('get', None)]
+
+def test_guild_sync_registers_global_commands_in_the_guilds(http, tmp_path):
+    asyncio.run(http.upsert_global_command(APPLICATION_ID, SlashCommand(name='old', description='Old').to_dict()))
+    http.calls.clear()
+    registrar = CommandRegistrar(http, state_path=str(tmp_path / 'commands.json'), guild_ids=[42, 43])
+    changes = sync(registrar, {'ping': 'Ping'})
+    assert [(change.action, change.scope) for change in changes] == [('create', '42'), ('create', '43')]
+    assert http.calls == [('get', 42), ('get', 43), ('create', 42, 'ping'), ('create', 43, 'ping')]
+    assert 'global' not in registrar.state  # The global commands are left alone
+    assert [data['name'] for data in http.scopes[None].values()] == ['old']
+
+def test_guild_ids_default_to_command_sync_guilds(http, tmp_path, monkeypatch):
+    monkeypatch.setenv('COMMAND_SYNC_GUILDS', '42, 43')
+    monkeypatch.setenv('COMMAND_SYNC_BULK_THRESHOLD', '3')
+    registrar = CommandRegistrar(http, state_path=str(tmp_path / 'commands.json'))
+    assert (registrar.guild_ids, registrar.bulk_threshold) == ([42, 43], 3)
+
+def test_state_survives_a_restart(registrar, http):
+    sync(registrar, {'ping': 'Ping'})
+    restarted = CommandRegistrar(http, state_path=registrar.state_path, guild_ids=[])
+    http.calls.clear()
+    assert sync(restarted, {'ping': 'Ping'}) == []
+    assert http.calls == []
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from app.Actions.metrics import Histogram, Registry, _label_queries, _operation
+
+# A model standing in for BaseModel, whose generators record when they are closed
+class Model:
+    closed = []
+
+    @classmethod
+    def iter_all(cls):
+        try:
+            for number in range(10):
+                yield _operation.get(), number
+        finally:
+            cls.closed.append('iter_all')
+
+    @classmethod
+    async def aiter_all(cls):
+        try:
+            for number in range(10):
+                yield _operation.get(), number
+        finally:
+            cls.closed.append('aiter_all')
+
+@pytest.fixture(autouse=True)
+def reset_closed():
+    Model.closed.clear()
+
+def test_generator_wrapper_labels_and_closes_the_inner_generator():
+    wrapped = _label_queries(Model.iter_all.__func__, 'iter_all', lambda model: model)
+    for label, number in wrapped(Model):
+        assert label == 'Model.iter_all'
+        break
+    assert Model.closed == ['iter_all']
+    assert _operation.get() is None
+
+def test_async_generator_wrapper_closes_the_inner_generator():
+    wrapped = _label_queries(Model.aiter_all.__func__, 'aiter_all', lambda model: model)
+
+    async def main():
+        iterator = wrapped(Model)
+        async for label, number in iterator:
+            assert label == 'Model.aiter_all'
+            break
+        await iterator.aclose()
+        assert Model.closed == ['aiter_all']  # Closed by aclose(), not later by the loop's finalizer hook
+
+    asyncio.run(main())
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry({'role': 'test'})
+    histogram = registry.register(Histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(('home',), value)
+    text = registry.render()
+    assert 'latency_seconds_bucket{role="test",route="home",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{role="test",route="home",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{role="test",route="home",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{role="test",route="home"} 3' in text
+
+@pytest.mark.parametrize('role, merged', [('web', True), ('all', False), ('bot', False)])
+def test_only_a_web_process_merges_the_bot_snapshot(monkeypatch, tmp_path, role, merged):
+    import json
+    import time
+    from app.Actions import metrics
+    path = tmp_path / 'metrics.json'
+    path.write_text(json.dumps({'updated_at': time.time(), 'families': [
+        ['bot_snapshot_total', 'counter', 'Written by the bot.', [['', {}, 1]]],
+    ]}))
+    monkeypatch.setenv('METRICS_FILE', str(path))
+    monkeypatch.setattr(metrics, 'registry', Registry({'role': role}))
+    assert ('bot_snapshot_total' in metrics.render_metrics()) is merged
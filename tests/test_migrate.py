@@ -0,0 +1,56 @@
+from sqlalchemy import inspect, text
+from database.db import engine
+from database.migrate import check, migrate, missing_indexes, schema_state
+
+# Get the names of a table's indexes in the test database
+def index_names(table):
+    return {index['name'] for index in inspect(engine).get_indexes(table)}
+
+# Make the database look migrated by an older version, without the model's indexes on balances
+def downgrade_balances():
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX IF EXISTS ix_balances_user_id'))
+        connection.execute(schema_state.update().where(schema_state.c.name == 'models').values(fingerprint='older'))
+
+def test_migrate_creates_indexes_missing_from_existing_tables():
+    downgrade_balances()
+    with engine.connect() as connection:
+        assert 'ix_balances_user_id' in {index.name for index in missing_indexes(connection)}
+    assert migrate() is True
+    assert 'ix_balances_user_id' in index_names('balances')
+    with engine.connect() as connection:
+        assert missing_indexes(connection) == []
+    assert check()[0]
+
+def test_migrate_is_a_no_op_once_up_to_date():
+    migrate()
+    assert migrate() is False
+
+def test_migrate_removes_duplicate_balances_before_adding_the_unique_index():
+    from app.Models.users import Users
+    from database.db import unit_of_work
+    downgrade_balances()
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM balances WHERE user_id IN (901, 902)"))
+        connection.execute(text(
+            "INSERT INTO balances (user_id, amount) VALUES (901, 10.0), (901, 10.0), (901, 3.0), (902, 5.0)"
+        ))
+
+    # Pooled connections that read the schema before the index existed must not be reused
+    connections = [engine.connect() for _ in range(engine.pool.size())]
+    for connection in connections:
+        connection.execute(text("SELECT * FROM balances LIMIT 1")).all()
+    for connection in connections:
+        connection.close()
+
+    assert migrate() is True
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT user_id, amount FROM balances WHERE user_id IN (901, 902) ORDER BY user_id")).all()
+    assert [tuple(row) for row in rows] == [(901, 10.0), (902, 5.0)]
+    assert 'ix_balances_user_id' in index_names('balances')
+
+    # The upsert of Users._ensure_balance() now has its unique index to conflict on
+    with unit_of_work() as db_session:
+        assert Users._ensure_balance(db_session, 901) is False
+        assert Users._ensure_balance(db_session, 903) is True
+        db_session.rollback()
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from app.Actions.offload import Offloader
+from database.db import SessionLocal, begin_scope, end_scope
+
+def test_offloaded_calls_get_their_own_session():
+    offloader = Offloader(max_workers=4)
+
+    async def main():
+        token = begin_scope()  # Like a Discord interaction's unit of work
+        try:
+            caller = SessionLocal()
+            workers = await asyncio.gather(*(offloader.run(lambda: id(SessionLocal())) for _ in range(8)))
+            return id(caller), workers
+        finally:
+            end_scope(token)
+
+    try:
+        caller, workers = asyncio.run(main())
+    finally:
+        offloader.shutdown()
+    assert caller not in workers
+
+def test_offloaded_call_uses_an_explicit_session():
+    offloader = Offloader(max_workers=1)
+    session = SessionLocal()
+    try:
+        assert asyncio.run(offloader.run(lambda db_session: db_session, db_session=session)) is session
+    finally:
+        session.close()
+        offloader.shutdown()
+
+def test_stats_count_callers_waiting_for_a_slot():
+    offloader = Offloader(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        calls = [asyncio.ensure_future(offloader.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        during = offloader.stats()
+        calls[2].cancel()  # Give up while still waiting for a slot
+        await asyncio.sleep(0.05)
+        after_cancel = offloader.stats()
+        release.set()
+        await asyncio.gather(*calls[:2])
+        return during, after_cancel, offloader.stats()
+
+    try:
+        during, after_cancel, done = asyncio.run(main())
+    finally:
+        offloader.shutdown()
+    assert (during['running'], during['queued']) == (1, 2)
+    assert after_cancel['queued'] == 1
+    assert (done['running'], done['queued'], done['completed']) == (0, 0, 2)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from app.Actions.outbox import MAX_EMBED_CHARS, OutboxWorker, aenqueue, coalesce, embed_chars, enqueue, outbox_stats
+from app.Actions.webhook import WebhookResponse, WebhookSettings
+from app.Models.webhook_outbox import WebhookOutbox
+from database.db import unit_of_work
+
+# Empty the outbox before each test
+@pytest.fixture(autouse=True)
+def empty_outbox():
+    with unit_of_work() as db_session:
+        db_session.execute(WebhookOutbox.__table__.delete())
+        db_session.commit()
+
+# A webhook client answering from a function instead of the network
+class FakeClient:
+    def __init__(self, respond, settings=None):
+        self.respond = respond
+        self.settings = settings or WebhookSettings(retries=0, max_backoff=60)
+        self.sent = []
+
+    async def post(self, url, payload):
+        self.sent.append((url, payload))
+        return self.respond(url, payload)
+
+    async def close(self):
+        pass
+
+# Get the status of every webhook, by ID
+def statuses():
+    return {row.id: row.status for row in WebhookOutbox.all()}
+
+def test_outcome_settles_rows_when_the_retry_delay_fails(monkeypatch):
+    client = FakeClient(lambda url, payload: WebhookResponse(429, {'Retry-After': 'soon'}, '', 1))
+
+    def broken_delay(attempt, retry_after=None):
+        raise ValueError('bad Retry-After')
+
+    monkeypatch.setattr(client.settings, 'delay', broken_delay)
+    ids = [enqueue('https://example.com/a', {'content': str(i)}) for i in range(3)]
+    handled = asyncio.run(OutboxWorker(client=client, max_attempts=5).drain_once())
+    assert handled == 3
+    assert set(statuses().values()) == {WebhookOutbox.PENDING}
+    assert all(WebhookOutbox.get(id).next_attempt_at > WebhookOutbox.get(id).created_at for id in ids)
+
+def test_invalid_retry_after_is_rescheduled_not_left_sending():
+    client = FakeClient(lambda url, payload: WebhookResponse(429, {'Retry-After': 'soon'}, '', 1))
+    enqueue('https://example.com/a', {'content': 'hi'})
+    asyncio.run(OutboxWorker(client=client, max_attempts=5).drain_once())
+    assert list(statuses().values()) == [WebhookOutbox.PENDING]
+
+# Build an outbox row as coalesce() receives it
+def row(id, payload, url='https://example.com/a'):
+    return SimpleNamespace(id=id, url=url, payload=json.dumps(payload), attempts=0, created_at=0.0)
+
+def test_coalesce_merges_up_to_ten_embeds():
+    messages = coalesce([row(i, {'embeds': [{'title': str(i)}]}) for i in range(12)])
+    assert [len(payload['embeds']) for _, payload, _ in messages] == [10, 2]
+
+def test_coalesce_caps_messages_by_embed_characters():
+    big = {'embeds': [{'description': 'x' * 2500}]}
+    messages = coalesce([row(i, big) for i in range(5)])
+    assert [len(rows) for _, _, rows in messages] == [2, 2, 1]
+    assert all(embed_chars(payload['embeds']) <= MAX_EMBED_CHARS for _, payload, _ in messages)
+
+def test_coalesce_sends_an_oversized_webhook_alone():
+    messages = coalesce([row(1, {'embeds': [{'title': 'ok'}]}), row(2, {'embeds': [{'description': 'x' * 7000}]}), row(3, {'embeds': [{'title': 'ok'}]})])
+    assert [[r.id for r in rows] for _, _, rows in messages] == [[1, 3], [2]]
+
+def test_embed_chars_counts_the_limited_fields():
+    embed = {'title': 'ab', 'description': 'cde', 'fields': [{'name': 'f', 'value': 'gh'}], 'footer': {'text': 'i'}, 'author': {'name': 'jk'}, 'url': 'ignored'}
+    assert embed_chars([embed]) == 11
+
+def test_rejected_merged_message_is_split_before_dead_lettering():
+    # Discord rejects any message containing the bad embed
+    def respond(url, payload):
+        bad = any(embed.get('title') == 'bad' for embed in payload['embeds'])
+        return WebhookResponse(400 if bad else 204, {}, 'Invalid Form Body' if bad else '', 1)
+
+    client = FakeClient(respond)
+    ids = [enqueue('https://example.com/a', {'embeds': [{'title': title}]}) for title in ('one', 'bad', 'two')]
+    asyncio.run(OutboxWorker(client=client, max_attempts=5).drain_once())
+    assert statuses() == {ids[0]: WebhookOutbox.SENT, ids[1]: WebhookOutbox.DEAD, ids[2]: WebhookOutbox.SENT}
+    assert len(client.sent) == 4  # The merged message, then each webhook alone
+
+def test_failed_insert_is_not_counted_as_enqueued(monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('database down')
+
+    async def afail(*args, **kwargs):
+        fail()
+
+    monkeypatch.setattr(WebhookOutbox, 'create', fail)
+    monkeypatch.setattr(WebhookOutbox, 'acreate', afail)
+    before = outbox_stats.snapshot()['enqueued']
+    with pytest.raises(RuntimeError):
+        enqueue('https://example.com/hook', {'content': 'lost'})
+    with pytest.raises(RuntimeError):
+        asyncio.run(aenqueue('https://example.com/hook', {'content': 'lost'}))
+    assert outbox_stats.snapshot()['enqueued'] == before
@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+disnake = pytest.importorskip('disnake')
+from app.Actions.pagination import PAGE_SOURCES, KeysetPages, Paginator, handle_persistent_click
+from app.Models.users import Users
+
+def navigate(paginator, *actions):
+    # Open the paginator, click the buttons and return the pages shown
+    async def main():
+        shown = [(await paginator._first_page()).description]
+        for action in actions:
+            shown.append((await paginator.move(paginator.target(action))).description)
+        paginator.release()
+        return shown
+
+    return asyncio.run(main())
+
+def test_list_pages_wrap_around():
+    paginator = Paginator([f'page {number}' for number in range(1, 6)])
+    assert navigate(paginator, 'next', 'previous', 'previous', 'last', 'next', 'first') == [
+        'page 1', 'page 2', 'page 1', 'page 5', 'page 5', 'page 1', 'page 1',
+    ]
+
+def test_long_paginators_jump_ten_pages():
+    paginator = Paginator([str(number) for number in range(1, 31)], target_page=5)
+    assert navigate(paginator, 'last', 'last', 'first') == ['5', '15', '25', '15']
+
+def test_rendered_pages_stay_within_the_cache():
+    paginator = Paginator([str(number) for number in range(1, 101)], cache_size=3)
+
+    async def main():
+        await paginator._first_page()
+        for _ in range(20):
+            await paginator.move(paginator.target('next'))
+            assert len(paginator._pages) <= 3
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+def test_provider_of_unknown_length_finds_its_last_page():
+    calls = []
+
+    def provider(page):
+        calls.append(page)
+        return f'page {page}' if page <= 12 else None
+
+    paginator = Paginator(provider)
+    assert paginator.label() == '1/?'
+    assert navigate(paginator, 'last', 'next', 'next', 'next') == ['page 1', 'page 11', 'page 12', 'page 1', 'page 2']
+    assert paginator.page_count == 12  # Found on the way, so the next click wrapped around
+    assert max(calls) == 13
+
+def test_async_iterator_is_pulled_on_demand():
+    pulled = []
+
+    async def segments():
+        for number in range(1, 100):
+            pulled.append(number)
+            yield f'page {number}'
+
+    paginator = Paginator(segments(), cache_size=1)
+    assert navigate(paginator, 'next') == ['page 1', 'page 2']
+    assert pulled == [1, 2]
+
+def test_out_of_range_target_starts_at_page_one():
+    assert navigate(Paginator(['a', 'b'], target_page=9)) == ['a']
+
+def test_empty_paginator_is_refused():
+    with pytest.raises(ValueError):
+        navigate(Paginator([]))
+
+@pytest.fixture
+def users():
+    created = Users.bulk_create([{'email': f'pages{number}@example.com', 'password': 'paginate'} for number in range(25)])
+    yield created
+    Users.bulk_delete([user.id for user in created])
+
+def test_keyset_pages_read_one_page_at_a_time(users):
+    pages = KeysetPages(Users, lambda rows, page: ', '.join(row.email.split('@')[0] for row in rows), per_page=10, columns=['email'], password='paginate')
+    paginator = Paginator(pages, cache_size=1)
+    shown = navigate(paginator, 'last', 'next', 'previous')
+    assert paginator.page_count == 3
+    assert shown[0] == ', '.join(f'pages{number}' for number in range(10))
+    assert shown[1:] == [', '.join(f'pages{number}' for number in range(20, 25)), shown[0], shown[1]]
+
+def render_emails(rows, page):
+    return ', '.join(row.email.split('@')[0] for row in rows)
+
+def count_queries(monkeypatch):
+    # Count the page reads (apaginate) and the cursor lookups (QuerySet.afirst)
+    from database.query import QuerySet
+    counts = {'pages': 0, 'cursors': 0}
+    apaginate, afirst = Users.apaginate, QuerySet.afirst
+
+    async def counted_apaginate(*args, **kwargs):
+        counts['pages'] += 1
+        return await apaginate(*args, **kwargs)
+
+    async def counted_afirst(self):
+        counts['cursors'] += 1
+        return await afirst(self)
+
+    monkeypatch.setattr(Users, 'apaginate', counted_apaginate)
+    monkeypatch.setattr(QuerySet, 'afirst', counted_afirst)
+    return counts
+
+def test_keyset_pages_jump_with_one_cursor_query(users, monkeypatch):
+    expected = {page: ', '.join(f'pages{number}' for number in range(page * 5 - 5, min(25, page * 5))) for page in range(1, 6)}
+    counts = count_queries(monkeypatch)
+
+    async def main():
+        pages = KeysetPages(Users, render_emails, per_page=5, columns=['email'], password='paginate')
+        assert await pages(4) == expected[4]  # Forward from page 1
+        assert counts == {'pages': 1, 'cursors': 1}
+        restored = KeysetPages(Users, render_emails, per_page=5, columns=['email'], password='paginate')
+        restored.seek(4, pages.cursor(4))
+        assert await restored(2) == expected[2]  # Backward from the restored cursor
+        assert await restored(6) is None
+        counted = KeysetPages(Users, render_emails, per_page=5, columns=['email'], password='paginate')
+        assert await counted.page_count() == 5
+        assert await counted(5) == expected[5]  # Backward from the end
+        assert await counted(7) is None
+
+    asyncio.run(main())
+
+def test_persistent_click_resumes_from_the_cursor(users, monkeypatch):
+    monkeypatch.setitem(PAGE_SOURCES, 'emails', lambda argument: Paginator(KeysetPages(Users, render_emails, per_page=5, columns=['email'], password=argument)))
+    edits = []
+
+    async def edit_message(embed, components):
+        edits.append((embed.description, [button.custom_id for button in components]))
+
+    def click(custom_id):
+        interaction = SimpleNamespace(
+            component=SimpleNamespace(custom_id=custom_id),
+            author=SimpleNamespace(id=7),
+            response=SimpleNamespace(edit_message=edit_message),
+        )
+        asyncio.run(handle_persistent_click(interaction))
+        return edits[-1]
+
+    counts = count_queries(monkeypatch)
+    custom_id = 'pg:emails:7:1:next:paginate'
+    for page in range(2, 6):
+        counts.update(pages=0, cursors=0)
+        description, custom_ids = click(custom_id)
+        assert description == ', '.join(f'pages{number}' for number in range(page * 5 - 5, page * 5))
+        assert counts['pages'] == 1  # Only the target page is rendered
+        assert counts['cursors'] <= 1  # Whatever the page, not one query per page before it
+        custom_id = custom_ids[3]
+        assert custom_id.startswith(f'pg:emails:7:{page}@')
+    description, _ = click(custom_ids[1])  # previous
+    assert description == ', '.join(f'pages{number}' for number in range(15, 20))
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from app.Models.users import Users
+from database import query
+from database.query import QuerySet
+
+@pytest.fixture
+def users():
+    created = Users.bulk_create([
+        {'name': 'Ann', 'email': 'ann@query.test', 'password': 'query', 'discord_id': 7001},
+        {'name': 'Bob', 'email': 'bob@query.test', 'password': 'query', 'discord_id': 7002, 'is_admin': True},
+        {'name': None, 'email': '100%_real@query.test', 'password': 'query', 'discord_id': 7003},
+    ])
+    yield created
+    Users.bulk_delete([user.id for user in created])
+
+def emails(queryset):
+    return sorted(user.email for user in queryset.filter(password='query').all())
+
+def test_in_lookup(users):
+    assert emails(Users.query().filter(discord_id__in=[7001, 7003])) == ['100%_real@query.test', 'ann@query.test']
+    assert emails(Users.query().filter(discord_id__in=(7002,))) == ['bob@query.test']
+
+def test_like_lookups_escape_wildcards(users):
+    assert emails(Users.query().filter(email__contains='%_')) == ['100%_real@query.test']
+    assert emails(Users.query().filter(email__startswith='an')) == ['ann@query.test']
+    assert emails(Users.query().filter(email__icontains='BOB')) == ['bob@query.test']
+    assert emails(Users.query().filter(email__contains='n_')) == []
+
+def test_isnull_and_exact_none(users):
+    assert emails(Users.query().filter(name__isnull=True)) == ['100%_real@query.test']
+    assert emails(Users.query().filter(name=None)) == ['100%_real@query.test']
+    assert emails(Users.query().filter(name__isnull=False)) == ['ann@query.test', 'bob@query.test']
+    assert emails(Users.query().exclude(name=None)) == ['ann@query.test', 'bob@query.test']
+
+def test_count_exists_and_first(users):
+    admins = Users.query().filter(password='query', is_admin=True)
+    assert admins.count() == 1
+    assert admins.exists() is True
+    assert Users.query().filter(password='query', discord_id__gt=9000).exists() is False
+    assert Users.query().filter(password='query').order_by('-discord_id').first().email == '100%_real@query.test'
+
+def test_only_returns_rows_with_id(users):
+    rows = Users.query().filter(password='query').only('email').order_by('discord_id').limit(2).offset(1).all()
+    assert [(row.id, row.email) for row in rows] == [(users[1].id, 'bob@query.test'), (users[2].id, '100%_real@query.test')]
+
+def test_async_terminals(users):
+    async def main():
+        queryset = Users.query().filter(password='query', discord_id__lte=7002)
+        return await queryset.acount(), await queryset.aexists(), (await queryset.order_by('id').afirst()).email
+
+    assert asyncio.run(main()) == (2, True, 'ann@query.test')
+
+@pytest.mark.parametrize('lookups', [{'deposit': 3}, {'balances': 3}, {'nope__gt': 1}, {'_cache_key': 1}])
+def test_methods_and_relationships_are_not_columns(lookups):
+    with pytest.raises(ValueError):
+        Users.query().filter(**lookups)
+
+def test_unknown_lookup_order_and_only_columns_are_refused():
+    with pytest.raises(ValueError):
+        Users.query().filter(email__like='x')
+    with pytest.raises(ValueError):
+        Users.query().order_by('-balances')
+    with pytest.raises(ValueError):
+        Users.query().only('deposit')
+
+def test_statements_are_cached_per_shape(users):
+    query._statements.clear()
+    first = Users.query().filter(password='query', discord_id__in=[7001])
+    second = Users.query().filter(password='query', discord_id__in=[7002, 7003])
+    assert first._statement('select') is second._statement('select')
+    assert len(query._statements) == 1
+    assert sorted(user.email for user in second.all()) == ['100%_real@query.test', 'bob@query.test']
+
+    # A different lookup, ordering, limit or kind is another shape
+    Users.query().filter(password__ne='query')._statement('select')
+    Users.query().filter(password='query').order_by('id')._statement('select')
+    Users.query().filter(password='query').limit(1)._statement('select')
+    first._statement('count')
+    assert len(query._statements) == 5
+
+def test_queryset_is_lazy_and_immutable(users):
+    base = Users.query().filter(password='query')
+    narrowed = base.filter(is_admin=True)
+    assert isinstance(narrowed, QuerySet) and narrowed is not base
+    assert base.count() == 3 and narrowed.count() == 1
+    assert len(list(base)) == 3
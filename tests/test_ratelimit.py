@@ -0,0 +1,153 @@
+import asyncio
+import importlib.util
+from types import SimpleNamespace
+import pytest
+from flask import Flask
+from app.Actions import ratelimit
+from app.Actions.ratelimit import (
+    MemoryRateLimitBackend, RateLimiter, SlidingWindow, TokenBucket, init_rate_limit, parse_limit, rate_limit,
+)
+
+# Feed hits to an algorithm at the given times, threading its state through
+def run(algorithm, times, cost=1):
+    state, results = None, []
+    for now in times:
+        state, result = algorithm.consume(state, now, cost)
+        results.append(result)
+    return results
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(rate=2, per=10, burst=4)  # 0.2 tokens per second
+    results = run(bucket, [0, 0, 0, 0, 0])
+    assert [result.allowed for result in results] == [True, True, True, True, False]
+    assert [result.remaining for result in results[:4]] == [3, 2, 1, 0]
+    assert results[4].retry_after == pytest.approx(5.0)
+
+def test_token_bucket_refill_is_capped_at_the_burst():
+    bucket = TokenBucket(rate=2, per=10, burst=4)
+    state, _ = bucket.consume(None, 0, cost=4)
+    state, result = bucket.consume(state, 5, cost=1)  # One token refilled
+    assert result.allowed and result.remaining == 0
+    state, result = bucket.consume(state, 1000, cost=1)
+    assert result.remaining == 3  # Refilled to 4, not 199
+    _, result = bucket.consume(state, 1000, cost=5)
+    assert not result.allowed and result.retry_after == pytest.approx((5 - 3) / 0.2)
+
+def test_sliding_window_denies_until_the_window_ends():
+    window = SlidingWindow(limit=10, window=60)
+    results = run(window, [0] * 10 + [30])
+    assert all(result.allowed for result in results[:10])
+    assert not results[10].allowed
+    assert results[10].retry_after == pytest.approx(30.0)  # No previous window to slide out
+
+def test_sliding_window_weights_the_previous_window():
+    window = SlidingWindow(limit=10, window=60)
+    state = None
+    for _ in range(10):
+        state, _ = window.consume(state, 0)
+
+    # At the start of the next window the 10 previous hits still count fully
+    state, result = window.consume(state, 60)
+    assert not result.allowed
+    assert result.retry_after == pytest.approx(6.0)  # Until 1 of the 10 hits has slid out
+
+    # 6s in, the previous window weighs 0.9: 9 hits used, 1 left
+    state, result = window.consume(state, 66)
+    assert result.allowed and result.remaining == 0
+    state, result = window.consume(state, 66)
+    assert not result.allowed
+
+    # Halfway, 5 + 1 used
+    state, result = window.consume(state, 90)
+    assert result.allowed and result.remaining == 3
+
+    # Two windows later nothing counts any more
+    _, result = window.consume(state, 200)
+    assert result.allowed and result.remaining == 9
+
+def test_memory_backend_evicts_the_least_recently_used_key():
+    backend = MemoryRateLimitBackend(maxsize=2)
+    limiter = RateLimiter('test:evict', TokenBucket(rate=1, per=60), backend)
+    assert limiter.hit('a', now=0).allowed
+    assert limiter.hit('b', now=0).allowed
+    assert not limiter.hit('a', now=1).allowed  # 'a' is now the most recently used
+    assert limiter.hit('c', now=1).allowed       # Evicts 'b'
+    assert backend.stats() == {'keys': 2, 'maxsize': 2, 'evictions': 1}
+    assert limiter.hit('b', now=2).allowed       # An evicted key starts over with a full allowance
+    assert (limiter.allowed, limiter.limited) == (4, 1)
+
+def test_default_backend_is_sized_by_rate_limit_max_keys(monkeypatch):
+    monkeypatch.setenv('RATE_LIMIT_MAX_KEYS', '3')
+    spec = importlib.util.spec_from_file_location('ratelimit_copy', ratelimit.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    limiter = module.RateLimiter('test:max-keys', module.SlidingWindow(1, 60))
+    for key in range(5):
+        limiter.hit(key, now=0)
+    assert module.default_backend.stats() == {'keys': 3, 'maxsize': 3, 'evictions': 2}
+
+def test_parse_limit():
+    assert parse_limit('5/1') == (5, 1.0)
+    assert parse_limit(' OFF ') is None
+    assert parse_limit('') is None
+
+def test_init_rate_limit_answers_429_with_retry_after():
+    app = Flask(__name__)
+    init_rate_limit(app, limit='2/60', algorithm='sliding_window', backend=MemoryRateLimitBackend(), exempt=('health',))
+    app.add_url_rule('/stats', 'stats', lambda: 'ok')
+    app.add_url_rule('/health', 'health', lambda: 'ok')
+    client = app.test_client()
+    first = client.get('/stats')
+    assert first.status_code == 200 and first.headers['X-RateLimit-Limit'] == '2'
+    assert client.get('/stats').status_code == 200
+    refused = client.get('/stats')
+    assert refused.status_code == 429
+    assert 1 <= int(refused.headers['Retry-After']) <= 60
+    assert all(client.get('/health').status_code == 200 for _ in range(5))
+
+def test_init_rate_limit_off_installs_nothing():
+    app = Flask(__name__)
+    assert init_rate_limit(app, limit='off') is None
+
+disnake = pytest.importorskip('disnake')
+
+# An interaction the command decorators recognise, recording the refusals it is sent
+class FakeInteraction(disnake.Interaction):
+    author = None
+    guild = None
+    response = None
+
+    def __init__(self, author_id, guild_id=None):
+        self.author = SimpleNamespace(id=author_id)
+        self.guild = SimpleNamespace(id=guild_id) if guild_id else None
+        self.sent = []
+        self.response = SimpleNamespace(is_done=lambda: False, send_message=self._send_message)
+
+    async def _send_message(self, message, ephemeral=False):
+        self.sent.append((message, ephemeral))
+
+def test_rate_limit_decorator_refuses_per_key(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: 1000.0)
+    runs = []
+
+    @rate_limit(1, 60, key='guild', algorithm='sliding_window')
+    async def command(interaction):
+        runs.append(interaction.author.id)
+        return 'ran'
+
+    async def main():
+        first, second, other = FakeInteraction(1, guild_id=5), FakeInteraction(2, guild_id=5), FakeInteraction(3, guild_id=6)
+        assert await command(first) == 'ran'
+        assert await command(second) is None  # Same guild
+        assert await command(other) == 'ran'
+        return second.sent
+
+    sent = asyncio.run(main())
+    assert runs == [1, 3]
+    assert sent == [("You're doing that too fast, try again in 20.0s.", True)]
+
+def test_rate_limit_decorator_without_a_limit_is_a_no_op():
+    async def command(interaction):
+        return 'ran'
+
+    assert rate_limit()(command) is command
@@ -0,0 +1,40 @@
+import pytest
+from config import server
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ('FLASK_SERVER', 'FLASK_WORKERS', 'FLASK_THREADS', 'FLASK_BACKLOG', 'FLASK_TIMEOUT',
+                 'FLASK_KEEPALIVE', 'FLASK_GRACEFUL_TIMEOUT', 'FLASK_SOCKET_FD'):
+        monkeypatch.delenv(name, raising=False)
+
+def test_server_mode_defaults_to_dev():
+    assert server.server_mode() == 'dev'
+
+def test_server_mode_is_case_insensitive(monkeypatch):
+    monkeypatch.setenv('FLASK_SERVER', ' Waitress ')
+    assert server.server_mode() == 'waitress'
+
+def test_unknown_server_mode_is_refused(monkeypatch):
+    monkeypatch.setenv('FLASK_SERVER', 'uwsgi')
+    with pytest.raises(ValueError):
+        server.server_mode()
+
+def test_server_options_read_the_environment(monkeypatch):
+    monkeypatch.setenv('FLASK_WORKERS', '3')
+    monkeypatch.setenv('FLASK_BACKLOG', '64')
+    options = server.server_options()
+    assert (options['workers'], options['threads'], options['backlog'], options['timeout']) == (3, 4, 64, 30)
+
+def test_inherited_socket_fd(monkeypatch):
+    assert server.inherited_socket_fd() is None
+    monkeypatch.setenv('FLASK_SOCKET_FD', '7')
+    assert server.inherited_socket_fd() == 7
+
+@pytest.mark.parametrize('mode, runner', [('dev', 'run_dev'), ('waitress', 'run_waitress'), ('gunicorn', 'run_gunicorn')])
+def test_run_server_dispatches_to_the_mode(monkeypatch, mode, runner):
+    calls = []
+    for name in ('run_dev', 'run_waitress', 'run_gunicorn'):
+        monkeypatch.setattr(server, name, lambda *args, name=name, **kwargs: calls.append((name, args[1:3], kwargs)))
+    monkeypatch.setenv('FLASK_SERVER', mode)
+    server.run_server(object(), '127.0.0.1', None)
+    assert calls == [(runner, ('127.0.0.1', 5000), {'fd': None})]
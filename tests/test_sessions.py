@@ -0,0 +1,61 @@
+import threading
+from flask import Flask, g
+from app.Models.users import Users
+from database.db import SessionLocal, begin_scope, end_scope, engine, get_pool_stats
+
+CALLS = 10000
+
+def open_sessions():
+    return len(SessionLocal.registry.registry)
+
+def test_connections_stay_flat_after_10k_calls():
+    user = Users.create(email='sessions@example.com', password='secret')
+    try:
+        before = (get_pool_stats()['checked_out'], open_sessions())
+        calls = [
+            lambda: Users.get(user.id),
+            lambda: Users.filter(email='sessions@example.com'),
+            lambda: Users.exists(user.id),
+            lambda: Users.update(user.id, name='sessions'),
+        ]
+
+        # The Flask and Discord threads both call the models without passing a session
+        def work(offset):
+            for number in range(offset, CALLS, 4):
+                calls[number % len(calls)]()
+
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert (get_pool_stats()['checked_out'], open_sessions()) == before
+        assert engine.pool.checkedin() <= engine.pool.size()
+    finally:
+        Users.delete(user.id)
+
+def test_request_scope_is_torn_down_after_every_request():
+    # The same hooks config/boot.py installs on the Flask app
+    app = Flask(__name__)
+
+    @app.before_request
+    def open_db_scope():
+        g.db_scope = begin_scope()
+
+    @app.teardown_request
+    def close_db_scope(exception=None):
+        end_scope(g.pop('db_scope', None))
+
+    @app.route('/count')
+    def count():
+        first = SessionLocal()
+        Users.filter(email='nobody@example.com')
+        assert SessionLocal() is first  # The classmethods join the request's session
+        return str(len(Users.all()))
+
+    client = app.test_client()
+    before = (get_pool_stats()['checked_out'], open_sessions())
+    for _ in range(1000):
+        assert client.get('/count').status_code == 200
+    assert (get_pool_stats()['checked_out'], open_sessions()) == before
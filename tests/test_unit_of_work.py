@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import pytest
+from app.Models.balance import Balance
+from database import db
+from database.db import SessionLocal, begin_scope, end_scope, unit_of_work, async_unit_of_work
+
+# Make sure there are rows to stream
+@pytest.fixture(autouse=True)
+def balances():
+    Balance.bulk_create([{'user_id': 100000 + number, 'amount': 1.0} for number in range(3)], refresh=False)
+    yield
+    with unit_of_work() as db_session:
+        db_session.execute(Balance.__table__.delete().where(Balance.__table__.c.user_id >= 100000))
+        db_session.commit()
+
+def test_unit_of_work_shares_one_session_and_removes_it():
+    with unit_of_work() as outer:
+        with unit_of_work() as inner:
+            assert inner is outer
+    assert db._current_scope.get() is None
+    with unit_of_work() as other:
+        assert other is not outer
+
+def test_scope_is_per_thread():
+    sessions = []
+
+    def work():
+        with unit_of_work() as db_session:
+            sessions.append(db_session)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 4
+
+def test_abandoned_iter_all_does_not_end_another_unit_of_work():
+    iterator = Balance.iter_all(batch_size=1)
+    next(iterator)
+
+    token = begin_scope()  # Another unit of work, e.g. the next Flask request
+    try:
+        scope = db._current_scope.get()
+        session = SessionLocal()
+        iterator.close()  # Finalized here, as the garbage collector could do
+        assert db._current_scope.get() is scope
+        assert SessionLocal() is session
+    finally:
+        end_scope(token)
+
+def test_iter_all_closes_its_session_when_broken_out_of():
+    sessions = []
+    original = SessionLocal.session_factory
+
+    def tracked():
+        sessions.append(original())
+        return sessions[-1]
+
+    SessionLocal.session_factory = tracked
+    try:
+        for _ in Balance.iter_all(batch_size=1):
+            break
+    finally:
+        SessionLocal.session_factory = original
+    assert len(sessions) == 1
+    assert not sessions[0].in_transaction()
+
+def test_abandoned_aiter_all_does_not_end_another_tasks_session():
+    async def start():
+        iterator = Balance.aiter_all(batch_size=1)
+        await iterator.__anext__()
+        return iterator
+
+    async def main():
+        iterator = await start()
+
+        async def other_task():
+            async with async_unit_of_work() as session:
+                await iterator.aclose()  # Finalized inside another task's unit of work
+                assert db._current_async_session.get() is session
+                return await Balance.query(session).filter(user_id__gte=100000).acount()
+
+        return await asyncio.create_task(other_task())
+
+    assert asyncio.run(main()) == 3
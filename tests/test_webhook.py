@@ -0,0 +1,120 @@
+import hashlib
+import asyncio
+import hmac
+import pytest
+from flask import Flask
+from app.Actions.webhook import WEBHOOK_HANDLERS, InboundWebhooks, SyncWebhookClient, WebhookClient, WebhookSettings, verify_signature
+
+SECRET = 'test-secret'
+BODY = b'{"event": "ping"}'
+
+# Get the valid signature header of a body
+def sign(body, secret=SECRET):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def test_verify_signature_accepts_a_valid_signature():
+    assert verify_signature(SECRET, BODY, sign(BODY))
+    assert verify_signature(SECRET, BODY, sign(BODY).split('=', 1)[1].upper())
+
+@pytest.mark.parametrize('signature', [None, '', 'sha256=', 'sha256=deadbeef', sign(b'other body')])
+def test_verify_signature_rejects_a_wrong_signature(signature):
+    assert not verify_signature(SECRET, BODY, signature)
+
+@pytest.mark.parametrize('signature', ['sha256=éé', 'sha256=☃' * 3, '\udcff'])
+def test_verify_signature_rejects_a_malformed_header(signature):
+    assert not verify_signature(SECRET, BODY, signature)
+
+def test_malformed_signature_header_is_answered_with_401(monkeypatch):
+    monkeypatch.setenv('WEBHOOK_SECRET_TEST', SECRET)
+    from routes.api import api
+    app = Flask(__name__)
+    app.register_blueprint(api)
+    response = app.test_client().post(
+        '/api/v1/webhooks/test', data=BODY,
+        headers={'X-Signature-256': 'sha256=éé'.encode('utf-8').decode('latin-1')},
+    )
+    assert response.status_code == 401
+
+@pytest.mark.parametrize('retry_after', ['soon', 'Mon, 99 Foo 2024 99:99:99 GMT', 'nan', 'inf', '\x00'])
+def test_invalid_retry_after_falls_back_to_backoff(retry_after):
+    settings = WebhookSettings(backoff=0.5, max_backoff=30)
+    assert settings.retry_after_seconds(retry_after) is None
+    assert 0.25 <= settings.delay(1, retry_after) <= 0.5
+
+@pytest.mark.parametrize('retry_after, expected', [
+    ('2', 2.0),
+    ('-5', 0.0),
+    ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+])
+def test_retry_after_is_clamped_to_zero(retry_after, expected):
+    assert WebhookSettings(max_backoff=30).delay(1, retry_after) == expected
+
+def test_sync_client_retries_after_an_invalid_retry_after(monkeypatch):
+    pytest.importorskip('requests')
+    client = SyncWebhookClient(WebhookSettings(retries=2, backoff=0.001, max_backoff=0.01))
+    responses = [(429, {'Retry-After': 'soon'}), (200, {})]
+    calls = []
+
+    class FakeResponse:
+        def __init__(self, status_code, headers):
+            self.status_code, self.headers, self.text = status_code, headers, ''
+
+    def post(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(*responses[len(calls) - 1])
+
+    monkeypatch.setattr(client.session, 'post', post)
+    response = client.post('https://example.com/hook', {'content': 'hi'})
+    assert response.status_code == 200
+    assert response.attempts == 2
+
+def test_sync_client_gives_up_waiting_for_a_busy_host(monkeypatch):
+    requests = pytest.importorskip('requests')
+    client = SyncWebhookClient(WebhookSettings(timeout=0.05, retries=0, max_per_host=1))
+    calls = []
+    monkeypatch.setattr(client.session, 'post', lambda url, **kwargs: calls.append(url))
+
+    slot = client._host_slot('https://example.com/other')
+    assert slot.acquire(blocking=False)  # Another thread is using the host's only connection
+    with pytest.raises(requests.Timeout):
+        client.post('https://EXAMPLE.com/hook', {'content': 'hi'})
+    slot.release()
+    assert calls == []
+    assert client._host_slot('https://example.org/hook') is not slot
+
+def test_async_client_keeps_one_session_per_event_loop():
+    pytest.importorskip('aiohttp')
+    client = WebhookClient()
+
+    async def sessions():
+        first, second = client._get_session(), client._get_session()
+        assert client._session_loop is asyncio.get_running_loop()
+        return first, second
+
+    first, second = asyncio.run(sessions())
+    assert first is second
+    third, _ = asyncio.run(sessions())  # A new loop can't use the old loop's connections
+    assert third is not first
+    asyncio.run(client.close())
+    assert client._session is None and client._session_loop is None
+
+def test_failed_handler_lets_the_retry_through(monkeypatch):
+    monkeypatch.setenv('WEBHOOK_SECRET_FLAKY', SECRET)
+    calls = []
+
+    def handler(data):
+        calls.append(data)
+        if len(calls) == 1:
+            raise RuntimeError('database down')
+
+    monkeypatch.setitem(WEBHOOK_HANDLERS, 'flaky', handler)
+    inbound = InboundWebhooks(workers=1)
+    headers = {'X-Signature-256': sign(BODY), 'Idempotency-Key': 'event-1'}
+
+    assert inbound.accept('flaky', BODY, headers)[0] == 202
+    inbound.queue.join()
+    assert inbound.accept('flaky', BODY, headers)[0] == 202  # The provider's retry is processed
+    inbound.queue.join()
+    assert inbound.accept('flaky', BODY, headers)[:2] == (200, {'status': 'duplicate'})
+    assert len(calls) == 2
+    assert inbound.snapshot()['failed'] == 1 and inbound.snapshot()['processed'] == 1